@@ -0,0 +1,28 @@
+"""add room allocation index
+
+Revision ID: 01b03139c8c3
+Revises: 0572e39f61f1
+Create Date: 2026-10-18 09:12:41.208311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '01b03139c8c3'
+down_revision: Union[str, None] = '0572e39f61f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_rooms_property_type_status', 'rooms', ['property_id', 'type_id', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_rooms_property_type_status', table_name='rooms')
@@ -0,0 +1,28 @@
+"""add reservation room stay index
+
+Revision ID: 3c5f8a2d9e14
+Revises: e6a9d3f17b52
+Create Date: 2026-10-18 14:05:12.338901
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c5f8a2d9e14'
+down_revision: Union[str, None] = 'e6a9d3f17b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_reservations_room_stay', 'reservations', ['room_id', 'check_in', 'check_out'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reservations_room_stay', table_name='reservations')
@@ -0,0 +1,44 @@
+"""add room status outbox
+
+Revision ID: 5e9c13a7d4f2
+Revises: d2b7f0c94e38
+Create Date: 2026-10-18 16:20:33.904117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e9c13a7d4f2'
+down_revision: Union[str, None] = 'd2b7f0c94e38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('room_status_outbox',
+    sa.Column('room_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('last_error', sa.String(), nullable=True),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_room_status_outbox_id'), 'room_status_outbox', ['id'], unique=False)
+    op.create_index(op.f('ix_room_status_outbox_next_attempt_at'), 'room_status_outbox', ['next_attempt_at'], unique=False)
+    op.create_index(op.f('ix_room_status_outbox_room_id'), 'room_status_outbox', ['room_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_room_status_outbox_room_id'), table_name='room_status_outbox')
+    op.drop_index(op.f('ix_room_status_outbox_next_attempt_at'), table_name='room_status_outbox')
+    op.drop_index(op.f('ix_room_status_outbox_id'), table_name='room_status_outbox')
+    op.drop_table('room_status_outbox')
@@ -0,0 +1,32 @@
+"""add room list filter indexes
+
+Revision ID: 7d2e5a91c4f0
+Revises: 01b03139c8c3
+Create Date: 2026-10-18 11:02:15.486120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e5a91c4f0'
+down_revision: Union[str, None] = '01b03139c8c3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_rooms_property_status', 'rooms', ['property_id', 'status'], unique=False)
+    op.create_index('ix_rooms_property_floor', 'rooms', ['property_id', 'floor'], unique=False)
+    op.create_index('ix_rate_plans_property_room_type', 'rate_plans', ['property_id', 'room_type_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_rate_plans_property_room_type', table_name='rate_plans')
+    op.drop_index('ix_rooms_property_floor', table_name='rooms')
+    op.drop_index('ix_rooms_property_status', table_name='rooms')
@@ -0,0 +1,82 @@
+"""add room type inventory
+
+Revision ID: 8a1d4e6c2b70
+Revises: 3c5f8a2d9e14
+Create Date: 2026-10-18 15:02:47.615204
+
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a1d4e6c2b70'
+down_revision: Union[str, None] = '3c5f8a2d9e14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_STATUSES = ('BOOKED', 'CHECKED_IN')
+
+
+def stay_nights(check_in, check_out):
+    # Frozen copy of backend.reservation_service.repository.stay_nights
+    first = check_in.date() if isinstance(check_in, datetime) else check_in
+    last = check_out.date() if isinstance(check_out, datetime) else check_out
+    return [first + timedelta(days=i) for i in range(max((last - first).days, 1))]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('reservations', sa.Column('room_type_id', sa.Integer(), nullable=True))
+    op.create_table('room_type_inventory',
+    sa.Column('property_id', sa.Integer(), nullable=False),
+    sa.Column('room_type_id', sa.Integer(), nullable=False),
+    sa.Column('night', sa.Date(), nullable=False),
+    sa.Column('sold', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('property_id', 'room_type_id', 'night', name='uq_room_type_inventory_night')
+    )
+    op.create_index(op.f('ix_room_type_inventory_id'), 'room_type_inventory', ['id'], unique=False)
+
+    # Backfill: copy each reservation's room type from its room, then count active stays per night
+    conn = op.get_bind()
+    conn.execute(sa.text(
+        "UPDATE reservations SET room_type_id = (SELECT rooms.type_id FROM rooms WHERE rooms.id = reservations.room_id) "
+        "WHERE room_type_id IS NULL AND room_id IS NOT NULL"
+    ))
+    reservations = sa.table('reservations',
+        sa.column('property_id', sa.Integer()), sa.column('room_type_id', sa.Integer()),
+        sa.column('check_in', sa.DateTime()), sa.column('check_out', sa.DateTime()), sa.column('status', sa.String()))
+    rows = conn.execute(
+        sa.select(reservations.c.property_id, reservations.c.room_type_id, reservations.c.check_in, reservations.c.check_out)
+        .where(reservations.c.room_type_id.isnot(None), reservations.c.status.in_(ACTIVE_STATUSES))
+    )
+    sold = Counter()
+    for property_id, room_type_id, check_in, check_out in rows:
+        for night in stay_nights(check_in, check_out):
+            sold[(property_id, room_type_id, night)] += 1
+    if sold:
+        inventory = sa.table('room_type_inventory',
+            sa.column('property_id', sa.Integer()), sa.column('room_type_id', sa.Integer()),
+            sa.column('night', sa.Date()), sa.column('sold', sa.Integer()),
+            sa.column('created_at', sa.DateTime()), sa.column('updated_at', sa.DateTime()))
+        now = datetime.utcnow()
+        op.bulk_insert(inventory, [
+            {"property_id": property_id, "room_type_id": room_type_id, "night": night, "sold": count,
+             "created_at": now, "updated_at": now}
+            for (property_id, room_type_id, night), count in sold.items()
+        ])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_room_type_inventory_id'), table_name='room_type_inventory')
+    op.drop_table('room_type_inventory')
+    op.drop_column('reservations', 'room_type_id')
@@ -0,0 +1,28 @@
+"""add reservation property check in index
+
+Revision ID: a7f2c8e1b563
+Revises: 5e9c13a7d4f2
+Create Date: 2026-10-18 16:58:21.447030
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7f2c8e1b563'
+down_revision: Union[str, None] = '5e9c13a7d4f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_reservations_property_check_in', 'reservations', ['property_id', 'check_in', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reservations_property_check_in', table_name='reservations')
@@ -0,0 +1,77 @@
+"""add amenity dictionary and room amenity mask
+
+Revision ID: b4c81e0f3a27
+Revises: 7d2e5a91c4f0
+Create Date: 2026-10-18 12:40:03.917254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4c81e0f3a27'
+down_revision: Union[str, None] = '7d2e5a91c4f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+MAX_AMENITY_BITS = 63
+
+
+def parse_amenities(value):
+    # Frozen copy of backend.room_service.amenities.parse_amenities
+    names = []
+    for part in (value or "").split(","):
+        name = part.strip().lower()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('amenities',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('bit', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name'),
+    sa.UniqueConstraint('bit')
+    )
+    op.create_index(op.f('ix_amenities_id'), 'amenities', ['id'], unique=False)
+    with op.batch_alter_table('rooms', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('amenity_mask', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill: assign bits in order of first appearance, then one executemany for the masks
+    conn = op.get_bind()
+    rows = conn.execute(sa.text("SELECT id, amenities FROM rooms WHERE amenities IS NOT NULL AND amenities != ''")).fetchall()
+    bits = {}
+    updates = []
+    for room_id, amenities in rows:
+        mask = 0
+        for name in parse_amenities(amenities):
+            if name not in bits:
+                if len(bits) >= MAX_AMENITY_BITS:
+                    raise RuntimeError(f"More than {MAX_AMENITY_BITS} distinct amenities; cannot backfill the bitmask")
+                bits[name] = len(bits)
+            mask |= 1 << bits[name]
+        updates.append({"id": room_id, "mask": mask})
+    if bits:
+        conn.execute(
+            sa.text("INSERT INTO amenities (name, bit, created_at, updated_at) VALUES (:name, :bit, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"),
+            [{"name": name, "bit": bit} for name, bit in bits.items()],
+        )
+    if updates:
+        conn.execute(sa.text("UPDATE rooms SET amenity_mask = :mask WHERE id = :id"), updates)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('rooms', schema=None) as batch_op:
+        batch_op.drop_column('amenity_mask')
+    op.drop_index(op.f('ix_amenities_id'), table_name='amenities')
+    op.drop_table('amenities')
@@ -0,0 +1,38 @@
+"""add room inventory versions
+
+Revision ID: e6a9d3f17b52
+Revises: b4c81e0f3a27
+Create Date: 2026-10-18 13:21:47.602318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6a9d3f17b52'
+down_revision: Union[str, None] = 'b4c81e0f3a27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('room_inventory_versions',
+    sa.Column('property_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('property_id')
+    )
+    op.create_index(op.f('ix_room_inventory_versions_id'), 'room_inventory_versions', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_room_inventory_versions_id'), table_name='room_inventory_versions')
+    op.drop_table('room_inventory_versions')
@@ -0,0 +1,28 @@
+"""add reservation property check out index
+
+Revision ID: f3c6d9a2e871
+Revises: a7f2c8e1b563
+Create Date: 2026-10-18 17:31:05.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c6d9a2e871'
+down_revision: Union[str, None] = 'a7f2c8e1b563'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_reservations_property_check_out', 'reservations', ['property_id', 'check_out'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_reservations_property_check_out', table_name='reservations')
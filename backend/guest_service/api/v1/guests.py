@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import io
+import json
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from backend.guest_service.schemas.guest import GuestCreate, GuestRead
-from backend.guest_service.services.guest_service import GuestService
+from backend.guest_service.schemas.guest import (BulkUpsertResult, GuestBatch, GuestBatchRequest, GuestCreate, GuestRead,
+                                                 GuestSuggestion)
+from backend.guest_service.services.guest_service import DEFAULT_AUTOCOMPLETE_LIMIT, DEFAULT_SEARCH_LIMIT, GuestService
 from backend.guest_service.models.guest import Guest
 from backend.core.base import Base
 from backend.guest_service.db import get_db
-from typing import List
+from typing import Iterator, List, Tuple, Union
 
 router = APIRouter()
 
@@ -17,6 +22,81 @@ def create_guest(guest: GuestCreate, service: GuestService = Depends(get_guest_s
     db_guest = service.create_or_update_guest(guest)
     return db_guest
 
+def json_rows(text: str) -> Iterator[Tuple[int, Union[dict, str]]]:
+    try:
+        rows = json.loads(text)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Expected a JSON array of guests")
+    for number, row in enumerate(rows, start=1):
+        yield number, row if isinstance(row, dict) else "Expected a JSON object"
+
+def ndjson_rows(text: str) -> Iterator[Tuple[int, Union[dict, str]]]:
+    for number, line in enumerate(text.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, f"Invalid JSON: {e}"
+            continue
+        yield number, row if isinstance(row, dict) else "Expected a JSON object"
+
+def csv_rows(text: str) -> Iterator[Tuple[int, Union[dict, str]]]:
+    # Empty cells leave the field unset, so an update keeps the stored value
+    for number, row in enumerate(csv.DictReader(io.StringIO(text)), start=1):
+        yield number, {key.strip(): value for key, value in row.items() if key and value not in (None, "")}
+
+BULK_PARSERS = {
+    "application/json": json_rows,
+    "application/x-ndjson": ndjson_rows,
+    "application/ndjson": ndjson_rows,
+    "text/csv": csv_rows,
+}
+
+@router.post("/guests/bulk", response_model=BulkUpsertResult, response_model_exclude_none=True)
+async def bulk_upsert_guests(request: Request, service: GuestService = Depends(get_guest_service)):
+    """Create or update many guests keyed on email from a JSON array, NDJSON or CSV body."""
+    content_type = request.headers.get("content-type", "application/json").split(";")[0].strip().lower()
+    parse = BULK_PARSERS.get(content_type)
+    if parse is None:
+        raise HTTPException(status_code=415, detail=f"Send one of: {', '.join(BULK_PARSERS)}")
+    try:
+        text = (await request.body()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Body must be UTF-8")
+    rows = list(parse(text))
+    return await run_in_threadpool(service.bulk_upsert, rows)
+
+# Most ids one batch lookup accepts
+MAX_BATCH_IDS = 1000
+
+def batch_get(guest_ids: List[int], service: GuestService) -> dict:
+    if len(set(guest_ids)) > MAX_BATCH_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_IDS} distinct ids per request")
+    return service.get_guests_by_ids(guest_ids)
+
+@router.get("/guests", response_model=GuestBatch)
+def get_guests(ids: str = Query(..., description="Comma-separated guest ids"), service: GuestService = Depends(get_guest_service)):
+    try:
+        guest_ids = [int(part) for part in ids.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    return batch_get(guest_ids, service)
+
+@router.post("/guests/batch-get", response_model=GuestBatch)
+def batch_get_guests(request: GuestBatchRequest, service: GuestService = Depends(get_guest_service)):
+    """Same as GET /guests?ids=, for id lists too long for a query string."""
+    return batch_get(request.ids, service)
+
+MAX_AUTOCOMPLETE_LIMIT = 50
+
+@router.get("/guests/autocomplete", response_model=List[GuestSuggestion])
+def autocomplete_guests(prefix: str = "", limit: int = Query(DEFAULT_AUTOCOMPLETE_LIMIT, ge=1, le=MAX_AUTOCOMPLETE_LIMIT),
+                        service: GuestService = Depends(get_guest_service)):
+    return service.autocomplete_guests(prefix, limit)
+
 @router.get("/guests/{guest_id}", response_model=GuestRead)
 def get_guest(guest_id: int, service: GuestService = Depends(get_guest_service)):
     guest = service.get_guest_by_id(guest_id)
@@ -24,6 +104,10 @@ def get_guest(guest_id: int, service: GuestService = Depends(get_guest_service))
         raise HTTPException(status_code=404, detail="Guest not found")
     return guest
 
+# Search results are ranked, so callers only ever need the first page
+MAX_SEARCH_LIMIT = 100
+
 @router.get("/guests/search/", response_model=List[GuestRead])
-def search_guests(q: str, service: GuestService = Depends(get_guest_service)):
-    return service.search_guest(q)
+def search_guests(q: str, limit: int = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+                  service: GuestService = Depends(get_guest_service)):
+    return service.search_guest(q, limit)
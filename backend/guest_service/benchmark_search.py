@@ -0,0 +1,70 @@
+# Benchmark: guest search over a large guest table, unindexed ILIKE scan vs the FTS5 trigram index
+# Run from the repo root: python -m backend.guest_service.benchmark_search [guests] [db_path]
+import os
+import random
+import sys
+import tempfile
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.core.base import Base
+from backend.guest_service.models.guest import Guest
+from backend.guest_service.repositories.guest_search import GuestSearchIndex, _backends, ensure_search_index
+from backend.room_service.models import Property
+
+FIRST = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+         "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen"]
+LAST = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+        "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin"]
+
+def seed(db, total, batch=50000):
+    rng = random.Random(42)
+    rows = []
+    for i in range(total):
+        first, last = rng.choice(FIRST), rng.choice(LAST)
+        rows.append({"first_name": first, "last_name": last, "email": f"{first}.{last}{i}@example.com".lower(),
+                     "phone": f"+1 {rng.randint(200, 999)} {rng.randint(1000000, 9999999)}"})
+        if len(rows) >= batch:
+            db.bulk_insert_mappings(Guest, rows)
+            rows = []
+    if rows:
+        db.bulk_insert_mappings(Guest, rows)
+    db.commit()
+
+def queries(total):
+    rng = random.Random(7)
+    # Rare terms (one guest's email or phone digits) and common ones (a surname)
+    return ([f"{rng.choice(FIRST)}.{rng.choice(LAST)}{rng.randrange(total)}@".lower() for _ in range(20)]
+            + [str(rng.randint(1000000, 9999999))[:5] for _ in range(20)]
+            + [rng.choice(LAST).lower() for _ in range(10)])
+
+def timeit(label, fn, cases):
+    start = time.perf_counter()
+    hits = sum(len(fn(q)) for q in cases)
+    elapsed = (time.perf_counter() - start) / len(cases)
+    print(f"{label:<18} {elapsed * 1e3:9.3f} ms/query  ({hits} rows)")
+    return elapsed
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.gettempdir(), f"guests_bench_{total}.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    if db.query(Guest).count() == 0:
+        started = time.perf_counter()
+        seed(db, total)
+        print(f"seeded {db.query(Guest).count()} guests in {time.perf_counter() - started:.1f}s ({path})")
+    started = time.perf_counter()
+    ensure_search_index(engine)
+    print(f"{'index build':<18} {time.perf_counter() - started:9.1f} s")
+    cases = queries(total)
+    search = GuestSearchIndex(db)
+    _backends[engine] = None
+    timeit("ILIKE scan", lambda q: search.search(q, 20), cases)
+    _backends[engine] = "fts5"
+    timeit("FTS5 trigram", lambda q: search.search(q, 20), cases)
+    db.close()
+
+if __name__ == "__main__":
+    main()
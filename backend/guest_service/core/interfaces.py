@@ -13,5 +13,5 @@ class IGuestService(ABC):
         pass
 
     @abstractmethod
-    def search_guest(self, query: str) -> List[Guest]:
+    def search_guest(self, query: str, limit: int = 20) -> List[Guest]:
         pass
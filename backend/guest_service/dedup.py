@@ -0,0 +1,204 @@
+# Batch job: find guest profiles that are probably the same person
+# Run from the repo root: python -m backend.guest_service.dedup [db_path] [threshold]
+import json
+import re
+import sys
+import zlib
+from collections import Counter
+from math import sqrt
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import bindparam, create_engine, text
+from sqlalchemy.engine import Connection, Engine
+from backend.guest_service.services.autocomplete import normalize
+
+try:
+    import numpy as np
+except ImportError:  # Optional: fall back to exact cosine over trigram counters
+    np = None
+
+# Block kinds, stored as bits so a pair remembers every block it shared
+PHONE, EMAIL, NAME = 1, 2, 4
+KIND_NAMES = {PHONE: "phone", EMAIL: "email", NAME: "name"}
+
+# Blocks bigger than this (a shared front-desk phone, "info@" addresses) say little and would cost O(size²)
+MAX_BLOCK_SIZE = 50
+# Width of the hashed trigram vectors used by the NumPy scorer
+VECTOR_DIMS = 1024
+
+SOUNDEX_CODES = {c: digit for digit, letters in
+                 {"1": "bfpv", "2": "cgjkqsxz", "3": "dt", "4": "l", "5": "mn", "6": "r"}.items() for c in letters}
+
+def soundex(name: Optional[str]) -> str:
+    """American Soundex: first letter plus three digits, so Jon and John share J500."""
+    letters = [c for c in normalize(name) if "a" <= c <= "z"]
+    if not letters:
+        return ""
+    code, last = letters[0].upper(), SOUNDEX_CODES.get(letters[0], "")
+    for c in letters[1:]:
+        digit = SOUNDEX_CODES.get(c, "")
+        if digit and digit != last:
+            code += digit
+        if c not in "hw":
+            last = digit
+    return (code + "000")[:4]
+
+def normalize_phone(phone: Optional[str]) -> str:
+    # The last ten digits, so "+1 (555) 010-0199" and "5550100199" agree; too short to mean anything is empty
+    digits = re.sub(r"\D", "", phone or "")
+    return digits[-10:] if len(digits) >= 7 else ""
+
+def normalize_email(email: Optional[str]) -> str:
+    local, _, domain = normalize(email).partition("@")
+    local = local.split("+", 1)[0].replace(".", "")
+    return f"{local}@{domain}" if local else ""
+
+def blocking_keys(first_name: str, last_name: str, email: Optional[str], phone: Optional[str]) -> List[Tuple[str, int]]:
+    keys = []
+    if normalize_phone(phone):
+        keys.append((normalize_phone(phone), PHONE))
+    local = normalize_email(email).partition("@")[0]
+    if local:
+        keys.append((local, EMAIL))
+    if soundex(last_name):
+        keys.append((soundex(first_name) + soundex(last_name), NAME))
+    return keys
+
+def trigrams(value: str) -> List[str]:
+    padded = f"  {value} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)] if value else []
+
+def similarity(left: Sequence[str], right: Sequence[str]) -> List[float]:
+    """Cosine similarity of character trigram counts for each (left[i], right[i]) pair."""
+    if np is not None:
+        a, b = trigram_vectors(left), trigram_vectors(right)
+        return (a * b).sum(axis=1).tolist()
+    scores = []
+    for x, y in zip(left, right):
+        cx, cy = Counter(trigrams(x)), Counter(trigrams(y))
+        norm = sqrt(sum(v * v for v in cx.values()) * sum(v * v for v in cy.values()))
+        scores.append(sum(v * cy[g] for g, v in cx.items()) / norm if norm else 0.0)
+    return scores
+
+def trigram_vectors(values: Sequence[str]):
+    # Hashed bag of trigrams, one L2-normalized row per value
+    rows, cols = [], []
+    for i, value in enumerate(values):
+        for gram in trigrams(value):
+            rows.append(i)
+            cols.append(zlib.crc32(gram.encode()) % VECTOR_DIMS)
+    matrix = np.zeros((len(values), VECTOR_DIMS), dtype=np.float32)
+    np.add.at(matrix, (np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64)), 1.0)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+class GuestDeduplicator:
+    """Finds likely duplicate guests without comparing every pair.
+
+    Guests are read in id order, ``chunk_size`` at a time. Each guest gets up
+    to three blocking keys: normalized phone, email local part, and a Soundex
+    key of first and last name. The keys go into a temporary table. The
+    database then joins each block with itself to produce candidate pairs,
+    skipping blocks larger than ``max_block_size``. A pair found through
+    several blocks is stored once. The pairs are read back in chunks, and the
+    two profiles in each pair are scored with one vectorized trigram-cosine
+    pass over names and emails, plus an exact phone comparison.
+
+    Memory stays bounded by the chunk size, and the work is linear in the
+    number of guests times the block size. The job only reports candidates:
+    merging profiles moves reservations in another service, so a person or a
+    follow-up job decides. The lower id, the older profile, is suggested as
+    the one to keep.
+    """
+
+    def __init__(self, engine: Engine, threshold: float = 0.6, chunk_size: int = 1000,
+                 max_block_size: int = MAX_BLOCK_SIZE):
+        self.engine = engine
+        self.threshold = threshold
+        self.chunk_size = chunk_size
+        self.max_block_size = max_block_size
+
+    def _load_blocks(self, conn: Connection) -> None:
+        last_id = 0
+        while True:
+            guests = conn.execute(text(
+                "SELECT id, first_name, last_name, email, phone FROM guests WHERE id > :after ORDER BY id LIMIT :n"
+            ), {"after": last_id, "n": self.chunk_size}).all()
+            if not guests:
+                return
+            keys = [{"key": key, "kind": kind, "id": guest_id}
+                    for guest_id, first, last, email, phone in guests
+                    for key, kind in blocking_keys(first, last, email, phone)]
+            if keys:
+                conn.execute(text("INSERT INTO dedup_blocks (block_key, kind, guest_id) VALUES (:key, :kind, :id)"), keys)
+            last_id = guests[-1][0]
+
+    def _pair_blocks(self, conn: Connection) -> None:
+        conn.execute(text("CREATE INDEX ix_dedup_blocks_key ON dedup_blocks (kind, block_key, guest_id)"))
+        conn.execute(text(
+            "INSERT INTO dedup_pairs (a, b, kinds) "
+            "SELECT x.guest_id, y.guest_id, x.kind FROM dedup_blocks x "
+            "JOIN dedup_blocks y ON y.kind = x.kind AND y.block_key = x.block_key AND y.guest_id > x.guest_id "
+            "WHERE (x.kind, x.block_key) IN ("
+            "  SELECT kind, block_key FROM dedup_blocks GROUP BY kind, block_key HAVING count(*) BETWEEN 2 AND :max_size) "
+            "ON CONFLICT (a, b) DO UPDATE SET kinds = dedup_pairs.kinds | excluded.kinds"
+        ), {"max_size": self.max_block_size})
+
+    def score(self, pairs: List[Tuple[int, int, int]], guests: Dict[int, tuple]) -> List[dict]:
+        left = [guests[a] for a, _, _ in pairs]
+        right = [guests[b] for _, b, _ in pairs]
+        names = similarity([normalize(f"{g[1]} {g[2]}") for g in left], [normalize(f"{g[1]} {g[2]}") for g in right])
+        emails = similarity([normalize_email(g[3]) for g in left], [normalize_email(g[3]) for g in right])
+        candidates = []
+        for (a, b, kinds), x, y, name, email in zip(pairs, left, right, names, emails):
+            phone_x, phone_y = normalize_phone(x[4]), normalize_phone(y[4])
+            # A phone only counts when both profiles have one
+            total, weight = 0.5 * name + 0.3 * email, 0.8
+            if phone_x and phone_y:
+                total, weight = total + 0.2 * (phone_x == phone_y), 1.0
+            score = round(total / weight, 3)
+            if score >= self.threshold:
+                candidates.append({"keep_id": a, "duplicate_id": b, "score": score,
+                                   "matched_on": [label for bit, label in KIND_NAMES.items() if kinds & bit]})
+        return candidates
+
+    def candidates(self) -> Iterator[List[dict]]:
+        """Yield chunks of merge candidates, ordered by (keep_id, duplicate_id)."""
+        with self.engine.connect() as conn:
+            conn.execute(text("CREATE TEMPORARY TABLE dedup_blocks (block_key VARCHAR NOT NULL, kind INTEGER NOT NULL, "
+                              "guest_id INTEGER NOT NULL)"))
+            conn.execute(text("CREATE TEMPORARY TABLE dedup_pairs (a INTEGER NOT NULL, b INTEGER NOT NULL, "
+                              "kinds INTEGER NOT NULL, PRIMARY KEY (a, b))"))
+            try:
+                self._load_blocks(conn)
+                self._pair_blocks(conn)
+                after = (0, 0)
+                while True:
+                    pairs = [tuple(row) for row in conn.execute(text(
+                        "SELECT a, b, kinds FROM dedup_pairs WHERE a > :a OR (a = :a AND b > :b) ORDER BY a, b LIMIT :n"
+                    ), {"a": after[0], "b": after[1], "n": self.chunk_size})]
+                    if not pairs:
+                        break
+                    ids = list({i for a, b, _ in pairs for i in (a, b)})
+                    guests = {row[0]: tuple(row) for row in conn.execute(
+                        text("SELECT id, first_name, last_name, email, phone FROM guests WHERE id IN :ids")
+                        .bindparams(bindparam("ids", expanding=True)), {"ids": ids})}
+                    # Guests deleted since the blocks were built drop out
+                    found = self.score([p for p in pairs if p[0] in guests and p[1] in guests], guests)
+                    if found:
+                        yield found
+                    after = pairs[-1][:2]
+            finally:
+                conn.execute(text("DROP TABLE IF EXISTS dedup_pairs"))
+                conn.execute(text("DROP TABLE IF EXISTS dedup_blocks"))
+                conn.commit()
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else "./guest_service.db"
+    threshold = float(sys.argv[2]) if len(sys.argv) > 2 else 0.6
+    # One JSON line per candidate, so the output can be reviewed or fed to a merge step as it streams
+    for chunk in GuestDeduplicator(create_engine(f"sqlite:///{path}"), threshold=threshold).candidates():
+        for candidate in chunk:
+            print(json.dumps(candidate))
+
+if __name__ == "__main__":
+    main()
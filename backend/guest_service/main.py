@@ -1,12 +1,24 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from backend.guest_service.api.v1 import guests
 from backend.core.base import Base
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from backend.room_service.models import Property  # Use canonical Property model
+from backend.guest_service.repositories.guest_search import ensure_search_index
+from backend.guest_service.services.autocomplete import guest_autocomplete
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Guests are not under alembic; tables and the search index are created (and back-filled) on startup, not on import
+    Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
+    # Built before the first request, so no autocomplete call pays for reading every guest
+    guest_autocomplete.refresh()
+    yield
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(guests.router, prefix="/api/v1", tags=["guests"])
 
 # Dependency for DB session (for demo, use SQLite in-memory)
@@ -14,8 +26,6 @@ DATABASE_URL = "sqlite:///./guest_service.db"
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-Base.metadata.create_all(bind=engine)
-
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],
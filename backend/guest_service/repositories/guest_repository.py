@@ -1,17 +1,35 @@
 from backend.guest_service.models.guest import Guest
+from backend.guest_service.repositories.guest_search import GuestSearchIndex
+from backend.guest_service.services.autocomplete import GuestAutocomplete
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
 
 class GuestRepository:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, autocomplete: Optional[GuestAutocomplete] = None):
         self.db = db
+        self.search = GuestSearchIndex(db)
+        # Told about every committed write, so it never serves a deleted or renamed guest
+        self.autocomplete = autocomplete
 
     def get(self, guest_id: int) -> Optional[Guest]:
         return self.db.query(Guest).filter(Guest.id == guest_id).first()
 
+    def get_many(self, guest_ids: List[int]) -> List[Guest]:
+        # One IN query for a batch of ids
+        if not guest_ids:
+            return []
+        return self.db.query(Guest).filter(Guest.id.in_(guest_ids)).all()
+
     def get_by_email(self, email: str) -> Optional[Guest]:
         return self.db.query(Guest).filter(Guest.email == email).first()
 
+    def email_ids(self, emails: List[str]) -> Dict[str, int]:
+        # One IN query; callers keep batches well under the bound-parameter limit
+        if not emails:
+            return {}
+        return dict(self.db.query(Guest.email, Guest.id).filter(Guest.email.in_(emails)).all())
+
     def list(self, property_id: Optional[int] = None) -> List[Guest]:
         query = self.db.query(Guest)
         if property_id:
@@ -22,6 +40,8 @@ class GuestRepository:
         self.db.add(guest)
         self.db.commit()
         self.db.refresh(guest)
+        if self.autocomplete:
+            self.autocomplete.put(guest)
         return guest
 
     def update(self, guest: Guest, data: dict) -> Guest:
@@ -29,8 +49,34 @@ class GuestRepository:
             setattr(guest, key, value)
         self.db.commit()
         self.db.refresh(guest)
+        if self.autocomplete:
+            self.autocomplete.put(guest)
         return guest
 
     def delete(self, guest: Guest):
+        guest_id = guest.id
         self.db.delete(guest)
         self.db.commit()
+        if self.autocomplete:
+            self.autocomplete.remove(guest_id)
+
+    def bulk_write(self, inserts: List[dict], updates: List[dict]) -> Tuple[Dict[str, int], List[tuple]]:
+        """Apply one batch with executemany and commit it.
+
+        ``updates`` carry the guest id plus the columns to change. Returns the
+        new ids by email and the (id, first_name, last_name, email, phone) rows
+        written.
+        """
+        created: Dict[str, int] = {}
+        if inserts:
+            result = self.db.execute(insert(Guest).returning(Guest.id, Guest.email), inserts)
+            created = {email: guest_id for guest_id, email in result}
+        if updates:
+            self.db.execute(update(Guest), updates)
+        ids = list(created.values()) + [row["id"] for row in updates]
+        rows = [tuple(row) for row in self.db.query(Guest.id, Guest.first_name, Guest.last_name, Guest.email, Guest.phone)
+                .filter(Guest.id.in_(ids))] if ids else []
+        self.db.commit()
+        if self.autocomplete:
+            self.autocomplete.put_many([row[:4] for row in rows])
+        return created, rows
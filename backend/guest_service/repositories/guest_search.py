@@ -0,0 +1,138 @@
+import weakref
+from backend.guest_service.models.guest import Guest
+from sqlalchemy import func, or_, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+# Trigram indexes cannot serve shorter queries; those fall back to a bounded scan
+MIN_INDEXED_QUERY = 3
+
+FTS_TABLE = "guests_fts"
+TRGM_INDEX = "ix_guests_search_trgm"
+# One lowercased text per guest for the Postgres trigram index; the query must repeat this expression exactly
+TRGM_EXPRESSION = (
+    "lower(first_name || ' ' || last_name || ' ' || coalesce(email, '') || ' ' || coalesce(phone, ''))"
+)
+
+# Engine -> "fts5", "trgm" or None, looked up once per engine
+_backends: "weakref.WeakKeyDictionary[Engine, Optional[str]]" = weakref.WeakKeyDictionary()
+
+FTS_COLUMNS = "rowid, first_name, last_name, email, phone"
+# SQLite keeps the FTS table in step with guests itself, so raw SQL writers (populate_sample_data.py) are indexed too
+FTS_TRIGGERS = {
+    "guests_fts_ai": f"""CREATE TRIGGER guests_fts_ai AFTER INSERT ON guests BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_COLUMNS})
+        VALUES (new.id, new.first_name, new.last_name, coalesce(new.email, ''), coalesce(new.phone, ''));
+    END""",
+    "guests_fts_au": f"""CREATE TRIGGER guests_fts_au AFTER UPDATE ON guests BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {FTS_TABLE} ({FTS_COLUMNS})
+        VALUES (new.id, new.first_name, new.last_name, coalesce(new.email, ''), coalesce(new.phone, ''));
+    END""",
+    "guests_fts_ad": f"""CREATE TRIGGER guests_fts_ad AFTER DELETE ON guests BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END""",
+}
+
+def ensure_search_index(engine: Engine) -> Optional[str]:
+    """Create the guest search index for this database if it is missing, filling it from existing guests.
+
+    SQLite gets an FTS5 table with the trigram tokenizer, which matches
+    substrings case-insensitively like the old ILIKE search did, kept current
+    by triggers on guests. PostgreSQL gets a pg_trgm GIN index. Other
+    databases, or SQLite builds without FTS5, keep the unindexed search.
+    """
+    dialect = engine.dialect.name
+    with engine.begin() as conn:
+        if dialect == "sqlite":
+            names = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE name LIKE 'guests_fts%'"))}
+            if FTS_TABLE not in names:
+                try:
+                    conn.execute(text(
+                        f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(first_name, last_name, email, phone, tokenize='trigram')"
+                    ))
+                except Exception:
+                    _backends[engine] = None
+                    return None
+            missing = [name for name in FTS_TRIGGERS if name not in names]
+            if missing:
+                # Rows written while a trigger was absent are unknown, so refill from scratch
+                for name in missing:
+                    conn.execute(text(FTS_TRIGGERS[name]))
+                conn.execute(text(f"DELETE FROM {FTS_TABLE}"))
+                conn.execute(text(
+                    f"INSERT INTO {FTS_TABLE} ({FTS_COLUMNS}) "
+                    "SELECT id, first_name, last_name, coalesce(email, ''), coalesce(phone, '') FROM guests"
+                ))
+            backend = "fts5"
+        elif dialect == "postgresql":
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {TRGM_INDEX} ON guests USING gin (({TRGM_EXPRESSION}) gin_trgm_ops)"))
+            backend = "trgm"
+        else:
+            backend = None
+    _backends[engine] = backend
+    return backend
+
+def search_backend(db: Session) -> Optional[str]:
+    engine = db.get_bind()
+    if engine not in _backends:
+        backend = None
+        if engine.dialect.name == "sqlite":
+            if db.execute(text("SELECT 1 FROM sqlite_master WHERE name = :name"), {"name": FTS_TABLE}).first():
+                backend = "fts5"
+        elif engine.dialect.name == "postgresql":
+            if db.execute(text("SELECT 1 FROM pg_indexes WHERE indexname = :name"), {"name": TRGM_INDEX}).first():
+                backend = "trgm"
+        _backends[engine] = backend
+    return _backends[engine]
+
+class GuestSearchIndex:
+    """Ranked guest search over first name, last name, email and phone.
+
+    Both indexes are maintained by the database: triggers copy every guest
+    write into the SQLite FTS5 table inside the writer's transaction, and
+    Postgres updates its trigram index itself. Writers need not know the
+    index exists.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    @property
+    def backend(self) -> Optional[str]:
+        return search_backend(self.db)
+
+    def search(self, query: str, limit: int) -> List[Guest]:
+        term = query.strip().lower()
+        backend = self.backend
+        if backend == "fts5" and len(term) >= MIN_INDEXED_QUERY:
+            # A quoted phrase: trigram FTS5 then matches it as a substring of any column
+            phrase = '"' + term.replace('"', '""') + '"'
+            ids = [row[0] for row in self.db.execute(
+                text(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :q ORDER BY rank LIMIT :limit"),
+                {"q": phrase, "limit": limit},
+            )]
+            return self.in_order(ids)
+        if backend == "trgm" and len(term) >= MIN_INDEXED_QUERY:
+            expression = text(TRGM_EXPRESSION)
+            return self.db.query(Guest).filter(
+                text(f"{TRGM_EXPRESSION} LIKE :pattern").bindparams(pattern=f"%{escape_like(term)}%")
+            ).order_by(func.similarity(expression, term).desc(), Guest.id).limit(limit).all()
+        pattern = f"%{escape_like(term)}%"
+        return self.db.query(Guest).filter(or_(
+            Guest.first_name.ilike(pattern, escape="\\"),
+            Guest.last_name.ilike(pattern, escape="\\"),
+            Guest.email.ilike(pattern, escape="\\"),
+            Guest.phone.ilike(pattern, escape="\\"),
+        )).order_by(Guest.id).limit(limit).all()
+
+    def in_order(self, ids: List[int]) -> List[Guest]:
+        if not ids:
+            return []
+        guests = {g.id: g for g in self.db.query(Guest).filter(Guest.id.in_(ids))}
+        return [guests[i] for i in ids if i in guests]
+
+def escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
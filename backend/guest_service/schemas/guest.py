@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import List, Optional
 
 class GuestBase(BaseModel):
     property_id: Optional[int] = None
@@ -17,3 +17,27 @@ class GuestRead(GuestBase):
 
     class Config:
         orm_mode = True
+
+class GuestBatchRequest(BaseModel):
+    ids: List[int]
+
+class GuestBatch(BaseModel):
+    guests: List[GuestRead]  # in request order, each id once
+    missing: List[int]
+
+class GuestSuggestion(BaseModel):
+    id: int
+    name: str
+
+class BulkUpsertRow(BaseModel):
+    row: int
+    status: str  # created, updated or error
+    id: Optional[int] = None
+    email: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkUpsertResult(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: List[BulkUpsertRow]
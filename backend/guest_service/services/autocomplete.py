@@ -0,0 +1,204 @@
+# In-memory prefix index of guest names and emails for type-ahead lookups
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from backend.guest_service.db import SessionLocal
+from backend.guest_service.models.guest import Guest
+
+def normalize(value: Optional[str]) -> str:
+    """Accent-free, case-folded, single-spaced form used for keys and prefixes."""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+class GuestAutocomplete:
+    """Sorted array of (key, guest id) pairs, searched with bisect.
+
+    Every guest gets three keys: "first last", the last name on its own, and
+    the email. A prefix lookup bisects to the first key at or after the
+    prefix and walks forward while keys still start with it, so it costs
+    O(log n + limit) and never touches the database. Shorter keys sort first,
+    so exact matches come before longer ones.
+
+    The app builds the array on startup with ``refresh``. Guest writes in this
+    process keep it current through ``put``, ``put_many`` and ``remove``,
+    called once the write has committed. Every ``ttl`` seconds a lookup also
+    compares the guests table's row count, highest id and latest update with
+    the ones seen at the last build, and rebuilds when another process has
+    changed them. That check can miss a change which leaves all three equal,
+    such as a row deleted and its id reused within the same second, so the
+    array is also rebuilt unconditionally once it is ``max_age`` seconds old.
+    Only the lookup doing a check or rebuild waits for it; the others keep
+    reading the current array, and writes made during a rebuild are replayed
+    on top of it.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, ttl: float = 30.0,
+                 max_age: float = 600.0):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        # Held for a whole build so only one thread reads the table at a time
+        self._build_lock = threading.Lock()
+        self._entries: Optional[List[Tuple[str, int]]] = None
+        self._guests: Dict[int, Tuple[str, Tuple[str, ...]]] = {}
+        self._version: Optional[tuple] = None
+        self._check_after = 0.0
+        self._built_at = 0.0
+        # (guest id, row or None) writes seen while a build is reading the table
+        self._replay: Optional[List[Tuple[int, Optional[tuple]]]] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._entries is not None
+
+    def __len__(self) -> int:
+        return len(self._guests)
+
+    @staticmethod
+    def _keys(first_name: str, last_name: str, email: Optional[str]) -> Tuple[str, ...]:
+        keys = {normalize(f"{first_name} {last_name}"), normalize(last_name), normalize(email)}
+        keys.discard("")
+        return tuple(keys)
+
+    @staticmethod
+    def _version_of(db: Session) -> tuple:
+        return tuple(db.query(func.count(Guest.id), func.max(Guest.id), func.max(Guest.updated_at)).one())
+
+    def _build(self, db: Session, version: tuple) -> None:
+        # Called with _build_lock held; lookups keep using the old array meanwhile
+        with self._lock:
+            self._replay = []
+        try:
+            rows = db.query(Guest.id, Guest.first_name, Guest.last_name, Guest.email).all()
+            entries, guests = [], {}
+            for guest_id, first_name, last_name, email in rows:
+                keys = self._keys(first_name, last_name, email)
+                guests[guest_id] = (f"{first_name} {last_name}".strip(), keys)
+                entries.extend((key, guest_id) for key in keys)
+            entries.sort()
+            with self._lock:
+                self._entries, self._guests, self._version = entries, guests, version
+                for guest_id, row in self._replay:
+                    self._set(guest_id, row)
+        finally:
+            with self._lock:
+                self._replay = None
+        self._built_at = time.monotonic()
+        self._check_after = self._built_at + self.ttl
+
+    def refresh(self) -> None:
+        """Rebuild the array from the database now."""
+        with self._build_lock:
+            db = self.session_factory()
+            try:
+                # Read the version first: a write landing in between only causes one extra rebuild later
+                self._build(db, self._version_of(db))
+            finally:
+                db.close()
+
+    def _maintain(self) -> None:
+        if self._entries is not None and time.monotonic() < self._check_after:
+            return
+        # The first load makes every caller wait; a staleness check is done by one caller while the rest move on
+        if not self._build_lock.acquire(blocking=self._entries is None):
+            return
+        try:
+            if self._entries is not None and time.monotonic() < self._check_after:
+                return
+            db = self.session_factory()
+            try:
+                version = self._version_of(db)
+                fresh = time.monotonic() - self._built_at < self.max_age
+                if self._entries is not None and version == self._version and fresh:
+                    self._check_after = time.monotonic() + self.ttl
+                else:
+                    self._build(db, version)
+            finally:
+                db.close()
+        finally:
+            self._build_lock.release()
+
+    def _drop(self, guest_id: int) -> None:
+        previous = self._guests.pop(guest_id, None)
+        if previous is None:
+            return
+        for key in previous[1]:
+            i = bisect_left(self._entries, (key, guest_id))
+            if i < len(self._entries) and self._entries[i] == (key, guest_id):
+                del self._entries[i]
+
+    def _set(self, guest_id: int, row: Optional[tuple]) -> None:
+        self._drop(guest_id)
+        if row is None:
+            return
+        first_name, last_name, email = row
+        keys = self._keys(first_name, last_name, email)
+        self._guests[guest_id] = (f"{first_name} {last_name}".strip(), keys)
+        for key in keys:
+            insort(self._entries, (key, guest_id))
+
+    def put(self, guest: Guest) -> None:
+        row = (guest.first_name, guest.last_name, guest.email)
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((guest.id, row))
+            # Not loaded yet: the first build reads this guest from the database
+            if self._entries is not None:
+                self._set(guest.id, row)
+
+    def put_many(self, rows: List[tuple]) -> None:
+        """Add or replace (id, first_name, last_name, email) rows in one pass and one sort, for bulk writes."""
+        with self._lock:
+            if self._replay is not None:
+                self._replay.extend((row[0], tuple(row[1:])) for row in rows)
+            if self._entries is None or not rows:
+                return
+            replaced = {row[0] for row in rows}
+            entries = [entry for entry in self._entries if entry[1] not in replaced]
+            for guest_id, first_name, last_name, email in rows:
+                keys = self._keys(first_name, last_name, email)
+                self._guests[guest_id] = (f"{first_name} {last_name}".strip(), keys)
+                entries.extend((key, guest_id) for key in keys)
+            entries.sort()
+            self._entries = entries
+
+    def remove(self, guest_id: int) -> None:
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((guest_id, None))
+            if self._entries is not None:
+                self._drop(guest_id)
+
+    def invalidate(self) -> None:
+        # The next lookup checks the database version instead of waiting out the ttl
+        self._check_after = 0.0
+
+    def lookup(self, prefix: str, limit: int = 10) -> List[Tuple[int, str]]:
+        """Up to ``limit`` (guest id, display name) pairs whose name or email starts with ``prefix``."""
+        prefix = normalize(prefix)
+        if not prefix or limit <= 0:
+            return []
+        self._maintain()
+        with self._lock:
+            entries = self._entries
+            found: Dict[int, str] = {}
+            i = bisect_left(entries, (prefix,))
+            while i < len(entries) and len(found) < limit:
+                key, guest_id = entries[i]
+                if not key.startswith(prefix):
+                    break
+                if guest_id not in found:
+                    found[guest_id] = self._guests[guest_id][0]
+                i += 1
+        return list(found.items())
+
+# Process-wide index shared by all requests; built in the app lifespan
+guest_autocomplete = GuestAutocomplete()
@@ -1,30 +1,108 @@
 from backend.guest_service.repositories.guest_repository import GuestRepository
+from backend.guest_service.services.autocomplete import GuestAutocomplete, guest_autocomplete
 from backend.guest_service.schemas.guest import GuestCreate
 from backend.guest_service.models.guest import Guest
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Iterable, Optional, List, Tuple, Union
+
+DEFAULT_SEARCH_LIMIT = 20
+DEFAULT_AUTOCOMPLETE_LIMIT = 10
+# Rows per IN lookup and per commit in bulk upserts
+BULK_CHUNK_SIZE = 1000
+
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors())
 
 class GuestService:
-    def __init__(self, db: Session):
-        self.repo = GuestRepository(db)
+    def __init__(self, db: Session, autocomplete: GuestAutocomplete = guest_autocomplete):
+        self.repo = GuestRepository(db, autocomplete=autocomplete)
+        self.autocomplete = autocomplete
 
     def create_or_update_guest(self, data: GuestCreate) -> Guest:
         existing = self.repo.get_by_email(data.email)
         if existing:
             return self.repo.update(existing, data.dict(exclude_unset=True))
-        guest = Guest(**data.dict())
-        return self.repo.create(guest)
+        return self.repo.create(Guest(**data.dict()))
 
     def get_guest_by_id(self, guest_id: int) -> Optional[Guest]:
         return self.repo.get(guest_id)
 
-    def search_guest(self, query: str) -> List[Guest]:
+    def get_guests_by_ids(self, guest_ids: List[int]) -> dict:
+        """Guests for distinct ``guest_ids`` in request order, plus the ids that matched no guest."""
+        ids = list(dict.fromkeys(guest_ids))
+        found = {guest.id: guest for guest in self.repo.get_many(ids)}
+        return {"guests": [found[i] for i in ids if i in found], "missing": [i for i in ids if i not in found]}
+
+    def search_guest(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Guest]:
         # Return empty list if query is empty or only whitespace
         if not query or not query.strip():
             return []
-        q = f"%{query.lower()}%"
-        return self.repo.db.query(Guest).filter(
-            (Guest.first_name.ilike(q)) |
-            (Guest.last_name.ilike(q)) |
-            (Guest.email.ilike(q))
-        ).all()
+        return self.repo.search.search(query, limit)
+
+    def autocomplete_guests(self, prefix: str, limit: int = DEFAULT_AUTOCOMPLETE_LIMIT) -> List[dict]:
+        # Served from memory; the session is never used
+        return [{"id": guest_id, "name": name} for guest_id, name in self.autocomplete.lookup(prefix, limit)]
+
+    def bulk_upsert(self, rows: Iterable[Tuple[int, Union[dict, str]]], chunk_size: int = BULK_CHUNK_SIZE) -> dict:
+        """Create or update guests keyed on email, one chunk per transaction.
+
+        ``rows`` yields (row number, fields) pairs, or (row number, error) for
+        rows that could not be parsed. Like the single-guest path, an update
+        only changes the fields a row sets. A repeated email later in the
+        upload updates the guest created or updated by the earlier row. A chunk
+        that fails to write is rolled back and reported row by row; the chunks
+        before it stay committed.
+        """
+        results: List[dict] = []
+        chunk: List[Tuple[int, Union[dict, str]]] = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                results.extend(self._upsert_chunk(chunk))
+                chunk = []
+        if chunk:
+            results.extend(self._upsert_chunk(chunk))
+        counts = {"created": 0, "updated": 0, "failed": 0}
+        for result in results:
+            counts["failed" if result["status"] == "error" else result["status"]] += 1
+        return {**counts, "results": results}
+
+    def _upsert_chunk(self, chunk: List[Tuple[int, Union[dict, str]]]) -> List[dict]:
+        results, parsed = [], []
+        for row_number, fields in chunk:
+            if isinstance(fields, str):
+                results.append({"row": row_number, "status": "error", "error": fields})
+                continue
+            try:
+                data = GuestCreate(**fields)
+            except ValidationError as e:
+                results.append({"row": row_number, "email": fields.get("email"), "status": "error",
+                                "error": validation_message(e)})
+                continue
+            parsed.append((row_number, data))
+        existing = self.repo.email_ids(list({data.email for _, data in parsed}))
+        inserts, updates, written = {}, {}, []
+        for row_number, data in parsed:
+            result = {"row": row_number, "email": data.email}
+            if data.email in existing:
+                updates.setdefault(data.email, {"id": existing[data.email]}).update(data.dict(exclude_unset=True))
+                result["status"] = "updated"
+            elif data.email in inserts:
+                inserts[data.email].update(data.dict(exclude_unset=True))
+                result["status"] = "updated"
+            else:
+                inserts[data.email] = data.dict()
+                result["status"] = "created"
+            written.append(result)
+        try:
+            created, _ = self.repo.bulk_write(list(inserts.values()), list(updates.values()))
+        except SQLAlchemyError as e:
+            self.repo.db.rollback()
+            error = f"Chunk rolled back: {type(e).__name__}"
+            written = [{"row": r["row"], "email": r["email"], "status": "error", "error": error} for r in written]
+            return sorted(results + written, key=lambda r: r["row"])
+        for result in written:
+            result["id"] = existing.get(result["email"]) or created[result["email"]]
+        return sorted(results + written, key=lambda r: r["row"])
@@ -0,0 +1,27 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from backend.core.base import Base
+from backend.guest_service.db import get_db
+from backend.guest_service.main import app
+from backend.guest_service.repositories.guest_search import ensure_search_index
+from backend.room_service.models import Property
+
+@pytest.fixture(scope="session", autouse=True)
+def app_database():
+    # API tests write to their own database, never to the guest_service.db checked into the repo
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    def get_test_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+    app.dependency_overrides[get_db] = get_test_db
+    yield engine
+    app.dependency_overrides.pop(get_db, None)
+    engine.dispose()
@@ -0,0 +1,120 @@
+import time
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from backend.core.base import Base
+from backend.guest_service.api.v1 import guests as api
+from backend.guest_service.main import app
+from backend.guest_service.models.guest import Guest
+from backend.guest_service.schemas.guest import GuestCreate
+from backend.guest_service.services.autocomplete import GuestAutocomplete, normalize
+from backend.guest_service.services.guest_service import GuestService
+from backend.room_service.models import Property
+
+@pytest.fixture(scope="function")
+def sessions():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = factory()
+    db.add_all([Guest(first_name="José", last_name="Álvarez", email="jose@example.com"),
+                Guest(first_name="Josephine", last_name="Baker", email="jbaker@example.com"),
+                Guest(first_name="Mary", last_name="Jones", email="mary@jo.net")])
+    db.commit()
+    db.close()
+    return factory
+
+def names(results):
+    return [name for _, name in results]
+
+def test_normalize():
+    assert normalize("  José   ÁLVAREZ ") == "jose alvarez"
+    assert normalize(None) == ""
+
+def test_lookup_builds_on_first_use_and_matches_names_and_emails(sessions):
+    index = GuestAutocomplete(sessions)
+    assert not index.loaded
+    assert names(index.lookup("jo")) == ["Mary Jones", "José Álvarez", "Josephine Baker"]  # key order: jones, jose, josephine
+    assert index.loaded and len(index) == 3
+    assert names(index.lookup("alv")) == ["José Álvarez"]
+    assert names(index.lookup("JBAKER@")) == ["Josephine Baker"]
+    assert names(index.lookup("jos", limit=1)) == ["José Álvarez"]
+    assert index.lookup("") == [] and index.lookup("zzz") == []
+
+def test_writes_update_a_loaded_index(sessions):
+    index = GuestAutocomplete(sessions)
+    db = sessions()
+    service = GuestService(db, autocomplete=index)
+    service.create_or_update_guest(GuestCreate(first_name="Early", last_name="Bird", email="early@example.com"))
+    assert not index.loaded  # nothing to update yet; the first lookup reads the database
+    assert names(index.lookup("early")) == ["Early Bird"]
+    guest = service.create_or_update_guest(GuestCreate(first_name="Zed", last_name="Quinn", email="zed@example.com"))
+    assert index.lookup("qui") == [(guest.id, "Zed Quinn")]
+    service.create_or_update_guest(GuestCreate(first_name="Zed", last_name="Renamed", email="zed@example.com"))
+    assert index.lookup("qui") == []
+    assert names(index.lookup("ren")) == ["Zed Renamed"]
+    service.repo.delete(service.repo.get(guest.id))
+    assert index.lookup("zed") == []
+    db.close()
+
+def test_writes_from_other_processes_show_up_after_ttl(sessions, monkeypatch):
+    index = GuestAutocomplete(sessions, ttl=30.0)
+    index.refresh()
+    db = sessions()
+    db.add(Guest(first_name="Other", last_name="Worker", email="other@example.com"))  # not told to the index
+    db.commit()
+    db.query(Guest).filter(Guest.email == "mary@jo.net").delete()
+    db.commit()
+    db.close()
+    assert index.lookup("other") == [] and names(index.lookup("mary")) == ["Mary Jones"]
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + 31)
+    assert names(index.lookup("other")) == ["Other Worker"]
+    assert index.lookup("mary") == []
+
+def test_unchanged_table_is_not_reread(sessions):
+    index = GuestAutocomplete(sessions, ttl=0.0)
+    index.refresh()
+    entries = index._entries
+    assert names(index.lookup("mary")) == ["Mary Jones"]
+    assert index._entries is entries  # version matched, so the array was kept
+    index.max_age = 0.0
+    assert names(index.lookup("mary")) == ["Mary Jones"]
+    assert index._entries is not entries  # too old: rebuilt even though nothing seemed to change
+
+def test_writes_during_a_build_are_replayed(sessions, monkeypatch):
+    index = GuestAutocomplete(sessions)
+    keys = index._keys
+    def keys_during_build(*args):
+        if not calls:
+            index.remove(3)  # a delete in this process, committed after the build read Mary's row
+        calls.append(1)
+        return keys(*args)
+    calls = []
+    monkeypatch.setattr(index, "_keys", keys_during_build)
+    index.refresh()
+    assert index.lookup("mary") == []
+    assert names(index.lookup("jos")) == ["José Álvarez", "Josephine Baker"]
+
+def test_lookup_does_not_query_the_database(sessions):
+    index = GuestAutocomplete(sessions)
+    index.lookup("warm")
+    index.session_factory = None  # any database access would now fail
+    started = time.perf_counter()
+    for _ in range(1000):
+        index.lookup("jos", limit=5)
+    assert (time.perf_counter() - started) / 1000 < 0.001
+
+def test_autocomplete_endpoint(sessions):
+    index = GuestAutocomplete(sessions)
+    app.dependency_overrides[api.get_guest_service] = lambda: GuestService(sessions(), autocomplete=index)
+    try:
+        client = TestClient(app)
+        resp = client.get("/api/v1/guests/autocomplete", params={"prefix": "mar", "limit": 5})
+        assert resp.status_code == 200
+        assert resp.json() == [{"id": 3, "name": "Mary Jones"}]
+        assert client.get("/api/v1/guests/autocomplete", params={"prefix": "m", "limit": 500}).status_code == 422
+    finally:
+        app.dependency_overrides.pop(api.get_guest_service, None)
@@ -0,0 +1,94 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from backend.core.base import Base
+from backend.guest_service.api.v1 import guests as api
+from backend.guest_service.main import app
+from backend.guest_service.models.guest import Guest
+from backend.guest_service.repositories.guest_search import ensure_search_index
+from backend.guest_service.services.autocomplete import GuestAutocomplete
+from backend.guest_service.services.guest_service import GuestService
+from backend.room_service.models import Property
+
+@pytest.fixture(scope="function")
+def sessions():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    ensure_search_index(engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = factory()
+    db.add(Guest(first_name="Old", last_name="Name", email="known@example.com", phone="111"))
+    db.commit()
+    db.close()
+    return factory
+
+@pytest.fixture
+def service(sessions):
+    db = sessions()
+    yield GuestService(db, autocomplete=GuestAutocomplete(sessions))
+    db.close()
+
+def row(n, **fields):
+    return n, {"first_name": "First", "last_name": f"Last{n}", "email": f"guest{n}@example.com", **fields}
+
+def test_upsert_reports_each_row(service):
+    rows = [row(1), (2, {"first_name": "New", "last_name": "Name", "email": "known@example.com"}),
+            (3, "Invalid JSON: nope"), row(4, email="not-an-email"), row(5, phone="555"),
+            row(6, email="guest1@example.com", last_name="Again")]
+    result = service.bulk_upsert(rows, chunk_size=4)
+    assert (result["created"], result["updated"], result["failed"]) == (2, 2, 2)
+    statuses = {r["row"]: r["status"] for r in result["results"]}
+    assert statuses == {1: "created", 2: "updated", 3: "error", 4: "error", 5: "created", 6: "updated"}
+    by_row = {r["row"]: r for r in result["results"]}
+    assert by_row[6]["id"] == by_row[1]["id"]  # a later row for the same email updates the guest
+    assert "email" in by_row[4]["error"]
+    known = service.repo.get_by_email("known@example.com")
+    assert (known.first_name, known.last_name, known.phone) == ("New", "Name", "111")  # unset fields are kept
+    assert service.repo.get_by_email("guest1@example.com").last_name == "Again"
+    assert service.repo.db.query(Guest).count() == 3
+
+def test_upserted_guests_are_searchable(service):
+    service.autocomplete.lookup("warm")
+    service.bulk_upsert([row(1, first_name="Zora"), (2, {"first_name": "Known", "last_name": "Renamed",
+                                                         "email": "known@example.com"})])
+    assert [g.first_name for g in service.search_guest("zora")] == ["Zora"]
+    assert [g.email for g in service.search_guest("renamed")] == ["known@example.com"]
+    assert [name for _, name in service.autocomplete.lookup("renamed")] == ["Known Renamed"]
+    assert service.autocomplete.lookup("name") == []
+
+def test_failed_chunk_rolls_back_and_earlier_chunks_stay(service, monkeypatch):
+    from sqlalchemy.exc import IntegrityError
+    calls = []
+    write = service.repo.bulk_write
+    def flaky(inserts, updates):
+        calls.append(1)
+        if len(calls) == 2:
+            raise IntegrityError("INSERT", {}, Exception("UNIQUE constraint failed: guests.email"))
+        return write(inserts, updates)
+    monkeypatch.setattr(service.repo, "bulk_write", flaky)
+    result = service.bulk_upsert([row(n) for n in range(1, 6)], chunk_size=2)
+    assert [r["status"] for r in result["results"]] == ["created", "created", "error", "error", "created"]
+    assert service.repo.db.query(Guest).count() == 4
+
+def test_bulk_endpoint_formats(service):
+    app.dependency_overrides[api.get_guest_service] = lambda: service
+    try:
+        client = TestClient(app)
+        body = json.dumps([{"first_name": "A", "last_name": "B", "email": "a@example.com"}])
+        resp = client.post("/api/v1/guests/bulk", content=body, headers={"Content-Type": "application/json"})
+        assert resp.status_code == 200
+        assert resp.json()["results"] == [{"row": 1, "status": "created", "id": 2, "email": "a@example.com"}]
+        ndjson = '{"first_name": "C", "last_name": "D", "email": "c@example.com"}\n\n{broken\n'
+        resp = client.post("/api/v1/guests/bulk", content=ndjson, headers={"Content-Type": "application/x-ndjson"})
+        assert [(r["row"], r["status"]) for r in resp.json()["results"]] == [(1, "created"), (3, "error")]
+        csv_body = "﻿first_name,last_name,email,phone\nA,Changed,a@example.com,\nE,F,e@example.com,999\n"
+        resp = client.post("/api/v1/guests/bulk", content=csv_body.encode(), headers={"Content-Type": "text/csv"})
+        assert [(r["row"], r["status"]) for r in resp.json()["results"]] == [(1, "updated"), (2, "created")]
+        assert service.repo.get_by_email("a@example.com").last_name == "Changed"
+        assert client.post("/api/v1/guests/bulk", content="{}", headers={"Content-Type": "application/json"}).status_code == 400
+        assert client.post("/api/v1/guests/bulk", content="x", headers={"Content-Type": "text/plain"}).status_code == 415
+    finally:
+        app.dependency_overrides.pop(api.get_guest_service, None)
@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from backend.core.base import Base
+from backend.guest_service import dedup
+from backend.guest_service.dedup import (GuestDeduplicator, blocking_keys, normalize_email, normalize_phone,
+                                         similarity, soundex)
+from backend.guest_service.models.guest import Guest
+from backend.room_service.models import Property
+
+GUESTS = [
+    ("John", "Smith", "John.Smith@example.com", "+1 (555) 010-0199"),   # 1
+    ("Jon", "Smith", "jsmith@mail.net", "555.010.0199"),                # 2: typo, other email, same phone
+    ("Mary", "Jones", "mary.jones@example.com", None),                  # 3
+    ("Mary", "Jones", "MaryJones+hotel@example.com", None),             # 4: same person, email differs in case/tag/dots
+    ("Maria", "Gonzalez", "maria@example.org", "555 010 0199"),          # 5: shares the phone, a different person
+    ("Peter", "Parker", "pp@example.com", "2125550000"),                 # 6
+]
+
+@pytest.fixture(scope="function")
+def engine():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add_all([Guest(first_name=f, last_name=l, email=e, phone=p) for f, l, e, p in GUESTS])
+    db.commit()
+    db.close()
+    return engine
+
+def pairs(deduplicator):
+    return {(c["keep_id"], c["duplicate_id"]): c for chunk in deduplicator.candidates() for c in chunk}
+
+def test_normalizers():
+    assert soundex("Robert") == soundex("Rupert") == "R163"
+    assert soundex("Jon") == soundex("John") == "J500"
+    assert soundex("Ashcraft") == "A261"
+    assert normalize_phone("+1 (555) 010-0199") == normalize_phone("5550100199") == "5550100199"
+    assert normalize_phone("12-34") == ""
+    assert normalize_email("Mary.Jones+hotel@Example.com") == "maryjones@example.com"
+    assert {kind for _, kind in blocking_keys("Ann", "Lee", "ann@x.com", None)} == {dedup.EMAIL, dedup.NAME}
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_similarity(monkeypatch, vectorized):
+    if not vectorized:
+        monkeypatch.setattr(dedup, "np", None)
+    same, typo, other, empty = similarity(["john smith", "john smith", "john smith", ""],
+                                          ["john smith", "jon smith", "peter parker", "x"])
+    assert same == pytest.approx(1.0, abs=1e-6)
+    assert 0.5 < typo < 0.9
+    assert other < 0.2
+    assert empty == 0.0
+
+@pytest.mark.parametrize("vectorized", [True, False])
+def test_finds_duplicates_through_blocks(engine, monkeypatch, vectorized):
+    if not vectorized:
+        monkeypatch.setattr(dedup, "np", None)
+    found = pairs(GuestDeduplicator(engine, chunk_size=2))
+    assert set(found) == {(1, 2), (3, 4)}
+    assert found[(1, 2)]["matched_on"] == ["phone", "name"]
+    assert found[(3, 4)]["matched_on"] == ["email", "name"]
+    assert found[(3, 4)]["score"] == 1.0
+
+def test_threshold_and_oversized_blocks(engine):
+    assert (1, 5) in pairs(GuestDeduplicator(engine, threshold=0.0))  # blocked on the phone, scored low
+    assert (2, 5) not in pairs(GuestDeduplicator(engine, threshold=0.0, max_block_size=2))  # 3 guests share it
+    assert pairs(GuestDeduplicator(engine, threshold=0.0, max_block_size=1)) == {}
+
+def test_temporary_tables_are_dropped(engine):
+    deduplicator = GuestDeduplicator(engine)
+    list(deduplicator.candidates())
+    list(deduplicator.candidates())  # would fail if the first run left its tables behind
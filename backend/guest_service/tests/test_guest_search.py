@@ -0,0 +1,96 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from backend.core.base import Base
+from backend.guest_service.models.guest import Guest
+from backend.guest_service.repositories.guest_search import FTS_TABLE, ensure_search_index
+from backend.guest_service.services.guest_service import GuestService
+from backend.room_service.models import Property
+
+@pytest.fixture(scope="function")
+def db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+    db.add(Guest(first_name="Existing", last_name="Before", email="before@index.com"))
+    db.commit()
+    assert ensure_search_index(engine) == "fts5"
+    try:
+        yield db
+    finally:
+        db.close()
+
+def add(service, first, last, email, phone=None):
+    return service.repo.create(Guest(first_name=first, last_name=last, email=email, phone=phone))
+
+def emails(guests):
+    return [g.email for g in guests]
+
+def test_existing_guests_are_back_filled(db_session):
+    assert emails(GuestService(db_session).search_guest("existing")) == ["before@index.com"]
+
+def test_substring_matches_across_columns(db_session):
+    service = GuestService(db_session)
+    add(service, "Alice", "Wonderland", "alice@wonder.com", "+1 555 0100")
+    add(service, "Bob", "Alison", "bob@example.com")
+    add(service, "Carol", "Jones", "carol@example.com", "555 0199")
+    assert sorted(emails(service.search_guest("ALI"))) == ["alice@wonder.com", "bob@example.com"]
+    assert emails(service.search_guest("wonder.com")) == ["alice@wonder.com"]
+    assert emails(service.search_guest("0199")) == ["carol@example.com"]
+    assert service.search_guest("   ") == []
+    assert service.search_guest('"; DROP') == []
+
+def test_ranked_and_limited(db_session):
+    service = GuestService(db_session)
+    for i in range(30):
+        add(service, f"Guest{i}", "Smithson", f"guest{i}@example.com")
+    add(service, "Smith", "Smith", "smith@smith.com")
+    results = service.search_guest("smith", limit=5)
+    assert len(results) == 5
+    assert results[0].email == "smith@smith.com"  # matches in every column rank first
+
+def test_short_queries_fall_back_to_a_bounded_scan(db_session):
+    service = GuestService(db_session)
+    add(service, "Al", "Bo", "al@example.com")
+    add(service, "Alan", "Bo", "alan@example.com")
+    assert emails(service.search_guest("al", limit=1)) == ["al@example.com"]
+    assert emails(service.search_guest("_")) == []  # LIKE wildcards are literal
+
+def test_index_follows_updates_and_deletes(db_session):
+    service = GuestService(db_session)
+    guest = add(service, "Dana", "Old", "dana@example.com")
+    service.repo.update(guest, {"last_name": "Newname"})
+    assert service.search_guest("old") == []
+    assert emails(service.search_guest("newname")) == ["dana@example.com"]
+    service.repo.delete(guest)
+    assert service.search_guest("dana") == []
+    assert db_session.execute(text(f"SELECT count(*) FROM {FTS_TABLE}")).scalar() == 1
+
+def test_raw_sql_writes_are_indexed(db_session):
+    # populate_sample_data.py and other scripts bypass the repository
+    db_session.execute(text("INSERT INTO guests (first_name, last_name, email) VALUES ('Raw', 'Insert', 'raw@sql.com')"))
+    db_session.commit()
+    assert emails(GuestService(db_session).search_guest("insert")) == ["raw@sql.com"]
+    db_session.execute(text("UPDATE guests SET last_name = 'Edited' WHERE email = 'raw@sql.com'"))
+    db_session.commit()
+    assert GuestService(db_session).search_guest("insert") == []
+    assert emails(GuestService(db_session).search_guest("edited")) == ["raw@sql.com"]
+
+def test_missing_triggers_are_recreated_and_the_index_refilled(db_session):
+    engine = db_session.get_bind()
+    db_session.execute(text("DROP TRIGGER guests_fts_ai"))
+    db_session.execute(text("INSERT INTO guests (first_name, last_name, email) VALUES ('Late', 'Comer', 'late@x.com')"))
+    db_session.commit()
+    assert GuestService(db_session).search_guest("comer") == []
+    ensure_search_index(engine)
+    assert emails(GuestService(db_session).search_guest("comer")) == ["late@x.com"]
+
+def test_search_endpoint_limit():
+    from fastapi.testclient import TestClient
+    from backend.guest_service.main import app
+    client = TestClient(app)
+    resp = client.get("/api/v1/guests/search/", params={"q": "example", "limit": 2})
+    assert resp.status_code == 200
+    assert len(resp.json()) <= 2
+    assert client.get("/api/v1/guests/search/", params={"q": "example", "limit": 500}).status_code == 422
@@ -511,3 +511,27 @@ def test_search_guest_special_characters(db_session):
     assert resp.status_code == 200
     results = resp.json()
     assert any(g["email"] == "specialchar@example.com" for g in results)
+
+def test_get_guests_by_ids():
+    ids = []
+    for i in range(3):
+        data = {"first_name": f"Batch{i}", "last_name": "Guest", "email": f"batch{i}@example.com"}
+        ids.append(client.post("/api/v1/guests/", json=data).json()["id"])
+    resp = client.get("/api/v1/guests", params={"ids": f"{ids[2]},{ids[0]},{ids[2]},999999"})
+    assert resp.status_code == 200
+    assert [g["id"] for g in resp.json()["guests"]] == [ids[2], ids[0]]
+    assert resp.json()["missing"] == [999999]
+    assert client.get("/api/v1/guests", params={"ids": "1,x"}).status_code == 400
+
+def test_batch_get_guests():
+    ids = []
+    for i in range(2):
+        data = {"first_name": f"BatchPost{i}", "last_name": "Guest", "email": f"batchpost{i}@example.com"}
+        ids.append(client.post("/api/v1/guests/", json=data).json()["id"])
+    resp = client.post("/api/v1/guests/batch-get", json={"ids": [999998, ids[1], ids[0], ids[1]]})
+    assert resp.status_code == 200
+    assert [g["email"] for g in resp.json()["guests"]] == ["batchpost1@example.com", "batchpost0@example.com"]
+    assert resp.json()["missing"] == [999998]
+    assert client.post("/api/v1/guests/batch-get", json={"ids": []}).json() == {"guests": [], "missing": []}
+    assert client.post("/api/v1/guests/batch-get", json={"ids": list(range(1001))}).status_code == 400
+    assert client.post("/api/v1/guests/batch-get", json={"ids": ["x"]}).status_code == 422
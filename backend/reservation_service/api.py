@@ -1,14 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Request
+import enum
+import json
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from fastapi.exception_handlers import RequestValidationError
 from fastapi.exceptions import RequestValidationError
+import httpx
+from datetime import date, datetime
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from backend.reservation_service.schemas import ReservationCreate, ReservationRead, ReservationUpdate
+from backend.reservation_service.schemas import (
+    AvailabilityRead, FrontDeskReservation, ReservationCreate, ReservationRead, ReservationUpdate, RoomTypeInventoryRead,
+)
+from backend.reservation_service.models import Reservation
 from backend.reservation_service.repository import ReservationRepository
 from backend.reservation_service.service import ReservationService
-from backend.room_service.service import RoomService
 from backend.reservation_service.config import SessionLocal
 from backend.reservation_service.exceptions import ReservationError, RoomUnavailableError
+from backend.reservation_service.conflicts import stay_index
+from backend.reservation_service.room_cache import room_cache
+from backend.reservation_service.availability import availability_index
+from backend.reservation_service.idempotency import idempotency_guard, request_hash
+from backend.reservation_service.outbox import outbox_dispatcher
 
 router = APIRouter()
 
@@ -19,35 +32,85 @@ def get_db():
     finally:
         db.close()
 
-def get_room_service(db: Session = Depends(get_db)):
-    return RoomService(db)
-
-def get_reservation_service(db: Session = Depends(get_db), room_service: RoomService = Depends(get_room_service)):
-    return ReservationService(db, room_service)
+def get_reservation_service(db: Session = Depends(get_db)):
+    return ReservationService(db, stays=stay_index, room_cache=room_cache,
+                              availability=availability_index, outbox=outbox_dispatcher)
 
 @router.post("/reservations", response_model=ReservationRead)
 @router.post("/reservations/", response_model=ReservationRead)
-def create_reservation(reservation: ReservationCreate, service: ReservationService = Depends(get_reservation_service)):
-    try:
-        res = service.create_reservation(
-            property_id=reservation.property_id,
-            guest_id=reservation.guest_id,
-            room_type_id=None,  # For MVP, assume room_id is provided directly
-            check_in=reservation.check_in,
-            check_out=reservation.check_out,
-            price=reservation.price,
-            payment_status=reservation.payment_status,
-            room_id=reservation.room_id
-        )
-        return res
-    except (ReservationError, RoomUnavailableError) as e:
-        raise HTTPException(status_code=400, detail=str(e))
+async def create_reservation(
+    reservation: ReservationCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    service: ReservationService = Depends(get_reservation_service),
+):
+    async def create():
+        try:
+            res = await service.create_reservation_async(
+                property_id=reservation.property_id,
+                guest_id=reservation.guest_id,
+                room_type_id=None,  # For MVP, assume room_id is provided directly
+                check_in=reservation.check_in,
+                check_out=reservation.check_out,
+                price=reservation.price,
+                payment_status=reservation.payment_status,
+                room_id=reservation.room_id
+            )
+            return res
+        except (ReservationError, RoomUnavailableError) as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    if idempotency_key is None:
+        return await create()
+    # Retries with the same key get the first response back instead of a second booking
+    async def create_once():
+        return ReservationRead.model_validate(await create(), from_attributes=True)
+    return await idempotency_guard.run(service.repo.db, idempotency_key, request_hash(reservation.dict()), create_once)
 
 @router.patch("/reservations/{reservation_id}", response_model=ReservationRead)
 def update_reservation(reservation_id: int, update: ReservationUpdate, service: ReservationService = Depends(get_reservation_service)):
-    res = service.repo.update(reservation_id, update)
+    try:
+        res = service.repo.update(reservation_id, update)
+    except ReservationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    # Status or room edits can free or take nights; reload this property's stays on next use
+    stay_index.invalidate(res.property_id)
+    availability_index.invalidate(res.property_id)
     return res
 
+@router.get("/availability", response_model=AvailabilityRead)
+async def get_availability(
+    property_id: int = Query(...),
+    check_in: date = Query(...),
+    check_out: date = Query(...),
+    room_type_id: Optional[int] = Query(None),
+    db: Session = Depends(get_db),
+):
+    # Rooms free for every night in [check_in, check_out)
+    try:
+        room_ids = await availability_index.search(db, property_id, check_in, check_out, room_type_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except httpx.HTTPError:
+        raise HTTPException(status_code=502, detail="Room service unavailable")
+    return AvailabilityRead(property_id=property_id, room_type_id=room_type_id,
+                            check_in=check_in, check_out=check_out, room_ids=room_ids)
+
+@router.get("/inventory", response_model=List[RoomTypeInventoryRead])
+async def get_room_type_inventory(
+    property_id: int = Query(...),
+    start: date = Query(...),
+    end: date = Query(...),
+    room_type_id: Optional[int] = Query(None),
+    service: ReservationService = Depends(get_reservation_service),
+):
+    # Per-night counters for [start, end); one range scan plus one room-service summary call
+    try:
+        return await service.room_type_inventory(property_id, start, end, room_type_id)
+    except ReservationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except httpx.HTTPError:
+        raise HTTPException(status_code=502, detail="Room service unavailable")
+
 @router.post("/reservations/{reservation_id}/cancel", response_model=ReservationRead)
 def cancel_reservation(reservation_id: int, service: ReservationService = Depends(get_reservation_service)):
     return service.cancel_reservation(reservation_id)
@@ -60,6 +123,24 @@ def check_in(reservation_id: int, service: ReservationService = Depends(get_rese
 def check_out(reservation_id: int, service: ReservationService = Depends(get_reservation_service)):
     return service.check_out(reservation_id)
 
+async def front_desk_list(kind: str, property_id: int, business_date: Optional[date], service: ReservationService):
+    return await service.front_desk_list(kind, property_id, business_date or date.today())
+
+@router.get("/reservations/arrivals", response_model=List[FrontDeskReservation])
+async def list_arrivals(property_id: int = Query(...), business_date: Optional[date] = Query(None, alias="date"),
+                        service: ReservationService = Depends(get_reservation_service)):
+    return await front_desk_list("arrivals", property_id, business_date, service)
+
+@router.get("/reservations/departures", response_model=List[FrontDeskReservation])
+async def list_departures(property_id: int = Query(...), business_date: Optional[date] = Query(None, alias="date"),
+                          service: ReservationService = Depends(get_reservation_service)):
+    return await front_desk_list("departures", property_id, business_date, service)
+
+@router.get("/reservations/in-house", response_model=List[FrontDeskReservation])
+async def list_in_house(property_id: int = Query(...), business_date: Optional[date] = Query(None, alias="date"),
+                        service: ReservationService = Depends(get_reservation_service)):
+    return await front_desk_list("in-house", property_id, business_date, service)
+
 @router.get("/reservations/{reservation_id}", response_model=ReservationRead)
 def get_reservation(reservation_id: int, service: ReservationService = Depends(get_reservation_service)):
     res = service.repo.get(reservation_id)
@@ -67,35 +148,78 @@ def get_reservation(reservation_id: int, service: ReservationService = Depends(g
         raise HTTPException(status_code=404, detail="Reservation not found")
     return res
 
+# Page size bounds for GET /reservations; clients follow X-Next-Cursor for more
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+NDJSON_TYPE = "application/x-ndjson"
+
+# Columns streamed for each NDJSON row, in ReservationRead order
+READ_FIELDS = list(ReservationRead.model_fields)
+READ_COLUMNS = [getattr(Reservation, field) for field in READ_FIELDS]
+
+def encode_cursor(reservation) -> str:
+    return f"{reservation.check_in.isoformat()}_{reservation.id}"
+
+def decode_cursor(cursor: Optional[str]):
+    if cursor is None:
+        return None
+    try:
+        check_in, reservation_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(check_in), int(reservation_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def ndjson_line(row) -> str:
+    item = {}
+    for field, value in zip(READ_FIELDS, row):
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        elif isinstance(value, enum.Enum):
+            value = value.value
+        item[field] = value
+    return json.dumps(item) + "\n"
+
 @router.get("/reservations", response_model=List[ReservationRead])
 def list_reservations(
+    request: Request,
+    response: Response,
     property_id: Optional[int] = Query(None),
     guest_id: Optional[int] = Query(None),
-    start_date: Optional[str] = Query(None),
-    end_date: Optional[str] = Query(None),
+    start_date: Optional[date] = Query(None),
+    end_date: Optional[date] = Query(None),
+    overlaps: bool = Query(False, description="Match stays that overlap the range instead of lying within it"),
+    after: Optional[str] = Query(None, description="Return rows after this (check_in, id) cursor"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    output: Optional[str] = Query(None, alias="format", pattern="^(json|ndjson)$"),
     service: ReservationService = Depends(get_reservation_service)
 ):
-    # This assumes ReservationService has a method to filter reservations
-    return service.repo.list_reservations(
-        property_id=property_id,
-        guest_id=guest_id,
-        start_date=start_date,
-        end_date=end_date
-    )
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    filters = dict(property_id=property_id, guest_id=guest_id, start_date=start_date, end_date=end_date,
+                   overlaps=overlaps, after=decode_cursor(after))
+    if output == "ndjson" or (output is None and NDJSON_TYPE in request.headers.get("accept", "")):
+        # Every matching row after the cursor, one JSON object per line; limit does not apply
+        bind = service.repo.db.get_bind()
+        def stream():
+            # Own session: the request's session may be closed before the body is sent
+            with Session(bind=bind) as db:
+                for row in ReservationRepository(db).iter_rows(columns=READ_COLUMNS, **filters):
+                    yield ndjson_line(row)
+        return StreamingResponse(stream(), media_type=NDJSON_TYPE)
+    rows = service.repo.list_page(limit=limit, **filters)
+    # A full page means there may be more rows after the last one
+    if len(rows) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1])
+    return rows
 
 @router.delete("/reservations/{reservation_id}", response_model=None)
-def delete_reservation(reservation_id: int, service: ReservationService = Depends(get_reservation_service)):
-    res = service.repo.get(reservation_id)
+async def delete_reservation(reservation_id: int, service: ReservationService = Depends(get_reservation_service)):
+    res = await run_in_threadpool(service.repo.get, reservation_id)
     if not res:
         raise HTTPException(status_code=404, detail="Reservation not found")
-    # Set room status to AVAILABLE via HTTP if reservation has a room_id
-    if res.room_id:
-        import httpx
-        ROOM_SERVICE_URL = "http://localhost:8001/api/v1/room-service/rooms"
-        try:
-            with httpx.Client() as client:
-                client.patch(f"{ROOM_SERVICE_URL}/{res.room_id}", json={"status": "AVAILABLE"})
-        except Exception:
-            pass  # Ignore if room is already available or not found
-    service.repo.delete(reservation_id)
+    # The delete queues the room's AVAILABLE update in the same transaction
+    await run_in_threadpool(service.repo.delete, reservation_id)
+    service.release_stay(res)
+    service.room_status_queued()
     return {"detail": "Reservation deleted"}
@@ -0,0 +1,180 @@
+# Room availability: per-property rooms x nights occupancy matrix
+import asyncio
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from backend.reservation_service.repository import ReservationRepository, starts_by_today
+from backend.reservation_service.clients import room_service_client
+
+try:
+    import numpy as np
+except ImportError:  # Optional: fall back to one Python int bitset per room
+    np = None
+
+# Rolling window of bookable nights, starting today
+HORIZON_NIGHTS = 549  # about 18 months
+
+# Room statuses a stay starting today can be sold into
+SELLABLE_TODAY = ("AVAILABLE",)
+
+def night_of(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+def sellable(room_status: str, check_in) -> bool:
+    """The one booking rule shared by search and booking, besides the dates being free.
+
+    A stay starting today also needs the room to be ready now. A later stay is
+    judged by its dates alone, since the room's current status says nothing
+    about next month.
+    """
+    return not starts_by_today(check_in) or room_status in SELLABLE_TODAY
+
+class OccupancyMatrix:
+    """Occupied nights for every room of one property, over [origin, origin + nights).
+
+    With NumPy this is a boolean rooms x nights array. A search slices the
+    requested nights and reduces each row with one vectorized ``any``. Without
+    NumPy each room is an int bitset with one bit per night, so a search is one
+    AND per room against the range mask.
+    """
+
+    def __init__(self, origin: date, room_ids: List[int], type_ids: List[int], nights: int = HORIZON_NIGHTS,
+                 statuses: Optional[List[str]] = None):
+        self.origin = origin
+        self.nights = nights
+        self.room_ids = list(room_ids)
+        self.rows = {room_id: i for i, room_id in enumerate(self.room_ids)}
+        ready = [status in SELLABLE_TODAY for status in statuses] if statuses is not None else [True] * len(self.room_ids)
+        if np is not None:
+            self.type_ids = np.array(type_ids, dtype=np.int64)
+            self.ready = np.array(ready, dtype=bool)
+            self.occupied = np.zeros((len(self.room_ids), nights), dtype=bool)
+        else:
+            self.type_ids = list(type_ids)
+            self.ready = ready
+            self.occupied = [0] * len(self.room_ids)
+
+    def _span(self, check_in, check_out):
+        start = (night_of(check_in) - self.origin).days
+        stop = max((night_of(check_out) - self.origin).days, start + 1)
+        return max(start, 0), min(stop, self.nights)
+
+    def mark(self, room_id: int, check_in, check_out, occupied: bool = True) -> None:
+        row = self.rows.get(room_id)
+        start, stop = self._span(check_in, check_out)
+        if row is None or start >= stop:
+            return
+        if np is not None:
+            self.occupied[row, start:stop] = occupied
+        else:
+            bits = ((1 << (stop - start)) - 1) << start
+            self.occupied[row] = self.occupied[row] | bits if occupied else self.occupied[row] & ~bits
+
+    def free_rooms(self, check_in, check_out, room_type_id: Optional[int] = None) -> List[int]:
+        start, stop = self._span(check_in, check_out)
+        # Same rule as booking: a stay starting today also needs a room that is ready now
+        today = starts_by_today(check_in)
+        if np is not None:
+            free = ~self.occupied[:, start:stop].any(axis=1)
+            if room_type_id is not None:
+                free &= self.type_ids == room_type_id
+            if today:
+                free &= self.ready
+            return [self.room_ids[i] for i in np.flatnonzero(free)]
+        bits = ((1 << (stop - start)) - 1) << start
+        return [
+            room_id for room_id, occupied, type_id, ready in zip(self.room_ids, self.occupied, self.type_ids, self.ready)
+            if not occupied & bits and (room_type_id is None or type_id == room_type_id) and (ready or not today)
+        ]
+
+class AvailabilityIndex:
+    """Occupancy matrices per property, built on first use and updated on every local booking change.
+
+    A matrix is rebuilt when the day rolls over (the horizon moves) or after
+    ``roster_ttl`` seconds, which picks up rooms added in the room service and
+    bookings made by other processes. A build costs one room-service listing
+    and one reservation query.
+    """
+
+    def __init__(self, list_rooms: Callable[[int], Awaitable[List[dict]]], roster_ttl: float = 300.0,
+                 nights: int = HORIZON_NIGHTS):
+        self.list_rooms = list_rooms
+        self.roster_ttl = roster_ttl
+        self.nights = nights
+        self._lock = threading.Lock()
+        self._matrices: Dict[int, tuple] = {}  # property_id -> (expires, OccupancyMatrix)
+        self._builds: Dict[int, asyncio.Lock] = {}
+
+    def horizon(self) -> tuple:
+        origin = date.today()
+        return origin, origin + timedelta(days=self.nights)
+
+    def _current(self, property_id: int) -> Optional[OccupancyMatrix]:
+        entry = self._matrices.get(property_id)
+        if entry is None or entry[0] <= time.monotonic() or entry[1].origin != date.today():
+            return None
+        return entry[1]
+
+    def build(self, db: Session, property_id: int, rooms: List[dict]) -> OccupancyMatrix:
+        origin, _ = self.horizon()
+        matrix = OccupancyMatrix(origin, [r["id"] for r in rooms], [r["type_id"] for r in rooms], self.nights,
+                                 [r["status"] for r in rooms])
+        for stay in ReservationRepository(db).list_active(property_id, check_out_after=datetime.combine(origin, datetime.min.time())):
+            matrix.mark(stay.room_id, stay.check_in, stay.check_out)
+        return matrix
+
+    async def matrix(self, db: Session, property_id: int) -> OccupancyMatrix:
+        with self._lock:
+            matrix = self._current(property_id)
+        if matrix is not None:
+            return matrix
+        # One build per property at a time; concurrent searches wait for it
+        build_lock = self._builds.setdefault(property_id, asyncio.Lock())
+        async with build_lock:
+            with self._lock:
+                matrix = self._current(property_id)
+            if matrix is None:
+                rooms = await self.list_rooms(property_id)
+                matrix = await run_in_threadpool(self.build, db, property_id, rooms)
+                with self._lock:
+                    self._matrices[property_id] = (time.monotonic() + self.roster_ttl, matrix)
+        return matrix
+
+    async def search(self, db: Session, property_id: int, check_in: date, check_out: date,
+                     room_type_id: Optional[int] = None) -> List[int]:
+        origin, end = self.horizon()
+        if check_in >= check_out:
+            raise ValueError("check_in must be before check_out")
+        if check_in < origin or check_out > end:
+            raise ValueError(f"Dates must fall between {origin} and {end}")
+        matrix = await self.matrix(db, property_id)
+        with self._lock:
+            return matrix.free_rooms(check_in, check_out, room_type_id)
+
+    def occupy(self, property_id: int, room_id: Optional[int], check_in, check_out) -> None:
+        self._mark(property_id, room_id, check_in, check_out, True)
+
+    def release(self, property_id: int, room_id: Optional[int], check_in, check_out) -> None:
+        # New bookings cannot overlap, so clearing these nights frees only this stay; the TTL rebuild covers legacy overlaps
+        self._mark(property_id, room_id, check_in, check_out, False)
+
+    def _mark(self, property_id: int, room_id: Optional[int], check_in, check_out, occupied: bool) -> None:
+        if room_id is None:
+            return
+        with self._lock:
+            entry = self._matrices.get(property_id)
+            if entry is not None:
+                entry[1].mark(room_id, check_in, check_out, occupied)
+
+    def invalidate(self, property_id: Optional[int] = None) -> None:
+        with self._lock:
+            if property_id is None:
+                self._matrices.clear()
+            else:
+                self._matrices.pop(property_id, None)
+
+# Process-wide index used by the API
+availability_index = AvailabilityIndex(room_service_client.list_rooms)
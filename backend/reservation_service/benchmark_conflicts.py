@@ -0,0 +1,83 @@
+# Benchmark: overlap checks against a large reservation history
+# Run from the repo root: python -m backend.reservation_service.benchmark_conflicts [reservations] [db_path]
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.core.base import Base
+from backend.reservation_service.models import Reservation, ReservationStatusEnum
+from backend.reservation_service.repository import ReservationRepository
+from backend.reservation_service.conflicts import StayIndex
+
+PROPERTIES = 10
+ROOMS_PER_PROPERTY = 200
+
+def seed(db, total, batch=50000):
+    # Back-to-back stays per room, ending a few months from now; most are history
+    rng = random.Random(42)
+    per_room = total // (PROPERTIES * ROOMS_PER_PROPERTY)
+    end = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0) + timedelta(days=120)
+    rows = []
+    for property_id in range(1, PROPERTIES + 1):
+        for r in range(ROOMS_PER_PROPERTY):
+            room_id = property_id * 1000 + r
+            check_out = end
+            for _ in range(per_room):
+                nights = rng.randint(1, 5)
+                check_in = check_out - timedelta(days=nights)
+                status = ReservationStatusEnum.CANCELED if rng.random() < 0.05 else ReservationStatusEnum.BOOKED
+                rows.append({"property_id": property_id, "guest_id": rng.randint(1, 100000), "room_id": room_id,
+                             "check_in": check_in, "check_out": check_out, "status": status})
+                check_out = check_in - timedelta(days=rng.randint(0, 2))
+                if len(rows) >= batch:
+                    db.bulk_insert_mappings(Reservation, rows)
+                    rows = []
+    if rows:
+        db.bulk_insert_mappings(Reservation, rows)
+    db.commit()
+
+def probes(n):
+    rng = random.Random(7)
+    start = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+    out = []
+    for _ in range(n):
+        property_id = rng.randint(1, PROPERTIES)
+        check_in = start + timedelta(days=rng.randint(1, 150))
+        out.append((property_id, property_id * 1000 + rng.randrange(ROOMS_PER_PROPERTY),
+                    check_in, check_in + timedelta(days=rng.randint(1, 7))))
+    return out
+
+def timeit(label, fn, cases):
+    start = time.perf_counter()
+    hits = sum(1 for case in cases if fn(*case))
+    elapsed = (time.perf_counter() - start) / len(cases)
+    print(f"{label:<22} {elapsed * 1e3:8.3f} ms/check  ({hits}/{len(cases)} conflicts)")
+    return elapsed
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    path = sys.argv[2] if len(sys.argv) > 2 else os.path.join(tempfile.gettempdir(), f"reservations_bench_{total}.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    if db.query(Reservation).count() == 0:
+        started = time.perf_counter()
+        seed(db, total)
+        print(f"seeded {db.query(Reservation).count()} reservations in {time.perf_counter() - started:.1f}s ({path})")
+    repo = ReservationRepository(db)
+    cases = probes(2000)
+    timeit("EXISTS (indexed)", lambda p, room, ci, co: repo.has_overlap(room, ci, co), cases)
+    index = StayIndex()
+    started = time.perf_counter()
+    for property_id in range(1, PROPERTIES + 1):
+        index.has_conflict(db, property_id, 0, datetime.now(), datetime.now())
+    print(f"{'stay index load':<22} {(time.perf_counter() - started) * 1e3:8.1f} ms for {PROPERTIES} properties")
+    timeit("stay index (memory)", lambda p, room, ci, co: index.has_conflict(db, p, room, ci, co), cases)
+    db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+# Pooled async HTTP clients for the room and guest services
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Tuple
+import httpx
+from backend.reservation_service.config import (
+    ROOM_SERVICE_URL, ROOM_SERVICE_TIMEOUT, ROOM_SERVICE_CONNECT_TIMEOUT,
+    ROOM_SERVICE_MAX_CONNECTIONS, ROOM_SERVICE_MAX_KEEPALIVE, GUEST_SERVICE_URL,
+)
+
+try:
+    import h2  # noqa: F401  # httpx only negotiates HTTP/2 when the h2 package is installed
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+class PooledClient:
+    """One keep-alive connection pool to a peer service per process.
+
+    The app lifespan calls ``open`` and ``close``. Calls made outside the loop
+    that opened the pool, for example from synchronous scripts through
+    ``asyncio.run``, fall back to a short-lived client, because httpx
+    connections cannot move between event loops.
+    """
+
+    def __init__(self, base_url: str = ROOM_SERVICE_URL, timeout: float = ROOM_SERVICE_TIMEOUT,
+                 connect_timeout: float = ROOM_SERVICE_CONNECT_TIMEOUT,
+                 max_connections: int = ROOM_SERVICE_MAX_CONNECTIONS,
+                 max_keepalive: int = ROOM_SERVICE_MAX_KEEPALIVE, http2: Optional[bool] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.base_url = base_url.rstrip("/")
+        self.options = dict(
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive),
+            http2=HTTP2_AVAILABLE if http2 is None else http2,
+        )
+        if transport is not None:
+            self.options["transport"] = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._client is not None and not self._client.is_closed
+
+    async def open(self) -> None:
+        if not self.is_open:
+            self._client = httpx.AsyncClient(**self.options)
+            self._loop = asyncio.get_running_loop()
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[httpx.AsyncClient]:
+        if self.is_open and self._loop is asyncio.get_running_loop():
+            yield self._client
+        else:
+            async with httpx.AsyncClient(**self.options) as client:
+                yield client
+
+class RoomServiceClient(PooledClient):
+    async def get_room(self, room_id: int) -> Optional[dict]:
+        async with self.session() as client:
+            resp = await client.get(f"{self.base_url}/{room_id}")
+            if resp.status_code == 404:
+                return None
+            resp.raise_for_status()
+            return resp.json()
+
+    async def stream_events(self, last_event_id: Optional[int] = None) -> AsyncIterator[Tuple[int, dict]]:
+        """Yield (event_id, event) from the room status SSE stream until the server closes it."""
+        headers = {"Last-Event-ID": str(last_event_id)} if last_event_id is not None else {}
+        async with self.session() as client:
+            # No read timeout: the stream is idle between status changes apart from keepalives
+            async with client.stream("GET", f"{self.base_url}/events", headers=headers,
+                                     timeout=httpx.Timeout(None, connect=self.options["timeout"].connect)) as resp:
+                resp.raise_for_status()
+                event_id, data = None, None
+                async for line in resp.aiter_lines():
+                    if line.startswith("id:"):
+                        event_id = int(line[3:].strip())
+                    elif line.startswith("data:"):
+                        data = line[5:].strip()
+                    elif not line and data is not None:
+                        yield event_id, json.loads(data)
+                        event_id, data = None, None
+
+    async def list_rooms(self, property_id: int, page_size: int = 1000) -> List[dict]:
+        # Follows the room service's X-Next-Cursor pages
+        rooms: List[dict] = []
+        params = {"property_id": property_id, "limit": page_size}
+        async with self.session() as client:
+            while True:
+                resp = await client.get(self.base_url, params=params)
+                resp.raise_for_status()
+                rooms.extend(resp.json())
+                cursor = resp.headers.get("X-Next-Cursor")
+                if not cursor:
+                    return rooms
+                params["after"] = cursor
+
+    async def get_room_summary(self, property_id: int) -> dict:
+        async with self.session() as client:
+            resp = await client.get(f"{self.base_url}/summary", params={"property_id": property_id})
+            resp.raise_for_status()
+            return resp.json()
+
+    async def mark_room_status(self, room_id: int, status: str) -> dict:
+        async with self.session() as client:
+            resp = await client.patch(f"{self.base_url}/{room_id}", json={"status": status})
+            resp.raise_for_status()
+            return resp.json()
+
+class GuestServiceClient(PooledClient):
+    def __init__(self, base_url: str = GUEST_SERVICE_URL, **options):
+        super().__init__(base_url, **options)
+
+    async def get_guests(self, guest_ids: Iterable[int], chunk_size: int = 200) -> Dict[int, dict]:
+        """Guests by id, one request per ``chunk_size`` distinct ids; unknown ids are left out."""
+        ids = sorted(set(guest_ids))
+        guests: Dict[int, dict] = {}
+        async with self.session() as client:
+            for start in range(0, len(ids), chunk_size):
+                chunk = ids[start:start + chunk_size]
+                resp = await client.get(self.base_url, params={"ids": ",".join(map(str, chunk))})
+                resp.raise_for_status()
+                guests.update((guest["id"], guest) for guest in resp.json()["guests"])
+        return guests
+
+# Process-wide pools; opened and closed by the app lifespan in main.py
+room_service_client = RoomServiceClient()
+guest_service_client = GuestServiceClient()
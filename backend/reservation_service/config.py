@@ -6,3 +6,13 @@ import os
 SQLALCHEMY_DATABASE_URL = os.getenv("RESERVATION_DATABASE_URL", "sqlite:///./backend/reservation_service/reservation_service.db")
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Room service HTTP client (one pooled connection set per process)
+ROOM_SERVICE_URL = os.getenv("ROOM_SERVICE_URL", "http://localhost:8001/api/v1/room-service/rooms")
+ROOM_SERVICE_TIMEOUT = float(os.getenv("ROOM_SERVICE_TIMEOUT", "5.0"))
+ROOM_SERVICE_CONNECT_TIMEOUT = float(os.getenv("ROOM_SERVICE_CONNECT_TIMEOUT", "2.0"))
+ROOM_SERVICE_MAX_CONNECTIONS = int(os.getenv("ROOM_SERVICE_MAX_CONNECTIONS", "100"))
+ROOM_SERVICE_MAX_KEEPALIVE = int(os.getenv("ROOM_SERVICE_MAX_KEEPALIVE", "20"))
+
+# Guest service HTTP client; shares the room service timeouts and pool limits
+GUEST_SERVICE_URL = os.getenv("GUEST_SERVICE_URL", "http://localhost:8004/api/v1/guests")
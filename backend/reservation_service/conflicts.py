@@ -0,0 +1,106 @@
+# In-memory per-property index of active stays for overlap checks
+import threading
+import time
+from bisect import bisect_left, insort
+from datetime import datetime
+from itertools import accumulate
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from backend.reservation_service.repository import ReservationRepository
+
+Stay = Tuple[datetime, datetime, int]  # (check_in, check_out, reservation_id)
+
+class RoomStays:
+    """Stays of one room sorted by check-in, plus a running maximum of check-outs.
+
+    A stay overlaps [check_in, check_out) if some stay starts before check_out
+    and ends after check_in. Among the stays that start before check_out, the
+    latest end decides that, so one bisect and one lookup answer it. This holds
+    even when legacy data already contains overlapping stays.
+    """
+
+    def __init__(self, stays: List[Stay]):
+        self.stays = sorted(stays)
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        self.starts = [s[0] for s in self.stays]
+        self.max_end = list(accumulate((s[1] for s in self.stays), max))
+
+    def overlaps(self, check_in: datetime, check_out: datetime) -> bool:
+        i = bisect_left(self.starts, check_out)
+        return i > 0 and self.max_end[i - 1] > check_in
+
+    def add(self, stay: Stay) -> None:
+        insort(self.stays, stay)
+        self._rebuild()
+
+    def remove(self, reservation_id: int) -> bool:
+        kept = [s for s in self.stays if s[2] != reservation_id]
+        if len(kept) == len(self.stays):
+            return False
+        self.stays = kept
+        self._rebuild()
+        return True
+
+class StayIndex:
+    """Active (BOOKED / CHECKED_IN) stays per property, loaded lazily and kept in step with local writes.
+
+    Only stays that end after the load time are indexed, since bookings in the
+    past are rejected before any conflict check. Entries expire after ``ttl``
+    seconds, so writes made by other processes show up eventually. The insert
+    transaction still runs the authoritative EXISTS check.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._properties: Dict[int, Tuple[float, Dict[int, RoomStays]]] = {}
+
+    def _rooms(self, db: Session, property_id: int) -> Dict[int, RoomStays]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._properties.get(property_id)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+        grouped: Dict[int, List[Stay]] = {}
+        for row in ReservationRepository(db).list_active(property_id, check_out_after=datetime.now()):
+            grouped.setdefault(row.room_id, []).append((row.check_in, row.check_out, row.id))
+        rooms = {room_id: RoomStays(stays) for room_id, stays in grouped.items()}
+        with self._lock:
+            self._properties[property_id] = (now + self.ttl, rooms)
+        return rooms
+
+    def has_conflict(self, db: Session, property_id: int, room_id: int, check_in: datetime, check_out: datetime) -> bool:
+        stays = self._rooms(db, property_id).get(room_id)
+        with self._lock:
+            return stays is not None and stays.overlaps(check_in, check_out)
+
+    def add(self, property_id: int, room_id: Optional[int], check_in: datetime, check_out: datetime, reservation_id: int) -> None:
+        if room_id is None:
+            return
+        with self._lock:
+            entry = self._properties.get(property_id)
+            if entry is None:
+                return  # Not loaded yet; the next load reads it from the database
+            rooms = entry[1]
+            if room_id in rooms:
+                rooms[room_id].add((check_in, check_out, reservation_id))
+            else:
+                rooms[room_id] = RoomStays([(check_in, check_out, reservation_id)])
+
+    def remove(self, property_id: int, room_id: Optional[int], reservation_id: int) -> None:
+        with self._lock:
+            entry = self._properties.get(property_id)
+            if entry is not None and room_id in entry[1]:
+                entry[1][room_id].remove(reservation_id)
+
+    def invalidate(self, property_id: Optional[int] = None) -> None:
+        with self._lock:
+            if property_id is None:
+                self._properties.clear()
+            else:
+                self._properties.pop(property_id, None)
+
+# Process-wide index used by the API
+stay_index = StayIndex()
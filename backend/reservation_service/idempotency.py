@@ -0,0 +1,92 @@
+# Idempotency-Key handling for POST /reservations
+import asyncio
+import hashlib
+import json
+import time
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Dict
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from backend.reservation_service.repository import IdempotencyKeyRepository
+
+MAX_KEY_LENGTH = 255
+
+def request_hash(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(jsonable_encoder(payload), sort_keys=True).encode()).hexdigest()
+
+class IdempotencyGuard:
+    """Runs a handler at most once per Idempotency-Key and replays its response for repeats.
+
+    The first request claims the key in the database and stores its response.
+    That covers 2xx results and 4xx errors. Unexpected failures release the key
+    so a retry can try again. A duplicate that arrives while the first request
+    is still in flight waits for it. Within a process it waits on the first
+    request's future, and across processes it polls the stored row. It gives up
+    with 409 after ``wait_timeout`` seconds.
+    """
+
+    def __init__(self, ttl: timedelta = timedelta(hours=24), lease: timedelta = timedelta(seconds=30),
+                 wait_timeout: float = 10.0, poll_interval: float = 0.05, purge_interval: float = 300.0):
+        self.ttl = ttl
+        self.lease = lease
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.purge_interval = purge_interval
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._last_purge = time.monotonic()
+
+    def replay(self, row) -> JSONResponse:
+        return JSONResponse(json.loads(row.response_body), status_code=row.status_code,
+                            headers={"Idempotent-Replayed": "true"})
+
+    async def run(self, db: Session, key: str, fingerprint: str, handler: Callable[[], Awaitable[Any]]) -> JSONResponse:
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise HTTPException(status_code=400, detail=f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters.")
+        repo = IdempotencyKeyRepository(db)
+        await self._maybe_purge(repo)
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            row = await run_in_threadpool(repo.claim, key, fingerprint, self.lease)
+            if row is None:
+                break
+            if row.request_hash != fingerprint:
+                raise HTTPException(status_code=422, detail="Idempotency-Key was already used with a different request.")
+            if row.status_code is not None:
+                return self.replay(row)
+            if time.monotonic() >= deadline:
+                raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is still in progress.")
+            pending = self._inflight.get(key)
+            if pending is not None:
+                # shield: a cancelled duplicate must not cancel the first request's future
+                await asyncio.wait([asyncio.shield(pending)], timeout=max(deadline - time.monotonic(), 0))
+            else:
+                await asyncio.sleep(self.poll_interval)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            try:
+                status_code, body = 200, jsonable_encoder(await handler())
+            except HTTPException as e:
+                if e.status_code >= 500:
+                    raise
+                status_code, body = e.status_code, {"detail": e.detail}
+            await run_in_threadpool(repo.complete, key, status_code, json.dumps(body), self.ttl)
+        except BaseException:
+            await asyncio.shield(run_in_threadpool(repo.release, key))
+            raise
+        finally:
+            del self._inflight[key]
+            future.set_result(None)
+        return JSONResponse(body, status_code=status_code)
+
+    async def _maybe_purge(self, repo: IdempotencyKeyRepository) -> None:
+        # Opportunistic TTL eviction; expires_at is indexed, so this is one range delete
+        if time.monotonic() - self._last_purge >= self.purge_interval:
+            self._last_purge = time.monotonic()
+            await run_in_threadpool(repo.purge_expired)
+
+# Process-wide guard used by the API
+idempotency_guard = IdempotencyGuard()
@@ -1,8 +1,27 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from backend.reservation_service.api import router as reservation_router
+from backend.reservation_service.clients import guest_service_client, room_service_client
+from backend.reservation_service.room_cache import room_event_listener
+from backend.reservation_service.outbox import outbox_dispatcher
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One keep-alive pool per peer service for the life of the process
+    await room_service_client.open()
+    await guest_service_client.open()
+    room_event_listener.start()
+    await outbox_dispatcher.start()
+    try:
+        yield
+    finally:
+        await outbox_dispatcher.stop()
+        await room_event_listener.stop()
+        await guest_service_client.close()
+        await room_service_client.close()
+
+app = FastAPI(lifespan=lifespan)
 app.include_router(reservation_router, prefix="/api/v1")
 
 app.add_middleware(
@@ -17,4 +36,5 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Idempotent-Replayed", "X-Next-Cursor"],
 )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Enum, DateTime, Float, String
+from sqlalchemy import Column, Integer, ForeignKey, Enum, Date, DateTime, Float, String, Text, Index, UniqueConstraint
 from sqlalchemy.orm import relationship
 from backend.core.base import Base, BaseORMModel
 import enum
@@ -9,11 +9,23 @@ class ReservationStatusEnum(enum.Enum):
     CHECKED_OUT = "CHECKED_OUT"
     CANCELED = "CANCELED"
 
+# Reservations that still hold their room for the booked nights
+ACTIVE_STATUSES = (ReservationStatusEnum.BOOKED, ReservationStatusEnum.CHECKED_IN)
+
 class Reservation(BaseORMModel, Base):
     __tablename__ = "reservations"
+    __table_args__ = (
+        # Serves the overlap check: equality on room_id, range on check_in
+        Index('ix_reservations_room_stay', 'room_id', 'check_in', 'check_out'),
+        # Serves keyset pages in (check_in, id) order, arrivals and range filters on check_in
+        Index('ix_reservations_property_check_in', 'property_id', 'check_in', 'id'),
+        # Serves departures and range filters on check_out
+        Index('ix_reservations_property_check_out', 'property_id', 'check_out'),
+    )
     property_id = Column(Integer, nullable=False)  # Removed ForeignKey
     guest_id = Column(Integer, nullable=False)     # Removed ForeignKey
     room_id = Column(Integer, nullable=True)       # Removed ForeignKey
+    room_type_id = Column(Integer, nullable=True)  # Copied from the room at booking time; keys room_type_inventory
     check_in = Column(DateTime, nullable=False)
     check_out = Column(DateTime, nullable=False)
     status = Column(Enum(ReservationStatusEnum), default=ReservationStatusEnum.BOOKED, nullable=False)
@@ -22,3 +34,33 @@ class Reservation(BaseORMModel, Base):
     # Relationships (optional for MVP):
     # guest = relationship("Guest")
     # room = relationship("Room")
+
+# Rooms of one type sold per night; written in the same transaction as the reservations it counts
+class RoomTypeInventory(BaseORMModel, Base):
+    __tablename__ = "room_type_inventory"
+    __table_args__ = (
+        # Also the index behind range reads: equality on property and type, range on night
+        UniqueConstraint('property_id', 'room_type_id', 'night', name='uq_room_type_inventory_night'),
+    )
+    property_id = Column(Integer, nullable=False)
+    room_type_id = Column(Integer, nullable=False)
+    night = Column(Date, nullable=False)
+    sold = Column(Integer, nullable=False, default=0)
+
+# Responses of POST /reservations by Idempotency-Key; status_code stays NULL while the first request is in flight
+class IdempotencyKey(BaseORMModel, Base):
+    __tablename__ = "idempotency_keys"
+    key = Column(String(255), nullable=False, unique=True)
+    request_hash = Column(String(64), nullable=False)  # sha256 of the request body; a reused key must match it
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    expires_at = Column(DateTime, nullable=False, index=True)  # Lease while in flight, then the replay TTL
+
+# Room status changes waiting to be sent to the room service; written in the reservation's transaction
+class RoomStatusOutbox(BaseORMModel, Base):
+    __tablename__ = "room_status_outbox"
+    room_id = Column(Integer, nullable=False, index=True)
+    status = Column(String, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, index=True)  # Due time; pushed forward by claims and retries
+    last_error = Column(String, nullable=True)
@@ -0,0 +1,138 @@
+# Delivers queued room status changes from the outbox to the room service
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Callable, Dict, Optional
+import httpx
+from sqlalchemy.orm import Session
+from backend.reservation_service.clients import RoomServiceClient, room_service_client
+from backend.reservation_service.config import SessionLocal
+from backend.reservation_service.repository import RoomStatusOutboxRepository
+from backend.reservation_service.room_cache import room_cache
+
+logger = logging.getLogger(__name__)
+
+class OutboxDispatcher:
+    """Background task that drains room_status_outbox into the room service.
+
+    Reservation writes enqueue a message in their own transaction and call
+    ``notify``, so delivery starts right after the commit without holding up
+    the booking request. Messages written by other processes are picked up
+    within ``poll_interval``. Each pass claims up to ``batch_size`` rooms and
+    sends their updates concurrently over the pooled client.
+
+    Network errors and 5xx responses are retried with exponential backoff,
+    capped at ``max_delay``, for as long as it takes. A 4xx response is final:
+    the room is gone, or it is already past that status (409), so the message
+    is dropped with a warning.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session] = SessionLocal, rooms: RoomServiceClient = room_service_client,
+                 batch_size: int = 100, poll_interval: float = 1.0, min_delay: float = 0.5, max_delay: float = 300.0,
+                 lease: float = 30.0, on_delivered: Optional[Callable[[int], None]] = None):
+        self.session_factory = session_factory
+        self.rooms = rooms
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.lease = timedelta(seconds=lease)
+        self.on_delivered = on_delivered
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def backoff(self, attempts: int) -> timedelta:
+        return timedelta(seconds=min(self.min_delay * 2 ** (attempts - 1), self.max_delay))
+
+    def _claim(self):
+        db = self.session_factory()
+        try:
+            rows = RoomStatusOutboxRepository(db).claim_due(self.batch_size, self.lease)
+            return [(row.id, row.room_id, row.status, row.attempts) for row in rows]
+        finally:
+            db.close()
+
+    def _record(self, delivered: Dict[int, int], failed: list) -> None:
+        db = self.session_factory()
+        try:
+            repo = RoomStatusOutboxRepository(db)
+            if delivered:
+                repo.delivered(delivered)
+            for message_id, attempts, error in failed:
+                repo.retry_later(message_id, attempts, self.backoff(attempts), error)
+        finally:
+            db.close()
+
+    async def _send(self, room_id: int, status: str) -> Optional[str]:
+        """None when the message is done with, otherwise the error to retry on."""
+        try:
+            await self.rooms.mark_room_status(room_id, status)
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code >= 500:
+                return f"HTTP {e.response.status_code}"
+            logger.warning("Dropping room %s -> %s: room service answered %s", room_id, status, e.response.status_code)
+        except httpx.HTTPError as e:
+            return f"{type(e).__name__}: {e}"
+        return None
+
+    async def dispatch_once(self) -> int:
+        """Deliver one batch; returns how many messages were claimed."""
+        messages = await asyncio.to_thread(self._claim)
+        if not messages:
+            return 0
+        errors = await asyncio.gather(*(self._send(room_id, status) for _, room_id, status, _ in messages))
+        delivered, failed = {}, []
+        for (message_id, room_id, status, attempts), error in zip(messages, errors):
+            if error is None:
+                delivered[room_id] = message_id
+                if self.on_delivered is not None:
+                    self.on_delivered(room_id)
+            else:
+                failed.append((message_id, attempts + 1, error))
+                logger.warning("Room %s -> %s failed (attempt %d): %s", room_id, status, attempts + 1, error)
+        await asyncio.to_thread(self._record, delivered, failed)
+        return len(messages)
+
+    def notify(self) -> None:
+        """Wake the dispatcher after a local commit; safe to call from any thread."""
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                # Keep going while full batches come back so a burst is not spread over several intervals
+                while await self.dispatch_once() == self.batch_size:
+                    pass
+            except Exception:
+                logger.exception("Dispatching room status outbox failed")
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = None
+
+# Process-wide dispatcher, started by the app lifespan; delivered rooms drop out of the local room cache
+outbox_dispatcher = OutboxDispatcher(on_delivered=room_cache.invalidate)
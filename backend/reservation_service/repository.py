@@ -1,10 +1,199 @@
-from backend.reservation_service.models import Reservation
+from backend.reservation_service.models import (
+    IdempotencyKey, Reservation, ReservationStatusEnum, RoomStatusOutbox, RoomTypeInventory, ACTIVE_STATUSES,
+)
+from backend.reservation_service.exceptions import RoomUnavailableError
+from datetime import date, datetime, timedelta
+from sqlalchemy import delete, exists, func, insert, select, text, tuple_, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+
+def stay_nights(check_in, check_out) -> List[date]:
+    """Nights a stay occupies: from the check-in date up to, not including, the check-out date (at least one)."""
+    first = check_in.date() if isinstance(check_in, datetime) else check_in
+    last = check_out.date() if isinstance(check_out, datetime) else check_out
+    return [first + timedelta(days=i) for i in range(max((last - first).days, 1))]
+
+def starts_by_today(check_in) -> bool:
+    # Only a stay that has begun holds its room right now; later stays are kept apart by their dates alone
+    first = check_in.date() if isinstance(check_in, datetime) else check_in
+    return first <= date.today()
+
+def day_start(value) -> datetime:
+    return value if isinstance(value, datetime) else datetime.combine(value, datetime.min.time())
+
+def range_end(value) -> datetime:
+    # A date bound covers that whole day; a datetime bound is exact
+    return value if isinstance(value, datetime) else day_start(value + timedelta(days=1))
+
+class RoomTypeInventoryRepository:
+    """Per-night sold counters for each room type of a property.
+
+    ``adjust`` runs inside the caller's transaction and never commits, so the
+    counters move exactly when the reservation write they cover is committed.
+    Reservations without a room type (booked before the type was recorded) are
+    not counted.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def adjust(self, property_id: int, room_type_id: Optional[int], check_in, check_out, delta: int) -> None:
+        if room_type_id is None or not delta:
+            return
+        nights = stay_nights(check_in, check_out)
+        match = (
+            RoomTypeInventory.property_id == property_id,
+            RoomTypeInventory.room_type_id == room_type_id,
+            RoomTypeInventory.night >= nights[0],
+            RoomTypeInventory.night <= nights[-1],
+        )
+        self.db.query(RoomTypeInventory).filter(*match).update(
+            {RoomTypeInventory.sold: RoomTypeInventory.sold + delta}, synchronize_session=False
+        )
+        if delta < 0:
+            return  # Nights without a row were never counted
+        known = {night for (night,) in self.db.query(RoomTypeInventory.night).filter(*match)}
+        for night in nights:
+            if night in known:
+                continue
+            key = dict(property_id=property_id, room_type_id=room_type_id, night=night)
+            try:
+                # First sale of this night; a concurrent first writer may win the insert
+                with self.db.begin_nested():
+                    self.db.execute(insert(RoomTypeInventory).values(sold=delta, **key))
+            except IntegrityError:
+                self.db.query(RoomTypeInventory).filter_by(**key).update(
+                    {RoomTypeInventory.sold: RoomTypeInventory.sold + delta}, synchronize_session=False
+                )
+
+    def sold_range(self, property_id: int, start: date, end: date, room_type_id: Optional[int] = None):
+        """(room_type_id, night, sold) rows for nights in [start, end), one range scan of the unique index."""
+        query = self.db.query(RoomTypeInventory.room_type_id, RoomTypeInventory.night, RoomTypeInventory.sold).filter(
+            RoomTypeInventory.property_id == property_id,
+            RoomTypeInventory.night >= start,
+            RoomTypeInventory.night < end,
+        )
+        if room_type_id is not None:
+            query = query.filter(RoomTypeInventory.room_type_id == room_type_id)
+        return query.order_by(RoomTypeInventory.room_type_id, RoomTypeInventory.night).all()
+
+class IdempotencyKeyRepository:
+    """Stored responses keyed by Idempotency-Key. Every method commits on its own.
+
+    The unique constraint on ``key`` decides which request does the work. A
+    claim expires after its lease, so a key held by a crashed process can be
+    claimed again.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, key: str) -> Optional[IdempotencyKey]:
+        return self.db.query(IdempotencyKey).filter(IdempotencyKey.key == key).populate_existing().first()
+
+    def claim(self, key: str, request_hash: str, lease: timedelta) -> Optional[IdempotencyKey]:
+        """Take the key and return None, or return the row of whoever holds it."""
+        while True:
+            now = datetime.now()
+            try:
+                self.db.execute(insert(IdempotencyKey).values(
+                    key=key, request_hash=request_hash, expires_at=now + lease, created_at=now, updated_at=now,
+                ))
+                self.db.commit()
+                return None
+            except IntegrityError:
+                self.db.rollback()
+            row = self.get(key)
+            if row is None:
+                continue  # Purged between our insert and read
+            if row.expires_at > now:
+                return row
+            # Expired: drop it unless someone else replaced it first, then try again
+            self.db.execute(delete(IdempotencyKey).where(
+                IdempotencyKey.key == key, IdempotencyKey.expires_at == row.expires_at,
+            ))
+            self.db.commit()
+
+    def complete(self, key: str, status_code: int, body: str, ttl: timedelta) -> None:
+        self.db.execute(update(IdempotencyKey).where(IdempotencyKey.key == key).values(
+            status_code=status_code, response_body=body, expires_at=datetime.now() + ttl,
+        ))
+        self.db.commit()
+
+    def release(self, key: str) -> None:
+        # Give up an in-flight claim so a retry can do the work
+        self.db.execute(delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.status_code.is_(None)))
+        self.db.commit()
+
+    def purge_expired(self) -> int:
+        result = self.db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.now()))
+        self.db.commit()
+        return result.rowcount
+
+class RoomStatusOutboxRepository:
+    """Pending room status updates for the room service.
+
+    ``enqueue`` runs inside the caller's transaction and never commits. The
+    other methods belong to the dispatcher and commit on their own. Only the
+    newest message per room matters: delivering it also retires the older
+    messages for that room.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def enqueue(self, room_id: Optional[int], status: str) -> None:
+        if room_id is None:
+            return
+        now = datetime.now()
+        self.db.add(RoomStatusOutbox(room_id=room_id, status=status, attempts=0, next_attempt_at=now))
+
+    def claim_due(self, limit: int, lease: timedelta) -> List[RoomStatusOutbox]:
+        """Newest message per room, when it is due, leased so that other dispatchers skip it until the lease ends.
+
+        A room whose newest message is leased or backing off is skipped as a
+        whole: sending one of its older messages could overwrite a newer status.
+        """
+        now = datetime.now()
+        newest = select(func.max(RoomStatusOutbox.id)).group_by(RoomStatusOutbox.room_id)
+        query = self.db.query(RoomStatusOutbox).filter(
+            RoomStatusOutbox.id.in_(newest), RoomStatusOutbox.next_attempt_at <= now,
+        ).order_by(RoomStatusOutbox.id).limit(limit)
+        if self.db.get_bind().dialect.name == "postgresql":
+            query = query.with_for_update(skip_locked=True)
+        rows = query.all()
+        for row in rows:
+            row.next_attempt_at = now + lease
+        self.db.commit()
+        return rows
+
+    def delivered(self, messages: Dict[int, int]) -> None:
+        # messages: room_id -> id of the delivered message; older messages for the room are superseded
+        for room_id, message_id in messages.items():
+            self.db.execute(delete(RoomStatusOutbox).where(
+                RoomStatusOutbox.room_id == room_id, RoomStatusOutbox.id <= message_id,
+            ))
+        self.db.commit()
+
+    def retry_later(self, message_id: int, attempts: int, delay: timedelta, error: str) -> None:
+        self.db.execute(update(RoomStatusOutbox).where(RoomStatusOutbox.id == message_id).values(
+            attempts=attempts, next_attempt_at=datetime.now() + delay, last_error=error[:500],
+        ))
+        self.db.commit()
+
+    def pending(self) -> int:
+        return self.db.query(func.count(RoomStatusOutbox.id)).scalar()
 
 class ReservationRepository:
     def __init__(self, db: Session):
         self.db = db
+        self.inventory = RoomTypeInventoryRepository(db)
+        self.outbox = RoomStatusOutboxRepository(db)
+
+    def count_nights(self, reservation: Reservation, delta: int) -> None:
+        # Add or remove this stay's nights from the room type counters; the caller commits
+        self.inventory.adjust(reservation.property_id, reservation.room_type_id, reservation.check_in, reservation.check_out, delta)
 
     def get(self, id: int) -> Optional[Reservation]:
         return self.db.query(Reservation).filter(Reservation.id == id).first()
@@ -17,16 +206,149 @@ class ReservationRepository:
             query = query.filter(Reservation.guest_id == guest_id)
         return query.all()
 
-    def list_reservations(self, property_id: int = None, guest_id: int = None, start_date: str = None, end_date: str = None) -> List[Reservation]:
-        query = self.db.query(Reservation)
+    def filtered(self, query, property_id: int = None, guest_id: int = None, start_date: date = None, end_date: date = None,
+                 overlaps: bool = False):
+        """Apply the listing filters.
+
+        By default a stay must lie within [start_date, end_date]. With
+        ``overlaps`` it only has to share part of that range. Both are range
+        predicates on check_in and check_out, so the (property_id, check_in)
+        and (property_id, check_out) indexes can serve them.
+        """
         if property_id:
             query = query.filter(Reservation.property_id == property_id)
         if guest_id:
             query = query.filter(Reservation.guest_id == guest_id)
-        if start_date:
-            query = query.filter(Reservation.check_in >= start_date)
-        if end_date:
-            query = query.filter(Reservation.check_out <= end_date)
+        if overlaps:
+            if start_date:
+                query = query.filter(Reservation.check_out > day_start(start_date))
+            if end_date:
+                query = query.filter(Reservation.check_in < range_end(end_date))
+        else:
+            if start_date:
+                query = query.filter(Reservation.check_in >= day_start(start_date))
+            if end_date:
+                query = query.filter(Reservation.check_out <= range_end(end_date))
+        return query
+
+    def arrivals(self, property_id: int, business_date: date):
+        # Stays starting on the business date, whether or not the guest has checked in yet
+        start = day_start(business_date)
+        return self.db.query(Reservation).filter(
+            Reservation.property_id == property_id,
+            Reservation.check_in >= start,
+            Reservation.check_in < range_end(business_date),
+            Reservation.status != ReservationStatusEnum.CANCELED,
+        ).order_by(Reservation.check_in, Reservation.id)
+
+    def departures(self, property_id: int, business_date: date):
+        # Stays ending on the business date, including ones already checked out
+        start = day_start(business_date)
+        return self.db.query(Reservation).filter(
+            Reservation.property_id == property_id,
+            Reservation.check_out >= start,
+            Reservation.check_out < range_end(business_date),
+            Reservation.status != ReservationStatusEnum.CANCELED,
+        ).order_by(Reservation.check_out, Reservation.id)
+
+    def in_house(self, property_id: int, business_date: date):
+        # Active stays that hold a room for the night of the business date
+        night_end = range_end(business_date)
+        return self.db.query(Reservation).filter(
+            Reservation.property_id == property_id,
+            Reservation.check_out >= night_end,
+            Reservation.check_in < night_end,
+            Reservation.status.in_(ACTIVE_STATUSES),
+        ).order_by(Reservation.check_in, Reservation.id)
+
+    def list_reservations(self, property_id: int = None, guest_id: int = None, start_date: date = None, end_date: date = None,
+                          overlaps: bool = False) -> List[Reservation]:
+        return self.filtered(self.db.query(Reservation), property_id, guest_id, start_date, end_date, overlaps).all()
+
+    def keyset(self, query, after: Optional[Tuple[datetime, int]]):
+        # Rows after the cursor in (check_in, id) order; id breaks ties between equal check-ins
+        if after is not None:
+            query = query.filter(tuple_(Reservation.check_in, Reservation.id) > tuple_(*after))
+        return query.order_by(Reservation.check_in, Reservation.id)
+
+    def list_page(self, property_id: int = None, guest_id: int = None, start_date: date = None, end_date: date = None,
+                  overlaps: bool = False, after: Optional[Tuple[datetime, int]] = None, limit: int = 500) -> List[Reservation]:
+        query = self.filtered(self.db.query(Reservation), property_id, guest_id, start_date, end_date, overlaps)
+        return self.keyset(query, after).limit(limit).all()
+
+    def iter_rows(self, property_id: int = None, guest_id: int = None, start_date: date = None, end_date: date = None,
+                  overlaps: bool = False, after: Optional[Tuple[datetime, int]] = None, columns=None,
+                  batch_size: int = 1000) -> Iterator:
+        """Yield matching rows as plain tuples, fetched ``batch_size`` at a time from a server-side cursor.
+
+        Nothing is kept once a row has been yielded, so memory stays flat however many rows match.
+        """
+        columns = columns or [Reservation]
+        query = self.filtered(self.db.query(*columns), property_id, guest_id, start_date, end_date, overlaps)
+        yield from self.keyset(query, after).yield_per(batch_size)
+
+    def overlap_clause(self, room_id: int, check_in, check_out, exclude_id: Optional[int] = None):
+        # Half-open stays: checking out on a day and checking in on the same day do not clash
+        clause = exists().where(
+            Reservation.room_id == room_id,
+            Reservation.check_in < check_out,
+            Reservation.check_out > check_in,
+            Reservation.status.in_(ACTIVE_STATUSES),
+        )
+        if exclude_id is not None:
+            clause = clause.where(Reservation.id != exclude_id)
+        return clause
+
+    def has_overlap(self, room_id: int, check_in, check_out, exclude_id: Optional[int] = None) -> bool:
+        return self.db.execute(select(self.overlap_clause(room_id, check_in, check_out, exclude_id))).scalar()
+
+    def lock_room(self, room_id: int) -> None:
+        """Serialize bookings of one room until the transaction ends; call it before the overlap check.
+
+        PostgreSQL takes an advisory lock on the room, because at READ
+        COMMITTED two inserts would not see each other's rows. pysqlite only
+        opens a transaction at the first write, so the overlap check would run
+        unlocked; a write that matches nothing takes the database write lock
+        first, and other bookings wait for it until this one commits.
+        """
+        dialect = self.db.get_bind().dialect.name
+        if dialect == "postgresql":
+            self.db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": room_id})
+        elif dialect == "sqlite":
+            self.db.execute(text("UPDATE reservations SET room_id = room_id WHERE 0"))
+
+    def create_if_free(self, obj_in) -> Optional[Reservation]:
+        """Insert unless the room already has an overlapping active stay; returns None on conflict.
+
+        The EXISTS check and the INSERT share one transaction.
+        """
+        data = obj_in.dict()
+        try:
+            if data.get('room_id') is not None:
+                self.lock_room(data['room_id'])
+                if self.has_overlap(data['room_id'], data['check_in'], data['check_out']):
+                    self.db.rollback()
+                    return None
+            db_obj = Reservation(**data)
+            self.db.add(db_obj)
+            self.count_nights(db_obj, 1)
+            if starts_by_today(db_obj.check_in):
+                self.outbox.enqueue(db_obj.room_id, "OCCUPIED")
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        self.db.refresh(db_obj)
+        return db_obj
+
+    def list_active(self, property_id: int, check_out_after=None) -> List[Reservation]:
+        query = self.db.query(Reservation.id, Reservation.room_id, Reservation.check_in, Reservation.check_out).filter(
+            Reservation.property_id == property_id,
+            Reservation.room_id.isnot(None),
+            Reservation.status.in_(ACTIVE_STATUSES),
+        )
+        if check_out_after is not None:
+            query = query.filter(Reservation.check_out > check_out_after)
         return query.all()
 
     def create(self, obj_in) -> Reservation:
@@ -40,15 +362,38 @@ class ReservationRepository:
         db_obj = self.get(id)
         if db_obj is None:
             raise AttributeError(f"Reservation with id {id} does not exist.")
-        for field, value in obj_in.dict(exclude_unset=True).items():
-            if hasattr(db_obj, field):
-                setattr(db_obj, field, value)
-        self.db.commit()
+        was_active = db_obj.status in ACTIVE_STATUSES
+        before = (db_obj.room_id, db_obj.room_type_id, db_obj.check_in, db_obj.check_out)
+        try:
+            if was_active:
+                self.count_nights(db_obj, -1)
+            for field, value in obj_in.dict(exclude_unset=True).items():
+                if field == 'status' and value is not None:
+                    value = ReservationStatusEnum(getattr(value, 'value', value))  # API enum -> model enum
+                if hasattr(db_obj, field):
+                    setattr(db_obj, field, value)
+            if db_obj.check_in >= db_obj.check_out:
+                raise RoomUnavailableError("Check-in date must be before check-out date.")
+            if db_obj.status in ACTIVE_STATUSES:
+                moved = (db_obj.room_id, db_obj.room_type_id, db_obj.check_in, db_obj.check_out) != before
+                if db_obj.room_id is not None and (moved or not was_active):
+                    self.lock_room(db_obj.room_id)
+                    if self.has_overlap(db_obj.room_id, db_obj.check_in, db_obj.check_out, exclude_id=id):
+                        raise RoomUnavailableError(f"Room {db_obj.room_id} is already booked for these dates.")
+                self.count_nights(db_obj, 1)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
         self.db.refresh(db_obj)
         return db_obj
 
     def delete(self, id: int) -> None:
         db_obj = self.get(id)
         if db_obj is not None:
+            if db_obj.status in ACTIVE_STATUSES:
+                self.count_nights(db_obj, -1)
+                if starts_by_today(db_obj.check_in):
+                    self.outbox.enqueue(db_obj.room_id, "AVAILABLE")
             self.db.delete(db_obj)
             self.db.commit()
@@ -0,0 +1,125 @@
+# Short-lived cache of room records fetched from the room service
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from backend.reservation_service.clients import RoomServiceClient, room_service_client
+
+logger = logging.getLogger(__name__)
+
+class RoomCache:
+    """LRU + TTL cache of room records with request coalescing.
+
+    Concurrent misses for the same room share one upstream call. Room status
+    events invalidate entries. A fetch that was in flight when its room was
+    invalidated is returned to its callers but not stored, so it cannot put a
+    pre-event record back into the cache. Misses (unknown rooms) are not cached.
+    """
+
+    def __init__(self, fetch: Callable[[int], Awaitable[Optional[dict]]], maxsize: int = 1024, ttl: float = 5.0):
+        self.fetch = fetch
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, Tuple[float, dict]]" = OrderedDict()
+        self._inflight: Dict[int, asyncio.Future] = {}
+        self._epochs: Dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, room_id: int) -> Optional[dict]:
+        entry = self._entries.get(room_id)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                self._entries.move_to_end(room_id)
+                return entry[1]
+            del self._entries[room_id]
+        pending = self._inflight.get(room_id)
+        if pending is not None:
+            # shield: one waiter being cancelled must not cancel the shared fetch
+            return await asyncio.shield(pending)
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[room_id] = future
+        epoch = self._epochs.get(room_id, 0)
+        try:
+            room = await self.fetch(room_id)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved when nobody else was waiting
+            raise
+        finally:
+            del self._inflight[room_id]
+        if room is not None and self._epochs.get(room_id, 0) == epoch:
+            self.put(room_id, room)
+        future.set_result(room)
+        return room
+
+    def put(self, room_id: int, room: dict) -> None:
+        self._entries[room_id] = (time.monotonic() + self.ttl, room)
+        self._entries.move_to_end(room_id)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, room_id: Optional[int] = None) -> None:
+        if room_id is None:
+            self._entries.clear()
+            for key in list(self._epochs) + list(self._inflight):
+                self._epochs[key] = self._epochs.get(key, 0) + 1
+            return
+        self._entries.pop(room_id, None)
+        self._epochs[room_id] = self._epochs.get(room_id, 0) + 1
+
+class RoomEventListener:
+    """Follows the room service's status event stream and invalidates cached rooms.
+
+    It reconnects with exponential backoff and resumes with Last-Event-ID, so
+    events sent while it was disconnected are still applied. The first
+    connection clears the cache, because changes made before it are unknown.
+    """
+
+    def __init__(self, rooms: RoomServiceClient, cache: RoomCache, min_delay: float = 0.5, max_delay: float = 30.0):
+        self.rooms = rooms
+        self.cache = cache
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.last_event_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        delay = self.min_delay
+        while True:
+            try:
+                if self.last_event_id is None:
+                    self.cache.invalidate()
+                async for event_id, event in self.rooms.stream_events(self.last_event_id):
+                    self.cache.invalidate(event.get("room_id"))
+                    if event_id is not None:
+                        self.last_event_id = event_id
+                    delay = self.min_delay
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Room event stream dropped (%s); reconnecting in %.1fs", e, delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_delay)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+# Process-wide cache and its invalidation feed; the listener is started by the app lifespan
+room_cache = RoomCache(room_service_client.get_room)
+room_event_listener = RoomEventListener(room_service_client, room_cache)
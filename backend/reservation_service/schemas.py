@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime
 from enum import Enum
 
 class ReservationStatusEnum(str, Enum):
@@ -21,6 +21,9 @@ class ReservationCreate(BaseModel):
 class ReservationUpdate(BaseModel):
     status: Optional[ReservationStatusEnum] = None
     room_id: Optional[int] = None
+    room_type_id: Optional[int] = None
+    check_in: Optional[datetime] = None
+    check_out: Optional[datetime] = None
     price: Optional[float] = None
     payment_status: Optional[str] = None
 
@@ -29,6 +32,7 @@ class ReservationRead(BaseModel):
     property_id: int
     guest_id: int
     room_id: Optional[int]
+    room_type_id: Optional[int] = None
     check_in: datetime
     check_out: datetime
     status: ReservationStatusEnum
@@ -37,3 +41,23 @@ class ReservationRead(BaseModel):
 
     class Config:
         orm_mode = True
+
+class FrontDeskReservation(ReservationRead):
+    guest_name: Optional[str] = None  # None when the guest service does not know the guest or is unreachable
+
+class AvailabilityRead(BaseModel):
+    property_id: int
+    room_type_id: Optional[int] = None
+    check_in: date
+    check_out: date
+    room_ids: List[int]
+
+class NightInventory(BaseModel):
+    night: date
+    sold: int
+    sellable: int
+
+class RoomTypeInventoryRead(BaseModel):
+    room_type_id: int
+    total: int  # Rooms of this type at the property
+    nights: List[NightInventory]
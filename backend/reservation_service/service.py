@@ -1,36 +1,55 @@
+import asyncio
+import logging
 import httpx
-from backend.reservation_service.repository import ReservationRepository
+from backend.reservation_service.repository import ReservationRepository, starts_by_today
 from backend.reservation_service.models import ReservationStatusEnum
-from backend.room_service.service import RoomService
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from backend.reservation_service.exceptions import ReservationError, RoomUnavailableError, InvalidReservationStatus
+from backend.reservation_service.conflicts import StayIndex
+from backend.reservation_service.clients import GuestServiceClient, RoomServiceClient, guest_service_client, room_service_client
+from backend.reservation_service.room_cache import RoomCache
+from backend.reservation_service.availability import AvailabilityIndex, sellable
+from backend.reservation_service.outbox import OutboxDispatcher
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
 
-ROOM_SERVICE_URL = "http://localhost:8001/api/v1/room-service/rooms"
+logger = logging.getLogger(__name__)
+
+# Longest range one inventory read may cover
+MAX_INVENTORY_NIGHTS = 366
 
 class ReservationService:
-    def __init__(self, db: Session, room_service: RoomService):
+    def __init__(self, db: Session, stays: Optional[StayIndex] = None,
+                 rooms: RoomServiceClient = room_service_client, room_cache: Optional[RoomCache] = None,
+                 availability: Optional[AvailabilityIndex] = None, outbox: Optional[OutboxDispatcher] = None,
+                 guests: GuestServiceClient = guest_service_client):
         self.repo = ReservationRepository(db)
-        self.room_service = room_service
+        self.stays = stays
+        self.rooms = rooms
+        self.room_cache = room_cache
+        self.availability = availability
+        self.outbox = outbox
+        self.guests = guests
 
     async def get_room_http(self, room_id):
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(f"{ROOM_SERVICE_URL}?property_id=1")
-            resp.raise_for_status()
-            rooms = resp.json()
-            for room in rooms:
-                if room["id"] == room_id:
-                    return room
-            return None
+        if self.room_cache is not None:
+            return await self.room_cache.get(room_id)
+        return await self.rooms.get_room(room_id)
 
-    async def mark_room_status_http(self, room_id, status):
-        async with httpx.AsyncClient() as client:
-            resp = await client.patch(f"{ROOM_SERVICE_URL}/{room_id}", json={"status": status})
-            resp.raise_for_status()
-            return resp.json()
+    def room_status_queued(self) -> None:
+        # The status change was committed to the outbox; wake the dispatcher to send it now
+        if self.outbox is not None:
+            self.outbox.notify()
 
     def create_reservation(self, property_id, guest_id, room_type_id, check_in, check_out, price=None, payment_status=None, room_id=None):
-        import asyncio
+        """Synchronous entry point for scripts and tests; the API awaits create_reservation_async."""
+        self.validate_booking(check_in, check_out, price, room_id)
+        return asyncio.run(self.create_reservation_async(
+            property_id, guest_id, room_type_id, check_in, check_out, price, payment_status, room_id
+        ))
+
+    def validate_booking(self, check_in, check_out, price=None, room_id=None):
         now = datetime.now()
         if check_in >= check_out:
             raise ReservationError("Check-in date must be before check-out date.")
@@ -38,20 +57,26 @@ class ReservationService:
             raise ReservationError("Cannot create reservation in the past.")
         if price is not None and price < 0:
             raise ReservationError("Price cannot be negative.")
-        # Use provided room_id if given, else allocate by type
-        if room_id:
-            room = asyncio.run(self.get_room_http(room_id))
-            if not room:
-                raise RoomUnavailableError(f"Room {room_id} not found.")
-            if room["status"] != "AVAILABLE":
-                raise RoomUnavailableError(f"Room {room_id} is not available.")
-            asyncio.run(self.mark_room_status_http(room_id, "OCCUPIED"))
-        else:
+        if not room_id:
             raise RoomUnavailableError("room_id is required for reservation in microservice mode.")
-        reservation = self.repo.create(type('obj', (object,), {
+
+    async def create_reservation_async(self, property_id, guest_id, room_type_id, check_in, check_out, price=None, payment_status=None, room_id=None):
+        # Database work runs in the threadpool; the room service calls share the pooled client
+        self.validate_booking(check_in, check_out, price, room_id)
+        # The in-memory index rejects obvious double bookings before any I/O
+        if self.stays is not None and await run_in_threadpool(self.stays.has_conflict, self.repo.db, property_id, room_id, check_in, check_out):
+            raise RoomUnavailableError(f"Room {room_id} is already booked for these dates.")
+        room = await self.get_room_http(room_id)
+        if not room:
+            raise RoomUnavailableError(f"Room {room_id} not found.")
+        if not sellable(room["status"], check_in):
+            raise RoomUnavailableError(f"Room {room_id} is not available.")
+        room_type_id = room.get("type_id", room_type_id)
+        reservation = await run_in_threadpool(self.repo.create_if_free, type('obj', (object,), {
             'property_id': property_id,
             'guest_id': guest_id,
             'room_id': room_id,
+            'room_type_id': room_type_id,
             'check_in': check_in,
             'check_out': check_out,
             'price': price,
@@ -60,14 +85,30 @@ class ReservationService:
                 'property_id': property_id,
                 'guest_id': guest_id,
                 'room_id': room_id,
+                'room_type_id': room_type_id,
                 'check_in': check_in,
                 'check_out': check_out,
                 'price': price,
                 'payment_status': payment_status
             }
         })())
+        if reservation is None:
+            raise RoomUnavailableError(f"Room {room_id} is already booked for these dates.")
+        # A stay starting today queued its OCCUPIED update in the insert's transaction; later stays wait for check-in
+        self.room_status_queued()
+        if self.stays is not None:
+            self.stays.add(property_id, room_id, check_in, check_out, reservation.id)
+        if self.availability is not None:
+            self.availability.occupy(property_id, room_id, check_in, check_out)
         return reservation
 
+    def release_stay(self, reservation) -> None:
+        # Keep the in-memory index in step when a stay stops holding its room
+        if self.stays is not None:
+            self.stays.remove(reservation.property_id, reservation.room_id, reservation.id)
+        if self.availability is not None:
+            self.availability.release(reservation.property_id, reservation.room_id, reservation.check_in, reservation.check_out)
+
     def cancel_reservation(self, reservation_id):
         reservation = self.repo.get(reservation_id)
         if not reservation:
@@ -79,10 +120,13 @@ class ReservationService:
         if reservation.status == ReservationStatusEnum.CHECKED_OUT:
             raise InvalidReservationStatus("Cannot cancel a checked-out reservation.")
         reservation.status = ReservationStatusEnum.CANCELED
+        self.repo.count_nights(reservation, -1)
+        # Free up the room, if the stay had started holding it
+        if starts_by_today(reservation.check_in):
+            self.repo.outbox.enqueue(reservation.room_id, 'AVAILABLE')
         self.repo.db.commit()
-        # Free up the room
-        if reservation.room_id:
-            self.room_service.mark_room_status(reservation.room_id, 'AVAILABLE')
+        self.release_stay(reservation)
+        self.room_status_queued()
         return reservation
 
     def check_in(self, reservation_id):
@@ -92,7 +136,9 @@ class ReservationService:
         if reservation.status != ReservationStatusEnum.BOOKED:
             raise InvalidReservationStatus("Can only check in a BOOKED reservation.")
         reservation.status = ReservationStatusEnum.CHECKED_IN
+        self.repo.outbox.enqueue(reservation.room_id, 'OCCUPIED')
         self.repo.db.commit()
+        self.room_status_queued()
         return reservation
 
     def check_out(self, reservation_id):
@@ -102,11 +148,65 @@ class ReservationService:
         if reservation.status != ReservationStatusEnum.CHECKED_IN:
             raise InvalidReservationStatus("Can only check out a CHECKED_IN reservation.")
         reservation.status = ReservationStatusEnum.CHECKED_OUT
-        self.repo.db.commit()
+        # Leaving early gives back the nights from today on, so they can be sold again
+        today = date.today()
+        first_unused = max(today, reservation.check_in.date())
+        if first_unused < reservation.check_out.date():
+            self.repo.inventory.adjust(reservation.property_id, reservation.room_type_id, first_unused, reservation.check_out, -1)
         # Free up the room
-        if reservation.room_id:
-            self.room_service.mark_room_status(reservation.room_id, 'AVAILABLE')
+        self.repo.outbox.enqueue(reservation.room_id, 'AVAILABLE')
+        self.repo.db.commit()
+        self.release_stay(reservation)
+        self.room_status_queued()
         return reservation
 
-    def list_reservations(self, property_id=None, guest_id=None, start_date=None, end_date=None):
-        return self.repo.list_reservations(property_id, guest_id, start_date, end_date)
+    async def room_type_inventory(self, property_id: int, start: date, end: date, room_type_id: Optional[int] = None):
+        """Sold and sellable rooms per room type and night for [start, end)."""
+        if start >= end:
+            raise ReservationError("start must be before end.")
+        if (end - start).days > MAX_INVENTORY_NIGHTS:
+            raise ReservationError(f"At most {MAX_INVENTORY_NIGHTS} nights can be read at once.")
+        summary = await self.rooms.get_room_summary(property_id)
+        rows = await run_in_threadpool(self.repo.inventory.sold_range, property_id, start, end, room_type_id)
+        totals = {int(type_id): sum(counts.values()) for type_id, counts in summary["by_type"].items()}
+        sold = {}
+        for type_id, night, count in rows:
+            sold.setdefault(type_id, {})[night] = count
+        type_ids = [room_type_id] if room_type_id is not None else sorted(set(totals) | set(sold))
+        nights = [start + timedelta(days=i) for i in range((end - start).days)]
+        result = []
+        for type_id in type_ids:
+            total = totals.get(type_id, 0)
+            by_night = sold.get(type_id, {})
+            result.append({
+                "room_type_id": type_id,
+                "total": total,
+                "nights": [
+                    {"night": night, "sold": by_night.get(night, 0), "sellable": max(total - by_night.get(night, 0), 0)}
+                    for night in nights
+                ],
+            })
+        return result
+
+    async def front_desk_list(self, kind: str, property_id: int, business_date: date):
+        """Arrivals, departures or in-house stays for a business date, with guest names from one batched lookup."""
+        query = {"arrivals": self.repo.arrivals, "departures": self.repo.departures, "in-house": self.repo.in_house}[kind]
+        reservations = await run_in_threadpool(lambda: query(property_id, business_date).all())
+        guests = {}
+        if reservations:
+            try:
+                guests = await self.guests.get_guests(r.guest_id for r in reservations)
+            except httpx.HTTPError as e:
+                # The list is still useful without names
+                logger.warning("Guest lookup for %s failed: %s", kind, e)
+        rows = []
+        for reservation in reservations:
+            guest = guests.get(reservation.guest_id)
+            rows.append({
+                **{column.name: getattr(reservation, column.name) for column in reservation.__table__.columns},
+                "guest_name": f"{guest['first_name']} {guest['last_name']}" if guest else None,
+            })
+        return rows
+
+    def list_reservations(self, property_id=None, guest_id=None, start_date=None, end_date=None, overlaps=False):
+        return self.repo.list_reservations(property_id, guest_id, start_date, end_date, overlaps)
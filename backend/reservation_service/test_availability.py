@@ -0,0 +1,149 @@
+import pytest
+from datetime import date, datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from fastapi.testclient import TestClient
+from backend.core.base import Base
+from backend.reservation_service import availability
+from backend.reservation_service.availability import AvailabilityIndex, OccupancyMatrix
+from backend.reservation_service.models import Reservation, ReservationStatusEnum
+
+@pytest.fixture(scope="function")
+def db_session():
+    # StaticPool: matrix builds run in the threadpool, which must see the same in-memory database
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture(params=["numpy", "bitset"])
+def backend(request, monkeypatch):
+    if request.param == "bitset":
+        monkeypatch.setattr(availability, "np", None)
+    elif availability.np is None:
+        pytest.skip("numpy not installed")
+    return request.param
+
+TODAY = date.today()
+
+def day(n):
+    return TODAY + timedelta(days=n)
+
+def at(n, hour=15):
+    return datetime.combine(day(n), datetime.min.time()).replace(hour=hour)
+
+ROOMS = [{"id": 1, "type_id": 10, "status": "AVAILABLE"}, {"id": 2, "type_id": 10, "status": "AVAILABLE"},
+         {"id": 3, "type_id": 20, "status": "AVAILABLE"}]
+
+def fake_rooms(calls=None):
+    async def list_rooms(property_id):
+        if calls is not None:
+            calls.append(property_id)
+        return ROOMS if property_id == 1 else []
+    return list_rooms
+
+def stay(room_id, check_in, check_out, status=ReservationStatusEnum.BOOKED, property_id=1):
+    return Reservation(property_id=property_id, guest_id=1, room_id=room_id, check_in=check_in, check_out=check_out, status=status)
+
+def test_matrix_is_half_open_and_matches_brute_force(backend):
+    matrix = OccupancyMatrix(TODAY, [1, 2, 3], [10, 10, 20], nights=40)
+    stays = {1: [(3, 6)], 2: [(0, 2), (10, 12)], 3: []}
+    for room_id, ranges in stays.items():
+        for a, b in ranges:
+            matrix.mark(room_id, at(a), at(b, hour=11))
+    for a in range(0, 14):
+        for b in range(a + 1, 15):
+            expected = [r for r, ranges in stays.items() if not any(s < b and e > a for s, e in ranges)]
+            assert matrix.free_rooms(day(a), day(b)) == expected
+    assert matrix.free_rooms(day(6), day(8), room_type_id=10) == [1, 2]  # arrive on the check-out day
+    assert matrix.free_rooms(day(4), day(5), room_type_id=20) == [3]
+
+def test_matrix_release_and_unknown_rooms(backend):
+    matrix = OccupancyMatrix(TODAY, [1], [10], nights=10)
+    matrix.mark(1, at(2), at(4))
+    matrix.mark(99, at(2), at(4))  # not in the roster
+    assert matrix.free_rooms(day(3), day(4)) == []
+    matrix.mark(1, at(2), at(4), occupied=False)
+    assert matrix.free_rooms(day(3), day(4)) == [1]
+
+@pytest.mark.asyncio
+async def test_index_loads_active_stays_and_tracks_changes(db_session, backend):
+    db_session.add_all([
+        stay(1, at(1), at(4)),
+        stay(2, at(2), at(3), status=ReservationStatusEnum.CANCELED),
+        stay(3, at(-5), at(-2)),  # already over
+        stay(1, at(1), at(4), property_id=2),
+    ])
+    db_session.commit()
+    calls = []
+    index = AvailabilityIndex(fake_rooms(calls))
+    assert await index.search(db_session, 1, day(2), day(3)) == [2, 3]
+    assert await index.search(db_session, 1, day(2), day(3), room_type_id=10) == [2]
+    assert calls == [1]  # built once, then served from memory
+    index.occupy(1, 2, at(2), at(5))
+    assert await index.search(db_session, 1, day(2), day(3)) == [3]
+    index.release(1, 1, at(1), at(4))
+    assert await index.search(db_session, 1, day(2), day(3)) == [1, 3]
+    index.invalidate(1)
+    assert await index.search(db_session, 1, day(2), day(3)) == [2, 3]
+    assert calls == [1, 1]
+
+@pytest.mark.asyncio
+async def test_index_rejects_ranges_outside_horizon(db_session):
+    index = AvailabilityIndex(fake_rooms(), nights=30)
+    with pytest.raises(ValueError):
+        await index.search(db_session, 1, day(3), day(3))
+    with pytest.raises(ValueError):
+        await index.search(db_session, 1, day(-1), day(2))
+    with pytest.raises(ValueError):
+        await index.search(db_session, 1, day(28), day(31))
+    assert await index.search(db_session, 1, day(28), day(30)) == [1, 2, 3]
+
+def test_availability_endpoint(db_session, monkeypatch):
+    from backend.reservation_service.main import app
+    from backend.reservation_service import api
+    db_session.add(stay(1, at(1), at(4)))
+    db_session.commit()
+    monkeypatch.setattr(api, "availability_index", AvailabilityIndex(fake_rooms()))
+    app.dependency_overrides[api.get_db] = lambda: db_session
+    try:
+        client = TestClient(app)
+        params = {"property_id": 1, "check_in": day(2).isoformat(), "check_out": day(4).isoformat()}
+        resp = client.get("/api/v1/availability", params=params)
+        assert resp.status_code == 200
+        assert resp.json() == {"property_id": 1, "room_type_id": None, "check_in": params["check_in"],
+                               "check_out": params["check_out"], "room_ids": [2, 3]}
+        resp = client.get("/api/v1/availability", params={**params, "room_type_id": 20})
+        assert resp.json()["room_ids"] == [3]
+        resp = client.get("/api/v1/availability", params={**params, "check_out": params["check_in"]})
+        assert resp.status_code == 400
+    finally:
+        app.dependency_overrides.clear()
+
+@pytest.mark.asyncio
+async def test_search_and_booking_share_one_rule(db_session):
+    from backend.reservation_service.availability import sellable
+    from backend.reservation_service.service import ReservationService
+    roster = [{"id": 1, "type_id": 10, "status": "OCCUPIED"}, {"id": 2, "type_id": 10, "status": "MAINTENANCE"},
+              {"id": 3, "type_id": 10, "status": "AVAILABLE"}]
+    async def list_rooms(property_id):
+        return roster
+    index = AvailabilityIndex(list_rooms)
+    # The current status only matters for a stay starting today; later stays are judged by their dates
+    assert await index.search(db_session, 1, day(0), day(2)) == [3]
+    assert await index.search(db_session, 1, day(30), day(32)) == [1, 2, 3]
+    assert not sellable("MAINTENANCE", day(0)) and sellable("MAINTENANCE", at(30))
+    service = ReservationService(db_session, availability=index)
+    async def get_room_http(room_id):
+        return roster[room_id - 1]
+    service.get_room_http = get_room_http
+    booked = await service.create_reservation_async(1, 1, None, at(30), at(32), room_id=2)
+    assert service.repo.outbox.pending() == 0  # next month's stay leaves the room's current status alone
+    assert await index.search(db_session, 1, day(30), day(32)) == [1, 3]
+    service.check_in(booked.id)
+    assert service.repo.outbox.pending() == 1  # the guest arriving takes the room
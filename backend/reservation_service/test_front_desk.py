@@ -0,0 +1,96 @@
+import httpx
+import pytest
+from datetime import date, datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from fastapi.testclient import TestClient
+from backend.core.base import Base
+from backend.reservation_service.clients import GuestServiceClient
+from backend.reservation_service.models import Reservation, ReservationStatusEnum
+from backend.reservation_service.service import ReservationService
+
+GUEST_URL = "http://guests.test/api/v1/guests"
+DAY = date(2026, 3, 10)
+
+@pytest.fixture(scope="function")
+def db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def at(days, hour):
+    return datetime.combine(DAY + timedelta(days=days), datetime.min.time()).replace(hour=hour)
+
+def guest_client(calls, down=False):
+    names = {1: ("Ada", "Lovelace"), 2: ("Alan", "Turing"), 3: ("Grace", "Hopper")}
+    def handler(request):
+        calls.append(request.url.params["ids"])
+        if down:
+            return httpx.Response(503)
+        ids = [int(i) for i in request.url.params["ids"].split(",")]
+        return httpx.Response(200, json={"guests": [{"id": i, "first_name": names[i][0], "last_name": names[i][1]}
+                                                    for i in ids if i in names],
+                                         "missing": [i for i in ids if i not in names]})
+    return GuestServiceClient(base_url=GUEST_URL, transport=httpx.MockTransport(handler))
+
+@pytest.fixture
+def stays(db_session):
+    db_session.add_all([
+        Reservation(property_id=1, guest_id=1, room_id=1, check_in=at(0, 15), check_out=at(2, 11), status=ReservationStatusEnum.BOOKED),
+        Reservation(property_id=1, guest_id=2, room_id=2, check_in=at(-2, 15), check_out=at(0, 11), status=ReservationStatusEnum.CHECKED_IN),
+        Reservation(property_id=1, guest_id=3, room_id=3, check_in=at(-1, 15), check_out=at(3, 11), status=ReservationStatusEnum.CHECKED_IN),
+        Reservation(property_id=1, guest_id=1, room_id=4, check_in=at(0, 15), check_out=at(1, 11), status=ReservationStatusEnum.BOOKED),
+        Reservation(property_id=1, guest_id=9, room_id=5, check_in=at(0, 15), check_out=at(1, 11), status=ReservationStatusEnum.BOOKED),
+        Reservation(property_id=1, guest_id=2, room_id=6, check_in=at(0, 15), check_out=at(1, 11), status=ReservationStatusEnum.CANCELED),
+    ])
+    db_session.commit()
+
+@pytest.mark.asyncio
+async def test_lists_resolve_names_with_one_lookup(db_session, stays):
+    calls = []
+    service = ReservationService(db_session, guests=guest_client(calls))
+    arrivals = await service.front_desk_list("arrivals", 1, DAY)
+    assert [(r["room_id"], r["guest_name"]) for r in arrivals] == [(1, "Ada Lovelace"), (4, "Ada Lovelace"), (5, None)]
+    assert calls == ["1,9"]  # distinct ids, one request
+    departures = await service.front_desk_list("departures", 1, DAY)
+    assert [(r["room_id"], r["guest_name"]) for r in departures] == [(2, "Alan Turing")]
+    in_house = await service.front_desk_list("in-house", 1, DAY)
+    assert [r["room_id"] for r in in_house] == [3, 1, 4, 5]
+    assert await service.front_desk_list("arrivals", 2, DAY) == []
+    assert len(calls) == 3  # no lookup for an empty list
+
+@pytest.mark.asyncio
+async def test_lists_survive_guest_service_outage(db_session, stays):
+    service = ReservationService(db_session, guests=guest_client([], down=True))
+    arrivals = await service.front_desk_list("arrivals", 1, DAY)
+    assert [r["guest_name"] for r in arrivals] == [None, None, None]
+
+@pytest.mark.asyncio
+async def test_guest_lookup_is_chunked():
+    calls = []
+    guests = await guest_client(calls).get_guests([3, 1, 2, 1, 3], chunk_size=2)
+    assert sorted(guests) == [1, 2, 3]
+    assert calls == ["1,2", "3"]
+
+def test_front_desk_endpoints(db_session, stays):
+    from backend.reservation_service.main import app
+    from backend.reservation_service import api
+    service = ReservationService(db_session, guests=guest_client([]))
+    app.dependency_overrides[api.get_reservation_service] = lambda: service
+    try:
+        client = TestClient(app)
+        params = {"property_id": 1, "date": DAY.isoformat()}
+        arrivals = client.get("/api/v1/reservations/arrivals", params=params)
+        assert arrivals.status_code == 200
+        assert [r["guest_name"] for r in arrivals.json()] == ["Ada Lovelace", "Ada Lovelace", None]
+        assert [r["room_id"] for r in client.get("/api/v1/reservations/departures", params=params).json()] == [2]
+        assert [r["room_id"] for r in client.get("/api/v1/reservations/in-house", params=params).json()] == [3, 1, 4, 5]
+        assert client.get("/api/v1/reservations/arrivals", params={"date": DAY.isoformat()}).status_code == 422
+    finally:
+        app.dependency_overrides.clear()
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import pytest
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.core.base import Base
+from backend.reservation_service.idempotency import IdempotencyGuard, request_hash
+from backend.reservation_service.models import IdempotencyKey, Reservation
+from backend.reservation_service.repository import IdempotencyKeyRepository
+from backend.reservation_service.service import ReservationService
+
+@pytest.fixture(scope="function")
+def sessions(tmp_path):
+    # A file database, so concurrent requests can each use their own session and connection
+    engine = create_engine(f"sqlite:///{tmp_path / 'idempotency.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    opened = []
+    def open_session():
+        opened.append(factory())
+        return opened[-1]
+    yield open_session
+    for db in opened:
+        db.close()
+    engine.dispose()
+
+def body(response):
+    return json.loads(response.body)
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_run_the_handler_once(sessions):
+    guard = IdempotencyGuard()
+    calls = []
+    async def handler():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"id": len(calls)}
+    first, second, third = await asyncio.gather(*(guard.run(sessions(), "k1", "h", handler) for _ in range(3)))
+    assert calls == [1]
+    assert [body(r) for r in (first, second, third)] == [{"id": 1}] * 3
+    replayed = [r.headers.get("Idempotent-Replayed") for r in (first, second, third)]
+    assert sorted(replayed, key=str) == [None, "true", "true"]
+
+@pytest.mark.asyncio
+async def test_replay_and_key_reuse_with_another_request(sessions):
+    guard = IdempotencyGuard()
+    async def handler():
+        raise HTTPException(status_code=400, detail="Room 7 is already booked for these dates.")
+    first = await guard.run(sessions(), "k2", "h", handler)
+    again = await guard.run(sessions(), "k2", "h", handler)
+    assert first.status_code == again.status_code == 400
+    assert body(again) == {"detail": "Room 7 is already booked for these dates."}
+    with pytest.raises(HTTPException) as e:
+        await guard.run(sessions(), "k2", "other", handler)
+    assert e.value.status_code == 422
+    with pytest.raises(HTTPException) as e:
+        await guard.run(sessions(), "", "h", handler)
+    assert e.value.status_code == 400
+
+@pytest.mark.asyncio
+async def test_unexpected_failure_releases_the_key(sessions):
+    guard = IdempotencyGuard()
+    attempts = []
+    async def handler():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("room service timed out")
+        return {"ok": True}
+    with pytest.raises(RuntimeError):
+        await guard.run(sessions(), "k3", "h", handler)
+    assert body(await guard.run(sessions(), "k3", "h", handler)) == {"ok": True}
+    assert len(attempts) == 2
+
+@pytest.mark.asyncio
+async def test_claim_held_elsewhere_waits_then_times_out(sessions):
+    guard = IdempotencyGuard(wait_timeout=0.2)
+    IdempotencyKeyRepository(sessions()).claim("k4", "h", timedelta(seconds=30))  # another process, still working
+    async def handler():
+        return {}
+    with pytest.raises(HTTPException) as e:
+        await guard.run(sessions(), "k4", "h", handler)
+    assert e.value.status_code == 409
+
+def test_expired_claims_are_reclaimed_and_purged(sessions):
+    db = sessions()
+    repo = IdempotencyKeyRepository(db)
+    assert repo.claim("old", "h", timedelta(seconds=-1)) is None  # a crashed holder's lease has run out
+    assert repo.claim("old", "h", timedelta(seconds=30)) is None
+    repo.complete("old", 200, "{}", timedelta(seconds=-1))
+    repo.claim("fresh", "h", timedelta(seconds=30))
+    assert repo.purge_expired() == 1
+    assert [row.key for row in db.query(IdempotencyKey)] == ["fresh"]
+
+def test_post_reservation_with_idempotency_key(sessions, monkeypatch):
+    from backend.reservation_service.main import app
+    from backend.reservation_service import api
+    db = sessions()
+    service = ReservationService(db)
+    async def get_room_http(room_id):
+        return {"id": room_id, "type_id": 1, "status": "AVAILABLE"}
+    service.get_room_http = get_room_http
+    monkeypatch.setattr(api, "idempotency_guard", IdempotencyGuard())
+    app.dependency_overrides[api.get_reservation_service] = lambda: service
+    check_in = datetime.now() + timedelta(days=3)
+    payload = {"property_id": 1, "guest_id": 1, "room_id": 7, "check_in": check_in.isoformat(),
+               "check_out": (check_in + timedelta(days=2)).isoformat()}
+    try:
+        client = TestClient(app)
+        first = client.post("/api/v1/reservations", json=payload, headers={"Idempotency-Key": "abc"})
+        retry = client.post("/api/v1/reservations", json=payload, headers={"Idempotency-Key": "abc"})
+        assert first.status_code == retry.status_code == 200
+        assert retry.json() == first.json()
+        assert retry.headers["Idempotent-Replayed"] == "true"
+        assert db.query(Reservation).count() == 1
+        assert service.repo.outbox.pending() == 0  # a stay starting in three days leaves the room's status alone
+        other = client.post("/api/v1/reservations", json={**payload, "guest_id": 2}, headers={"Idempotency-Key": "abc"})
+        assert other.status_code == 422
+    finally:
+        app.dependency_overrides.clear()
+
+def test_request_hash_ignores_key_order():
+    assert request_hash({"a": 1, "b": datetime(2026, 1, 1)}) == request_hash({"b": datetime(2026, 1, 1), "a": 1})
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import httpx
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+from backend.core.base import Base
+from backend.reservation_service.clients import RoomServiceClient
+from backend.reservation_service.models import RoomStatusOutbox
+from backend.reservation_service.outbox import OutboxDispatcher
+from backend.reservation_service.repository import RoomStatusOutboxRepository
+
+BASE_URL = "http://rooms.test/api/v1/room-service/rooms"
+
+@pytest.fixture(scope="function")
+def session_factory(tmp_path):
+    # A file database: the dispatcher opens its own sessions from worker threads
+    engine = create_engine(f"sqlite:///{tmp_path / 'outbox.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+class RoomServiceStub:
+    """Answers PATCHes with queued status codes (200 once the queue for a room is empty)."""
+
+    def __init__(self):
+        self.calls = []
+        self.answers = {}
+
+    def handler(self, request):
+        room_id = int(request.url.path.rsplit("/", 1)[1])
+        status = json.loads(request.content)["status"]
+        self.calls.append((room_id, status))
+        answer = self.answers.get(room_id, [])
+        code = answer.pop(0) if answer else 200
+        if code == "down":
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(code, json={"id": room_id, "status": status})
+
+    def client(self):
+        return RoomServiceClient(base_url=BASE_URL, transport=httpx.MockTransport(self.handler))
+
+def enqueue(session_factory, *messages):
+    db = session_factory()
+    repo = RoomStatusOutboxRepository(db)
+    for room_id, status in messages:
+        repo.enqueue(room_id, status)
+    db.commit()
+    db.close()
+
+def rows(session_factory):
+    db = session_factory()
+    try:
+        return [(r.room_id, r.status, r.attempts) for r in db.query(RoomStatusOutbox).order_by(RoomStatusOutbox.id)]
+    finally:
+        db.close()
+
+def make_due(session_factory):
+    db = session_factory()
+    db.execute(update(RoomStatusOutbox).values(next_attempt_at=datetime.now() - timedelta(seconds=1)))
+    db.commit()
+    db.close()
+
+@pytest.mark.asyncio
+async def test_only_the_newest_status_per_room_is_sent(session_factory):
+    stub = RoomServiceStub()
+    delivered = []
+    dispatcher = OutboxDispatcher(session_factory, stub.client(), on_delivered=delivered.append)
+    enqueue(session_factory, (7, "OCCUPIED"), (8, "OCCUPIED"), (7, "AVAILABLE"))
+    assert await dispatcher.dispatch_once() == 2
+    assert sorted(stub.calls) == [(7, "AVAILABLE"), (8, "OCCUPIED")]
+    assert sorted(delivered) == [7, 8]
+    assert rows(session_factory) == []
+    assert await dispatcher.dispatch_once() == 0
+
+@pytest.mark.asyncio
+async def test_failures_back_off_and_retry(session_factory):
+    stub = RoomServiceStub()
+    stub.answers = {7: [503, "down"], 8: [409]}
+    dispatcher = OutboxDispatcher(session_factory, stub.client(), min_delay=60)
+    enqueue(session_factory, (7, "OCCUPIED"), (8, "OCCUPIED"))
+    await dispatcher.dispatch_once()
+    assert rows(session_factory) == [(7, "OCCUPIED", 1)]  # the 409 is final, the 503 is retried
+    assert await dispatcher.dispatch_once() == 0  # still backing off
+    make_due(session_factory)
+    await dispatcher.dispatch_once()
+    assert rows(session_factory) == [(7, "OCCUPIED", 2)]
+    make_due(session_factory)
+    await dispatcher.dispatch_once()
+    assert rows(session_factory) == []
+    assert stub.calls == [(7, "OCCUPIED"), (8, "OCCUPIED"), (7, "OCCUPIED"), (7, "OCCUPIED")]
+
+def test_backoff_is_exponential_and_capped():
+    dispatcher = OutboxDispatcher(lambda: None, None, min_delay=0.5, max_delay=5)
+    assert [dispatcher.backoff(n).total_seconds() for n in range(1, 6)] == [0.5, 1, 2, 4, 5]
+
+def test_claimed_messages_are_leased(session_factory):
+    enqueue(session_factory, (7, "OCCUPIED"))
+    db = session_factory()
+    repo = RoomStatusOutboxRepository(db)
+    assert [row.room_id for row in repo.claim_due(10, timedelta(seconds=30))] == [7]
+    assert repo.claim_due(10, timedelta(seconds=30)) == []  # another dispatcher skips it until the lease ends
+    db.close()
+
+def test_older_message_is_not_claimed_while_the_newest_backs_off(session_factory):
+    enqueue(session_factory, (7, "OCCUPIED"), (7, "AVAILABLE"))
+    db = session_factory()
+    repo = RoomStatusOutboxRepository(db)
+    newest = repo.claim_due(10, timedelta(seconds=30))
+    assert [(row.room_id, row.status) for row in newest] == [(7, "AVAILABLE")]
+    repo.retry_later(newest[0].id, 1, timedelta(minutes=5), "503")
+    assert repo.claim_due(10, timedelta(seconds=30)) == []  # the stale OCCUPIED must not go out first
+    db.close()
+
+@pytest.mark.asyncio
+async def test_notify_delivers_without_waiting_for_the_poll(session_factory):
+    stub = RoomServiceStub()
+    dispatcher = OutboxDispatcher(session_factory, stub.client(), poll_interval=60)
+    await dispatcher.start()
+    try:
+        enqueue(session_factory, (7, "OCCUPIED"))
+        dispatcher.notify()
+        for _ in range(100):
+            if not rows(session_factory):
+                break
+            await asyncio.sleep(0.01)
+        assert stub.calls == [(7, "OCCUPIED")]
+        assert rows(session_factory) == []
+    finally:
+        await dispatcher.stop()
+    assert not dispatcher.running
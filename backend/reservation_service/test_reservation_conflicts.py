@@ -0,0 +1,125 @@
+import threading
+import pytest
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from backend.core.base import Base
+from backend.reservation_service.models import Reservation, ReservationStatusEnum
+from backend.reservation_service.repository import ReservationRepository
+from backend.reservation_service.service import ReservationService
+from backend.reservation_service.conflicts import RoomStays, StayIndex
+from backend.reservation_service.exceptions import RoomUnavailableError
+
+@pytest.fixture(scope="function")
+def db_session():
+    # StaticPool: the async path runs queries in the threadpool, which must see the same in-memory database
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+BASE = datetime.now().replace(hour=15, minute=0, second=0, microsecond=0) + timedelta(days=10)
+
+def day(n):
+    return BASE + timedelta(days=n)
+
+def stay(check_in, check_out, room_id=1, property_id=1, status=ReservationStatusEnum.BOOKED):
+    return Reservation(property_id=property_id, guest_id=1, room_id=room_id, check_in=check_in, check_out=check_out, status=status)
+
+def booking(check_in, check_out, room_id=1):
+    data = {"property_id": 1, "guest_id": 1, "room_id": room_id, "check_in": check_in, "check_out": check_out,
+            "price": None, "payment_status": None}
+    return SimpleNamespace(dict=lambda: dict(data))
+
+def test_overlap_is_half_open_and_ignores_inactive(db_session):
+    db_session.add_all([stay(day(0), day(3)), stay(day(5), day(8), status=ReservationStatusEnum.CANCELED)])
+    db_session.commit()
+    repo = ReservationRepository(db_session)
+    assert repo.has_overlap(1, day(2), day(4))
+    assert repo.has_overlap(1, day(-1), day(10))
+    assert not repo.has_overlap(1, day(3), day(5))   # check-in on the previous guest's check-out day
+    assert not repo.has_overlap(1, day(-2), day(0))
+    assert not repo.has_overlap(1, day(5), day(8))   # only a canceled stay there
+    assert not repo.has_overlap(2, day(0), day(3))
+
+def test_create_if_free_rejects_overlap(db_session):
+    repo = ReservationRepository(db_session)
+    assert repo.create_if_free(booking(day(0), day(3))) is not None
+    assert repo.create_if_free(booking(day(1), day(2))) is None
+    assert repo.create_if_free(booking(day(3), day(4))) is not None
+    assert db_session.query(Reservation).count() == 2
+
+def test_concurrent_bookings_of_one_room_do_not_both_succeed(tmp_path, monkeypatch):
+    # Two sessions on one file, like two API workers; the second books while the first sits between check and insert
+    engine = create_engine(f"sqlite:///{tmp_path / 'reservations.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    first, second = ReservationRepository(factory()), ReservationRepository(factory())
+    results = {}
+    def book_second():
+        results["second"] = second.create_if_free(booking(day(1), day(4), room_id=7))
+    racer = threading.Thread(target=book_second)
+    check = first.has_overlap
+    def check_then_let_the_other_worker_run(*args, **kwargs):
+        found = check(*args, **kwargs)
+        racer.start()
+        racer.join(timeout=0.5)  # blocked on the write lock if the check was taken under it
+        return found
+    monkeypatch.setattr(first, "has_overlap", check_then_let_the_other_worker_run)
+    results["first"] = first.create_if_free(booking(day(0), day(3), room_id=7))
+    racer.join()
+    assert results["first"] is not None and results["second"] is None
+    assert first.db.query(Reservation).filter(Reservation.room_id == 7).count() == 1
+    first.db.close()
+    second.db.close()
+
+def test_room_stays_matches_brute_force():
+    stays = [(day(0), day(10), 1), (day(2), day(3), 2), (day(12), day(14), 3)]  # legacy overlap included
+    index = RoomStays(stays)
+    for start in range(-2, 16):
+        for length in range(1, 4):
+            ci, co = day(start), day(start + length)
+            expected = any(s[0] < co and s[1] > ci for s in stays)
+            assert index.overlaps(ci, co) == expected, (start, length)
+    index.remove(1)
+    assert not index.overlaps(day(5), day(6))
+
+def test_stay_index_tracks_local_writes(db_session):
+    db_session.add(stay(day(0), day(3)))
+    db_session.commit()
+    index = StayIndex()
+    assert index.has_conflict(db_session, 1, 1, day(1), day(2))
+    index.add(1, 2, day(5), day(6), reservation_id=99)
+    assert index.has_conflict(db_session, 1, 2, day(5), day(7))
+    index.remove(1, 2, 99)
+    assert not index.has_conflict(db_session, 1, 2, day(5), day(7))
+
+@pytest.fixture
+def reservation_service(db_session):
+    service = ReservationService(db_session, stays=StayIndex())
+    async def get_room_http(room_id):
+        return {"id": room_id, "status": "AVAILABLE"}
+    service.get_room_http = get_room_http
+    return service
+
+def test_service_rejects_future_double_booking(reservation_service):
+    first = reservation_service.create_reservation(1, 1, None, day(0), day(3), room_id=7)
+    with pytest.raises(RoomUnavailableError, match="already booked"):
+        reservation_service.create_reservation(1, 2, None, day(2), day(5), room_id=7)
+    reservation_service.cancel_reservation(first.id)
+    assert reservation_service.create_reservation(1, 2, None, day(2), day(5), room_id=7).id != first.id
+
+def test_service_database_check_catches_what_the_index_missed(reservation_service, db_session):
+    # Booked by another process: not in this process's (already loaded) index
+    reservation_service.stays.has_conflict(db_session, 1, 7, day(0), day(1))
+    db_session.add(stay(day(0), day(3), room_id=7))
+    db_session.commit()
+    with pytest.raises(RoomUnavailableError, match="already booked"):
+        reservation_service.create_reservation(1, 2, None, day(1), day(2), room_id=7)
+    assert reservation_service.repo.outbox.pending() == 0  # no room status update queued
@@ -0,0 +1,92 @@
+import pytest
+from datetime import date, datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from fastapi.testclient import TestClient
+from backend.core.base import Base
+from backend.reservation_service.models import Reservation, ReservationStatusEnum
+from backend.reservation_service.repository import ReservationRepository
+from backend.reservation_service.service import ReservationService
+
+@pytest.fixture(scope="function")
+def db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+DAY = date(2026, 3, 10)
+
+def at(days, hour):
+    return datetime.combine(DAY + timedelta(days=days), datetime.min.time()).replace(hour=hour)
+
+def stay(guest_id, check_in, check_out, status=ReservationStatusEnum.BOOKED, property_id=1):
+    return Reservation(property_id=property_id, guest_id=guest_id, room_id=guest_id, check_in=check_in,
+                       check_out=check_out, status=status)
+
+@pytest.fixture
+def stays(db_session):
+    db_session.add_all([
+        stay(1, at(-3, 15), at(-1, 11)),                                   # left two days ago
+        stay(2, at(-2, 15), at(0, 11), ReservationStatusEnum.CHECKED_OUT),  # departs today, already out
+        stay(3, at(-1, 15), at(2, 11), ReservationStatusEnum.CHECKED_IN),   # in house
+        stay(4, at(0, 15), at(1, 11)),                                     # arrives today
+        stay(5, at(0, 15), at(3, 11), ReservationStatusEnum.CANCELED),
+        stay(6, at(2, 15), at(4, 11)),
+        stay(7, at(0, 15), at(1, 11), property_id=2),
+    ])
+    db_session.commit()
+
+def guests(rows):
+    return sorted(r.guest_id for r in rows)
+
+def test_within_and_overlaps_modes(db_session, stays):
+    repo = ReservationRepository(db_session)
+    # Within [day -1, day +1]: the stay has to start and end inside those three days
+    assert guests(repo.list_reservations(property_id=1, start_date=DAY - timedelta(days=1), end_date=DAY + timedelta(days=1))) == [4]
+    assert guests(repo.list_reservations(property_id=1, start_date=DAY - timedelta(days=1), end_date=DAY + timedelta(days=1),
+                                         overlaps=True)) == [1, 2, 3, 4, 5]
+    assert guests(repo.list_reservations(property_id=1, start_date=DAY + timedelta(days=3), overlaps=True)) == [5, 6]
+    assert guests(repo.list_reservations(property_id=1, end_date=DAY - timedelta(days=2), overlaps=True)) == [1, 2]
+
+def test_business_date_queries(db_session, stays):
+    repo = ReservationRepository(db_session)
+    assert guests(repo.arrivals(1, DAY)) == [4]
+    assert guests(repo.departures(1, DAY)) == [2]
+    assert guests(repo.in_house(1, DAY)) == [3, 4]
+    assert guests(repo.in_house(1, DAY + timedelta(days=1))) == [3]
+
+def query_plan(db_session, query):
+    sql = query.statement.compile(dialect=db_session.get_bind().dialect, compile_kwargs={"literal_binds": True})
+    rows = db_session.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}").all()
+    return " | ".join(row[-1] for row in rows)
+
+def test_front_desk_queries_use_the_property_date_indexes(db_session):
+    repo = ReservationRepository(db_session)
+    assert "USING INDEX ix_reservations_property_check_in (property_id=? AND check_in>? AND check_in<?)" in query_plan(db_session, repo.arrivals(1, DAY))
+    assert "USING INDEX ix_reservations_property_check_out (property_id=? AND check_out>? AND check_out<?)" in query_plan(db_session, repo.departures(1, DAY))
+    in_house = query_plan(db_session, repo.in_house(1, DAY))
+    assert "USING INDEX ix_reservations_property_check_" in in_house
+    assert "SCAN reservations" not in in_house  # a full table scan would show up as SCAN
+    ranged = repo.filtered(db_session.query(Reservation), property_id=1, start_date=DAY, end_date=DAY, overlaps=True)
+    assert "USING INDEX ix_reservations_property_check_" in query_plan(db_session, ranged)
+
+def test_listing_endpoint_parses_dates(db_session, stays):
+    from backend.reservation_service.main import app
+    from backend.reservation_service import api
+    app.dependency_overrides[api.get_reservation_service] = lambda: ReservationService(db_session)
+    try:
+        client = TestClient(app)
+        params = {"property_id": 1, "start_date": DAY.isoformat(), "end_date": DAY.isoformat()}
+        assert [r["guest_id"] for r in client.get("/api/v1/reservations", params=params).json()] == []
+        overlapping = client.get("/api/v1/reservations", params={**params, "overlaps": "true"}).json()
+        assert sorted(r["guest_id"] for r in overlapping) == [2, 3, 4, 5]
+        assert client.get("/api/v1/reservations", params={**params, "start_date": "10/03/2026"}).status_code == 422
+        assert client.get("/api/v1/reservations", params={**params, "end_date": "2026-03-01"}).status_code == 400
+    finally:
+        app.dependency_overrides.clear()
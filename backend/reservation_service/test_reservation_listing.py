@@ -0,0 +1,100 @@
+import json
+import tracemalloc
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from fastapi.testclient import TestClient
+from backend.core.base import Base
+from backend.reservation_service.models import Reservation, ReservationStatusEnum
+from backend.reservation_service.repository import ReservationRepository
+from backend.reservation_service.service import ReservationService
+
+@pytest.fixture(scope="function")
+def db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+BASE = datetime(2026, 1, 1, 15, 0)
+
+def seed(db, count, property_id=1):
+    # Several reservations share each check-in, so the id tie-break matters
+    db.bulk_insert_mappings(Reservation, [
+        {"property_id": property_id, "guest_id": i, "room_id": i % 50, "check_in": BASE + timedelta(days=i // 3),
+         "check_out": BASE + timedelta(days=i // 3 + 2), "status": ReservationStatusEnum.BOOKED}
+        for i in range(count)
+    ])
+    db.commit()
+
+@pytest.fixture
+def client(db_session):
+    from backend.reservation_service.main import app
+    from backend.reservation_service import api
+    service = ReservationService(db_session)
+    app.dependency_overrides[api.get_reservation_service] = lambda: service
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+def test_keyset_pages_cover_every_row_once(db_session, client):
+    seed(db_session, 25)
+    seed(db_session, 5, property_id=2)
+    seen, params = [], {"property_id": 1, "limit": 4}
+    while True:
+        resp = client.get("/api/v1/reservations", params=params)
+        assert resp.status_code == 200
+        seen.extend(r["id"] for r in resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params["after"] = cursor
+    expected = [r.id for r in db_session.query(Reservation).filter_by(property_id=1).order_by(Reservation.check_in, Reservation.id)]
+    assert seen == expected and len(seen) == 25
+
+def test_rows_added_behind_the_cursor_do_not_shift_pages(db_session, client):
+    seed(db_session, 6)
+    first = client.get("/api/v1/reservations", params={"property_id": 1, "limit": 3})
+    db_session.add(Reservation(property_id=1, guest_id=99, check_in=BASE - timedelta(days=5),
+                               check_out=BASE, status=ReservationStatusEnum.BOOKED))
+    db_session.commit()
+    second = client.get("/api/v1/reservations", params={"property_id": 1, "limit": 3,
+                                                        "after": first.headers["X-Next-Cursor"]})
+    assert [r["guest_id"] for r in first.json() + second.json()] == [0, 1, 2, 3, 4, 5]
+
+def test_invalid_cursor_is_rejected(client):
+    assert client.get("/api/v1/reservations", params={"after": "yesterday"}).status_code == 400
+
+def test_ndjson_stream_matches_json_listing(db_session, client):
+    seed(db_session, 40)
+    listed = client.get("/api/v1/reservations", params={"property_id": 1, "limit": 1000}).json()
+    resp = client.get("/api/v1/reservations", params={"property_id": 1, "limit": 1}, headers={"Accept": "application/x-ndjson"})
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    streamed = [json.loads(line) for line in resp.text.splitlines()]
+    assert streamed == listed  # limit does not apply to the stream
+    cursor = f"{listed[9]['check_in']}_{listed[9]['id']}"
+    resp = client.get("/api/v1/reservations", params={"property_id": 1, "format": "ndjson", "after": cursor})
+    assert [json.loads(line)["id"] for line in resp.text.splitlines()] == [r["id"] for r in listed[10:]]
+
+def test_streaming_memory_does_not_grow_with_result_size(db_session):
+    seed(db_session, 20000)
+    repo = ReservationRepository(db_session)
+    def peak(consume):
+        tracemalloc.start()
+        consume(repo.iter_rows(property_id=1, columns=[Reservation.id, Reservation.check_in], batch_size=500))
+        _, top = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return top
+    def drain(rows):
+        for _ in rows:
+            pass
+    held = peak(list)  # what loading the whole result costs
+    streamed = peak(drain)
+    assert streamed < held / 4
@@ -31,8 +31,8 @@ def room_service(db_session):
     return RoomService(db_session)
 
 @pytest.fixture
-def reservation_service(db_session, room_service):
-    return ReservationService(db_session, room_service)
+def reservation_service(db_session):
+    return ReservationService(db_session)
 
 def test_create_reservation_and_room_allocation(reservation_service, room_service, db_session):
     # Setup: create RoomType and Room
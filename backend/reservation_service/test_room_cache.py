@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from backend.reservation_service.room_cache import RoomCache, RoomEventListener
+
+class FakeRooms:
+    def __init__(self):
+        self.calls = 0
+        self.status = "AVAILABLE"
+        self.release = asyncio.Event()
+
+    async def get_room(self, room_id):
+        self.calls += 1
+        await self.release.wait()
+        return {"id": room_id, "status": self.status} if room_id < 100 else None
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_fetch():
+    rooms = FakeRooms()
+    cache = RoomCache(rooms.get_room)
+    waiters = [asyncio.create_task(cache.get(8)) for _ in range(20)]
+    await asyncio.sleep(0)
+    rooms.release.set()
+    results = await asyncio.gather(*waiters)
+    assert rooms.calls == 1
+    assert all(r == {"id": 8, "status": "AVAILABLE"} for r in results)
+    await cache.get(8)
+    assert rooms.calls == 1  # served from the cache
+
+@pytest.mark.asyncio
+async def test_ttl_lru_and_misses():
+    rooms = FakeRooms()
+    rooms.release.set()
+    cache = RoomCache(rooms.get_room, maxsize=2, ttl=0.05)
+    for room_id in (1, 2, 3):
+        await cache.get(room_id)
+    assert len(cache) == 2 and rooms.calls == 3
+    await cache.get(1)  # evicted as least recently used
+    assert rooms.calls == 4
+    await asyncio.sleep(0.06)
+    await cache.get(1)  # expired
+    assert rooms.calls == 5
+    assert await cache.get(404) is None
+    assert await cache.get(404) is None
+    assert rooms.calls == 7  # unknown rooms are not cached
+
+@pytest.mark.asyncio
+async def test_invalidation_during_fetch_is_not_stored():
+    rooms = FakeRooms()
+    cache = RoomCache(rooms.get_room)
+    pending = asyncio.create_task(cache.get(8))
+    await asyncio.sleep(0)
+    cache.invalidate(8)  # status event arrives while the fetch is in flight
+    rooms.release.set()
+    assert (await pending)["status"] == "AVAILABLE"
+    rooms.status = "OCCUPIED"
+    assert (await cache.get(8))["status"] == "OCCUPIED"
+
+@pytest.mark.asyncio
+async def test_fetch_errors_reach_every_waiter():
+    async def failing(room_id):
+        await asyncio.sleep(0)
+        raise RuntimeError("room service down")
+    cache = RoomCache(failing)
+    results = await asyncio.gather(cache.get(8), cache.get(8), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+@pytest.mark.asyncio
+async def test_listener_invalidates_and_resumes():
+    rooms = FakeRooms()
+    rooms.release.set()
+    cache = RoomCache(rooms.get_room)
+    await cache.get(8)
+    seen_last_ids = []
+    class Stream:
+        async def stream_events(self, last_event_id=None):
+            seen_last_ids.append(last_event_id)
+            if len(seen_last_ids) == 1:
+                yield 5, {"room_id": 8, "new_status": "OCCUPIED"}
+                raise ConnectionError("dropped")
+            await asyncio.Event().wait()
+            yield  # pragma: no cover
+    listener = RoomEventListener(Stream(), cache, min_delay=0.01)
+    listener.start()
+    try:
+        for _ in range(100):
+            if len(seen_last_ids) == 2:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await listener.stop()
+    assert seen_last_ids == [None, 5]
+    assert len(cache) == 0
@@ -0,0 +1,77 @@
+import asyncio
+import httpx
+import pytest
+from backend.reservation_service.clients import RoomServiceClient
+
+BASE_URL = "http://rooms.test/api/v1/room-service/rooms"
+
+def make_client(calls):
+    def handler(request):
+        calls.append((request.method, request.url.path))
+        if request.method == "PATCH":
+            return httpx.Response(200, json={"id": 8, "status": "OCCUPIED"})
+        if request.url.path.endswith("/8"):
+            return httpx.Response(200, json={"id": 8, "status": "AVAILABLE"})
+        return httpx.Response(404, json={"detail": "Room not found"})
+    return RoomServiceClient(base_url=BASE_URL, transport=httpx.MockTransport(handler))
+
+@pytest.mark.asyncio
+async def test_open_client_reuses_one_pool():
+    calls = []
+    rooms = make_client(calls)
+    await rooms.open()
+    try:
+        async with rooms.session() as first:
+            pass
+        async with rooms.session() as second:
+            pass
+        assert first is second
+        assert await rooms.get_room(8) == {"id": 8, "status": "AVAILABLE"}
+        assert await rooms.get_room(9) is None
+        assert (await rooms.mark_room_status(8, "OCCUPIED"))["status"] == "OCCUPIED"
+        assert calls[-1] == ("PATCH", "/api/v1/room-service/rooms/8")
+    finally:
+        await rooms.close()
+    assert not rooms.is_open
+
+def test_calls_from_another_loop_use_a_short_lived_client():
+    calls = []
+    rooms = make_client(calls)
+    async def lookup():
+        async with rooms.session() as client:
+            return client
+    # Not opened (or opened on another loop): each call gets its own client
+    assert asyncio.run(lookup()) is not asyncio.run(lookup())
+    assert asyncio.run(rooms.get_room(8))["id"] == 8
+
+def test_timeouts_and_limits_are_configurable():
+    rooms = RoomServiceClient(base_url=BASE_URL, timeout=1.5, connect_timeout=0.5, max_connections=7, http2=False)
+    assert rooms.options["timeout"] == httpx.Timeout(1.5, connect=0.5)
+    assert rooms.options["limits"].max_connections == 7
+    assert rooms.options["http2"] is False
+
+@pytest.mark.asyncio
+async def test_get_room_is_a_point_lookup():
+    calls = []
+    def handler(request):
+        calls.append(request.url.path)
+        if request.url.path.endswith("/8"):
+            return httpx.Response(200, json={"id": 8, "status": "AVAILABLE"})
+        return httpx.Response(404, json={"detail": "Room not found"})
+    rooms = RoomServiceClient(base_url=BASE_URL, transport=httpx.MockTransport(handler))
+    assert (await rooms.get_room(8))["id"] == 8
+    assert await rooms.get_room(9) is None
+    assert calls == ["/api/v1/room-service/rooms/8", "/api/v1/room-service/rooms/9"]
+
+@pytest.mark.asyncio
+async def test_stream_events_parses_sse():
+    body = (b"retry: 1000\n\n: keepalive\n\n"
+            b'id: 3\nevent: room_status\ndata: {"id": 3, "room_id": 8, "new_status": "OCCUPIED"}\n\n'
+            b'id: 4\nevent: room_status\ndata: {"id": 4, "room_id": 9, "new_status": "CLEANING"}\n\n')
+    def handler(request):
+        assert request.url.path.endswith("/events")
+        assert request.headers["Last-Event-ID"] == "2"
+        return httpx.Response(200, content=body, headers={"Content-Type": "text/event-stream"})
+    rooms = RoomServiceClient(base_url=BASE_URL, transport=httpx.MockTransport(handler))
+    events = [e async for e in rooms.stream_events(last_event_id=2)]
+    assert [(i, e["room_id"]) for i, e in events] == [(3, 8), (4, 9)]
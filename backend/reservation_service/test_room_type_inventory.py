@@ -0,0 +1,143 @@
+import pytest
+from datetime import date, datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from fastapi.testclient import TestClient
+from backend.core.base import Base
+from backend.reservation_service.models import Reservation, RoomTypeInventory
+from backend.reservation_service.repository import RoomTypeInventoryRepository, stay_nights
+from backend.reservation_service.schemas import ReservationUpdate, ReservationStatusEnum
+from backend.reservation_service.service import ReservationService
+from backend.reservation_service.exceptions import ReservationError, RoomUnavailableError
+
+@pytest.fixture(scope="function")
+def db_session():
+    # StaticPool: the async path runs queries in the threadpool, which must see the same in-memory database
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+BASE = datetime.now().replace(hour=15, minute=0, second=0, microsecond=0) + timedelta(days=10)
+
+def day(n, hour=15):
+    return (BASE + timedelta(days=n)).replace(hour=hour)
+
+def night(n):
+    return day(n).date()
+
+ROOM_TYPES = {7: 1, 8: 1, 9: 2}  # room id -> room type id
+
+class FakeRooms:
+    async def get_room_summary(self, property_id):
+        # JSON object keys arrive as strings
+        return {"by_type": {"1": {"AVAILABLE": 2}, "2": {"AVAILABLE": 0, "MAINTENANCE": 1}}}
+
+@pytest.fixture
+def service(db_session):
+    service = ReservationService(db_session, rooms=FakeRooms())
+    async def get_room_http(room_id):
+        return {"id": room_id, "type_id": ROOM_TYPES[room_id], "status": "AVAILABLE"}
+    service.get_room_http = get_room_http
+    return service
+
+def sold(db_session, room_type_id=1):
+    rows = RoomTypeInventoryRepository(db_session).sold_range(1, night(-5), night(20), room_type_id)
+    return {n: count for _, n, count in rows if count}
+
+def test_stay_nights_is_half_open():
+    assert stay_nights(day(0), day(3, hour=11)) == [night(0), night(1), night(2)]
+    assert stay_nights(day(0, hour=9), day(0, hour=18)) == [night(0)]  # day use still takes the night
+
+def test_adjust_counts_and_releases(db_session):
+    repo = RoomTypeInventoryRepository(db_session)
+    repo.adjust(1, 1, day(0), day(2), 1)
+    repo.adjust(1, 1, day(1), day(3), 1)
+    repo.adjust(1, 2, day(0), day(1), 1)
+    repo.adjust(1, None, day(0), day(5), 1)  # untyped reservations are not counted
+    db_session.commit()
+    assert sold(db_session) == {night(0): 1, night(1): 2, night(2): 1}
+    repo.adjust(1, 1, day(0), day(2), -1)
+    repo.adjust(1, 1, day(8), day(9), -1)  # never counted: no row is created
+    db_session.commit()
+    assert sold(db_session) == {night(1): 1, night(2): 1}
+    assert sold(db_session, room_type_id=2) == {night(0): 1}
+    assert db_session.query(RoomTypeInventory).count() == 4
+
+def test_reservation_lifecycle_moves_counters(service, db_session):
+    first = service.create_reservation(1, 1, None, day(0), day(2), room_id=7)
+    second = service.create_reservation(1, 2, None, day(1), day(3), room_id=8)
+    assert first.room_type_id == 1
+    assert sold(db_session) == {night(0): 1, night(1): 2, night(2): 1}
+    service.cancel_reservation(first.id)
+    assert sold(db_session) == {night(1): 1, night(2): 1}
+    service.repo.update(second.id, ReservationUpdate(check_in=day(4), check_out=day(5)))
+    assert sold(db_session) == {night(4): 1}
+    service.repo.update(second.id, ReservationUpdate(room_id=9, room_type_id=2))
+    assert sold(db_session) == {}
+    assert sold(db_session, room_type_id=2) == {night(4): 1}
+    service.repo.delete(second.id)
+    assert sold(db_session, room_type_id=2) == {}
+
+def test_early_check_out_releases_the_unused_nights(service, db_session):
+    yesterday, today = date.today() - timedelta(days=1), date.today()
+    stay = Reservation(property_id=1, guest_id=1, room_id=7, room_type_id=1, status=ReservationStatusEnum.CHECKED_IN,
+                       check_in=datetime.combine(yesterday, datetime.min.time()).replace(hour=15),
+                       check_out=datetime.combine(today + timedelta(days=2), datetime.min.time()).replace(hour=11))
+    db_session.add(stay)
+    service.repo.count_nights(stay, 1)
+    db_session.commit()
+    service.check_out(stay.id)
+    rows = RoomTypeInventoryRepository(db_session).sold_range(1, yesterday, today + timedelta(days=2), 1)
+    assert {n: count for _, n, count in rows if count} == {yesterday: 1}  # tonight and tomorrow can be sold again
+
+def test_update_rejects_overlapping_move_and_keeps_counters(service, db_session):
+    service.create_reservation(1, 1, None, day(0), day(2), room_id=7)
+    second = service.create_reservation(1, 2, None, day(4), day(6), room_id=7)
+    with pytest.raises(RoomUnavailableError):
+        service.repo.update(second.id, ReservationUpdate(check_in=day(1)))
+    with pytest.raises(RoomUnavailableError):
+        service.repo.update(second.id, ReservationUpdate(check_out=day(3)))
+    assert sold(db_session) == {night(0): 1, night(1): 1, night(4): 1, night(5): 1}
+    service.repo.update(second.id, ReservationUpdate(status=ReservationStatusEnum.CANCELED))
+    service.repo.update(second.id, ReservationUpdate(status=ReservationStatusEnum.BOOKED))
+    assert sold(db_session) == {night(0): 1, night(1): 1, night(4): 1, night(5): 1}
+
+@pytest.mark.asyncio
+async def test_room_type_inventory_fills_every_night(service, db_session):
+    await service.create_reservation_async(1, 1, None, day(0), day(2), room_id=7)
+    await service.create_reservation_async(1, 2, None, day(1), day(2), room_id=8)
+    result = await service.room_type_inventory(1, night(0), night(3))
+    assert [r["room_type_id"] for r in result] == [1, 2]
+    assert result[0]["total"] == 2
+    assert [(n["sold"], n["sellable"]) for n in result[0]["nights"]] == [(1, 1), (2, 0), (0, 2)]
+    assert [n["sellable"] for n in result[1]["nights"]] == [1, 1, 1]
+    only = await service.room_type_inventory(1, night(0), night(1), room_type_id=2)
+    assert [r["room_type_id"] for r in only] == [2]
+    with pytest.raises(ReservationError):
+        await service.room_type_inventory(1, night(3), night(3))
+    with pytest.raises(ReservationError):
+        await service.room_type_inventory(1, night(0), night(400))
+
+def test_inventory_endpoint(service, db_session):
+    from backend.reservation_service.main import app
+    from backend.reservation_service import api
+    service.create_reservation(1, 1, None, day(0), day(1), room_id=9)
+    app.dependency_overrides[api.get_reservation_service] = lambda: service
+    try:
+        client = TestClient(app)
+        resp = client.get("/api/v1/inventory", params={"property_id": 1, "start": night(0).isoformat(),
+                                                       "end": night(1).isoformat(), "room_type_id": 2})
+        assert resp.status_code == 200
+        assert resp.json() == [{"room_type_id": 2, "total": 1,
+                                "nights": [{"night": night(0).isoformat(), "sold": 1, "sellable": 0}]}]
+        resp = client.get("/api/v1/inventory", params={"property_id": 1, "start": night(1).isoformat(),
+                                                       "end": night(0).isoformat()})
+        assert resp.status_code == 400
+    finally:
+        app.dependency_overrides.clear()
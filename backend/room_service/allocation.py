@@ -0,0 +1,94 @@
+# In-memory free-room pool used by RoomService.allocate_room
+import heapq
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from .models import Room
+
+PoolKey = Tuple[int, int]  # (property_id, type_id)
+
+class FreeRoomPool:
+    """Per-process index of AVAILABLE room ids keyed by (property_id, type_id).
+
+    A property is loaded from the database the first time it is asked for and is
+    then kept current by calling ``apply`` after every room write. Entries are
+    hints only: the caller re-reads the row before handing a room out.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded: Set[int] = set()
+        self._heaps: Dict[PoolKey, List[int]] = {}
+        self._free: Dict[PoolKey, Set[int]] = {}
+        self._keys: Dict[int, PoolKey] = {}
+
+    def _add(self, key: PoolKey, room_id: int) -> None:
+        free = self._free.setdefault(key, set())
+        if room_id in free:
+            return
+        free.add(room_id)
+        heapq.heappush(self._heaps.setdefault(key, []), room_id)
+        self._keys[room_id] = key
+
+    def _remove(self, room_id: int) -> None:
+        # Heap entries are dropped lazily in peek()
+        key = self._keys.pop(room_id, None)
+        if key is not None:
+            self._free[key].discard(room_id)
+
+    def load(self, db: Session, property_id: int) -> None:
+        rows = db.query(Room.id, Room.type_id).filter(
+            Room.property_id == property_id,
+            Room.status == "AVAILABLE",
+        ).all()
+        with self._lock:
+            if property_id in self._loaded:
+                return
+            for room_id, type_id in rows:
+                self._add((property_id, type_id), room_id)
+            self._loaded.add(property_id)
+
+    def peek(self, db: Session, property_id: int, type_id: int) -> Optional[int]:
+        """Return the lowest free room id for the key without removing it."""
+        if property_id not in self._loaded:
+            self.load(db, property_id)
+        key = (property_id, type_id)
+        with self._lock:
+            heap = self._heaps.get(key)
+            free = self._free.get(key)
+            if not heap:
+                return None
+            if len(heap) > 2 * len(free) + 64:
+                heap[:] = sorted(free)
+            while heap and heap[0] not in free:
+                heapq.heappop(heap)
+            return heap[0] if heap else None
+
+    def apply(self, room: Room) -> None:
+        """Re-index a room after it was created or its status/type/property changed."""
+        with self._lock:
+            self._remove(room.id)
+            if room.property_id in self._loaded and room.status == "AVAILABLE":
+                self._add((room.property_id, room.type_id), room.id)
+
+    def discard(self, room_id: int) -> None:
+        with self._lock:
+            self._remove(room_id)
+
+    def invalidate(self, property_id: Optional[int] = None) -> None:
+        """Forget a property (or everything) so the next peek reloads it."""
+        with self._lock:
+            if property_id is None:
+                self._loaded.clear()
+                self._heaps.clear()
+                self._free.clear()
+                self._keys.clear()
+                return
+            self._loaded.discard(property_id)
+            for key in [k for k in self._free if k[0] == property_id]:
+                for room_id in self._free.pop(key):
+                    self._keys.pop(room_id, None)
+                self._heaps.pop(key, None)
+
+# Process-wide pool shared by the API handlers
+free_room_pool = FreeRoomPool()
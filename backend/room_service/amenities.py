@@ -0,0 +1,22 @@
+# Amenity dictionary helpers for the per-room amenity bitmask
+from typing import Iterable, List, Optional
+
+# SQLite and Postgres integers are signed 64-bit; keep clear of the sign bit
+MAX_AMENITY_BITS = 63
+
+def parse_amenities(value: Optional[str]) -> List[str]:
+    """Split a comma-separated amenity string into unique normalized names, in order."""
+    if not value:
+        return []
+    names = []
+    for part in value.split(","):
+        name = part.strip().lower()
+        if name and name not in names:
+            names.append(name)
+    return names
+
+def mask_for(names: Iterable[str], bits: dict) -> int:
+    mask = 0
+    for name in names:
+        mask |= 1 << bits[name]
+    return mask
@@ -1,15 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+import hashlib
+import json
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Body, Header, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 from .config import SessionLocal
 from .schemas import (
-    PropertyCreate, PropertyRead, RoomTypeCreate, RoomTypeRead, RoomCreate, RoomRead, RatePlanCreate, RatePlanRead, RoomStatusLogRead, RoomUpdate
+    PropertyCreate, PropertyRead, RoomTypeCreate, RoomTypeRead, RoomCreate, RoomRead, RatePlanCreate, RatePlanRead, RoomStatusLogRead, RoomUpdate,
+    RoomBulkResult, AmenityRead, RoomTypeQuote, RoomSummary
 )
+from .repository import AmenityRepository, InventoryVersionRepository
 from .service import (
     PropertyService, RoomService, RoomTypeService, RatePlanService, RoomStatusLogService
 )
+from .allocation import free_room_pool
+from .rates import rate_index_cache
+from .board import room_board
+from .status_log import RoomStatusLogWriter
+from .events import RoomEventHub, event_stream
+from .exceptions import InvalidStatusTransition
 
 router = APIRouter()
 
+# Process-wide status event fan-out and log buffer; started and stopped by the app lifespan in main.py
+room_event_hub = RoomEventHub(SessionLocal)
+status_log_writer = RoomStatusLogWriter(SessionLocal, on_write=room_event_hub.notify)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -17,6 +36,36 @@ def get_db():
     finally:
         db.close()
 
+# Page size bounds for list endpoints; clients follow X-Next-Cursor for more
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 1000
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def set_next_cursor(response: Response, rows: list, limit: int) -> list:
+    # A full page means there may be more rows after the last id
+    if len(rows) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = str(rows[-1].id)
+    return rows
+
+def inventory_etag(db: Session, request: Request, property_id: Optional[int]) -> str:
+    """Strong ETag for a room list: the inventory version plus the exact query."""
+    version = InventoryVersionRepository(db).get(property_id)
+    query = hashlib.sha1(str(sorted(request.query_params.multi_items())).encode()).hexdigest()[:16]
+    scope = property_id if property_id is not None else "all"
+    return f'"rooms-{scope}-{version}-{query}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses weak comparison, so a W/ prefix from an intermediary still matches
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in (t[2:] if t.startswith("W/") else t for t in tags)
+
+def get_room_service(db: Session = Depends(get_db)):
+    # Fall back to in-transaction logging when the writer thread is not running
+    log_writer = status_log_writer if status_log_writer.running else None
+    return RoomService(db, pool=free_room_pool, log_writer=log_writer, board=room_board)
+
 # Property endpoints
 @router.get("/properties", response_model=list[PropertyRead])
 def list_properties(db: Session = Depends(get_db)):
@@ -28,24 +77,112 @@ def create_property(data: PropertyCreate, db: Session = Depends(get_db)):
 
 # RoomType endpoints
 @router.get("/room-types", response_model=list[RoomTypeRead])
-def list_room_types(db: Session = Depends(get_db)):
-    return RoomTypeService(db).repo.list()
+def list_room_types(
+    response: Response,
+    property_id: Optional[int] = Query(None),
+    after: Optional[int] = Query(None, description="Return rows with id greater than this cursor"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    rows = RoomTypeService(db).repo.list(property_id=property_id, after_id=after, limit=limit)
+    return set_next_cursor(response, rows, limit)
 
 @router.post("/room-types", response_model=RoomTypeRead)
 def create_room_type(data: RoomTypeCreate, db: Session = Depends(get_db)):
-    return RoomTypeService(db).repo.create(data)
+    room_type = RoomTypeService(db).repo.create(data)
+    rate_index_cache.invalidate(room_type.id)
+    return room_type
 
 # Room endpoints
 @router.get("/rooms", response_model=list[RoomRead])
-def list_rooms(db: Session = Depends(get_db)):
-    return RoomService(db).repo.list()
+def list_rooms(
+    request: Request,
+    response: Response,
+    property_id: Optional[int] = Query(None),
+    status: Optional[str] = Query(None),
+    type_id: Optional[int] = Query(None),
+    floor: Optional[str] = Query(None),
+    amenities: Optional[str] = Query(None, description="Comma-separated; rooms must have all of them"),
+    after: Optional[int] = Query(None, description="Return rows with id greater than this cursor"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
+):
+    # Read the version before the rows: a write in between then yields a newer ETag, never a stale match
+    etag = inventory_etag(db, request, property_id)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    rows = RoomService(db).repo.list(
+        property_id=property_id, status=status, type_id=type_id, floor=floor, amenities=amenities, after_id=after, limit=limit
+    )
+    return set_next_cursor(response, rows, limit)
 
 @router.post("/rooms", response_model=RoomRead)
-def create_room(data: RoomCreate, db: Session = Depends(get_db)):
+def create_room(data: RoomCreate, service: RoomService = Depends(get_room_service)):
     try:
-        return RoomService(db).repo.create(data)
+        room = service.repo.create(data)
     except ValueError as e:
         raise HTTPException(status_code=409, detail=str(e))
+    service.pool.apply(room)
+    return room
+
+NDJSON_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+async def read_bulk_rows(request: Request) -> list:
+    """Parse a JSON array body or an NDJSON stream (one room object per line)."""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in NDJSON_TYPES:
+        try:
+            items = json.loads(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {e}")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of rooms")
+        return items
+    items, buffer = [], b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        items.extend(parse_ndjson_line(line) for line in lines if line.strip())
+    if buffer.strip():
+        items.append(parse_ndjson_line(buffer))
+    return items
+
+def parse_ndjson_line(line: bytes):
+    try:
+        return json.loads(line)
+    except ValueError:
+        # Keep going; the raw line is reported as an error in the per-row results
+        return line.decode("utf-8", errors="replace")
+
+@router.post("/rooms/bulk", response_model=RoomBulkResult)
+async def bulk_import_rooms(request: Request, upsert: bool = Query(False), chunk_size: int = Query(500, ge=1, le=5000), service: RoomService = Depends(get_room_service)):
+    items = await read_bulk_rows(request)
+    try:
+        result = await run_in_threadpool(service.bulk_import, items, upsert, chunk_size, "bulk-import")
+    except SQLAlchemyError as e:
+        # The whole import was rolled back
+        raise HTTPException(status_code=409, detail=f"Bulk import failed and was rolled back: {e.__class__.__name__}")
+    room_event_hub.notify()
+    return result
+
+@router.get("/rooms/summary", response_model=RoomSummary)
+def get_room_summary(property_id: Optional[int] = Query(None), db: Session = Depends(get_db)):
+    return room_board.summary(db, property_id)
+
+@router.get("/rooms/events")
+async def stream_room_events(
+    property_id: Optional[int] = Query(None),
+    last_event_id: Optional[int] = Header(None),
+):
+    """Server-sent room status changes; reconnecting clients resume after Last-Event-ID."""
+    return StreamingResponse(
+        event_stream(room_event_hub, property_id=property_id, last_event_id=last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.get("/rooms/{room_id}", response_model=RoomRead)
 def get_room(room_id: int, db: Session = Depends(get_db)):
@@ -55,34 +192,89 @@ def get_room(room_id: int, db: Session = Depends(get_db)):
     return room
 
 @router.patch("/rooms/{room_id}", response_model=RoomRead)
-def update_room(room_id: int, update: RoomUpdate = Body(...), db: Session = Depends(get_db)):
-    room = RoomService(db).repo.get(room_id)
+def update_room(room_id: int, update: RoomUpdate = Body(...), service: RoomService = Depends(get_room_service)):
+    room = service.repo.get(room_id)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
+    data = update.dict(exclude_unset=True)
+    status = data.pop("status", None)
+    if status == room.status:
+        status = None  # Forms send the whole room back; an unchanged status is not a transition
     try:
-        updated = RoomService(db).repo.update(room_id, update)
-        return updated
-    except ValueError as e:
+        # The other fields stay uncommitted until the status compare-and-set commits them, so a conflict saves nothing
+        updated = service.repo.update(room_id, data, commit=status is None) if data else room
+        if status is not None:
+            # Status changes go through the compare-and-set path so concurrent writers cannot both win
+            updated = service.mark_room_status(room_id, status, expected_status=room.status)
+    except (ValueError, InvalidStatusTransition) as e:
+        service.repo.db.rollback()
         raise HTTPException(status_code=409, detail=str(e))
+    service.pool.apply(updated)
+    if status is not None:
+        room_event_hub.notify()
+    return updated
 
 @router.delete("/rooms/{room_id}", response_model=None)
-def delete_room(room_id: int, db: Session = Depends(get_db)):
-    room = RoomService(db).repo.get(room_id)
+def delete_room(room_id: int, service: RoomService = Depends(get_room_service)):
+    room = service.repo.get(room_id)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
-    RoomService(db).repo.delete(room_id)
+    service.repo.delete(room_id)
+    service.pool.discard(room_id)
     return {"detail": "Room deleted"}
 
+# Amenity dictionary
+@router.get("/amenities", response_model=list[AmenityRead])
+def list_amenities(db: Session = Depends(get_db)):
+    return AmenityRepository(db).list()
+
 # RatePlan endpoints
 @router.get("/rate-plans", response_model=list[RatePlanRead])
-def list_rate_plans(db: Session = Depends(get_db)):
-    return RatePlanService(db).repo.list()
+def list_rate_plans(
+    response: Response,
+    property_id: Optional[int] = Query(None),
+    room_type_id: Optional[int] = Query(None),
+    after: Optional[int] = Query(None, description="Return rows with id greater than this cursor"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    rows = RatePlanService(db).repo.list(property_id=property_id, room_type_id=room_type_id, after_id=after, limit=limit)
+    return set_next_cursor(response, rows, limit)
 
 @router.post("/rate-plans", response_model=RatePlanRead)
 def create_rate_plan(data: RatePlanCreate, db: Session = Depends(get_db)):
-    return RatePlanService(db).repo.create(data)
+    plan = RatePlanService(db).repo.create(data)
+    rate_index_cache.invalidate(plan.room_type_id)
+    return plan
+
+# Stay quotes
+@router.get("/quotes", response_model=list[RoomTypeQuote])
+def get_quotes(
+    check_in: date,
+    check_out: date,
+    room_type_id: Optional[List[int]] = Query(None),
+    property_id: Optional[int] = Query(None, description="Quote every room type of the property"),
+    db: Session = Depends(get_db),
+):
+    if not room_type_id and not property_id:
+        raise HTTPException(status_code=400, detail="room_type_id or property_id is required")
+    room_type_ids = list(room_type_id or [])
+    if property_id:
+        room_type_ids += [rt.id for rt in RoomTypeService(db).repo.list(property_id=property_id) if rt.id not in room_type_ids]
+    try:
+        return RatePlanService(db, cache=rate_index_cache).quote(room_type_ids, check_in, check_out)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 # RoomStatusLog endpoints
 @router.get("/room-status-logs", response_model=list[RoomStatusLogRead])
-def list_room_status_logs(db: Session = Depends(get_db)):
-    return RoomStatusLogService(db).repo.list()
+def list_room_status_logs(
+    response: Response,
+    property_id: Optional[int] = Query(None),
+    room_id: Optional[int] = Query(None),
+    after: Optional[int] = Query(None, description="Return rows with id greater than this cursor"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db),
+):
+    rows = RoomStatusLogService(db).repo.list(property_id=property_id, room_id=room_id, after_id=after, limit=limit)
+    return set_next_cursor(response, rows, limit)
@@ -0,0 +1,69 @@
+# Benchmark: legacy full-scan allocation vs indexed probe vs in-memory free-room pool
+# Run from the repo root: python -m backend.room_service.benchmark_allocation [rooms_per_property]
+import sys
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.core.base import Base
+from backend.room_service.models import Room, RoomType
+from backend.room_service.allocation import FreeRoomPool
+from backend.room_service.service import RoomService
+
+def legacy_scan(service, property_id, room_type_id):
+    for room in service.repo.list(property_id=property_id):
+        if room.type_id == room_type_id and room.status == "AVAILABLE":
+            return room
+    return None
+
+def seed(db, rooms_per_property, properties=3, types_per_property=4):
+    type_ids = {}
+    for property_id in range(1, properties + 1):
+        for t in range(types_per_property):
+            rt = RoomType(property_id=property_id, name=f"Type {t}", base_rate=100.0 + t)
+            db.add(rt)
+            db.flush()
+            type_ids.setdefault(property_id, []).append(rt.id)
+    rows = []
+    for property_id, types in type_ids.items():
+        for i in range(rooms_per_property):
+            # Most rooms are occupied so the scan has to walk far before finding a free one
+            status = "AVAILABLE" if i % 50 == 49 else "OCCUPIED"
+            rows.append({
+                "property_id": property_id,
+                "number": str(i),
+                "type_id": types[i % len(types)],
+                "status": status,
+                "floor": str(i // 100),
+            })
+    db.bulk_insert_mappings(Room, rows)
+    db.commit()
+    return type_ids
+
+def timeit(label, fn, iterations):
+    fn()  # warm-up (loads the pool, primes the statement cache)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = (time.perf_counter() - start) / iterations
+    print(f"{label:<16} {elapsed * 1e6:10.1f} us/allocation")
+    return elapsed
+
+def main(rooms_per_property=5000, iterations=200):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    type_ids = seed(db, rooms_per_property)
+    property_id = 2
+    room_type_id = type_ids[property_id][-1]
+
+    plain = RoomService(db)
+    pooled = RoomService(db, pool=FreeRoomPool())
+    print(f"{rooms_per_property} rooms per property, property_id={property_id}, room_type_id={room_type_id}")
+    scan = timeit("full scan", lambda: legacy_scan(plain, property_id, room_type_id), max(iterations // 10, 1))
+    probe = timeit("indexed probe", lambda: plain.allocate_room(property_id, room_type_id), iterations)
+    pool = timeit("free-room pool", lambda: pooled.allocate_room(property_id, room_type_id), iterations)
+    print(f"speedup vs scan: probe x{scan / probe:.0f}, pool x{scan / pool:.0f}")
+    db.close()
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
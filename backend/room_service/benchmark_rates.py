@@ -0,0 +1,51 @@
+# Benchmark: 30-night quotes for many room types, rebuilding the rate index per call vs serving it from the cache
+# Run from the repo root: python -m backend.room_service.benchmark_rates [room_types] [plans_per_type]
+import sys
+import time
+from datetime import date, datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.core.base import Base
+from backend.room_service.models import RatePlan, RoomType
+from backend.room_service.rates import RateIndexCache
+from backend.room_service.service import RatePlanService
+
+def seed(db, room_types, plans_per_type, first_day):
+    db.add_all([RoomType(id=rt, property_id=1, name=f"type {rt}", base_rate=100.0 + rt) for rt in range(1, room_types + 1)])
+    # Overlapping weekly promotions, so a stay crosses many plan boundaries
+    db.add_all([
+        RatePlan(property_id=1, room_type_id=rt, name=f"promo {rt}-{i}", daily_rate=60.0 + i,
+                 start_date=datetime.combine(first_day + timedelta(days=7 * i), datetime.min.time()),
+                 end_date=datetime.combine(first_day + timedelta(days=7 * i + 10), datetime.min.time()))
+        for rt in range(1, room_types + 1) for i in range(plans_per_type)
+    ])
+    db.commit()
+
+def timeit(label, fn, iterations):
+    fn()  # warm-up (fills the cache, primes the statement cache)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = (time.perf_counter() - start) / iterations
+    print(f"{label:<16} {elapsed * 1e3:10.3f} ms/quote")
+    return elapsed
+
+def main(room_types=50, plans_per_type=40, iterations=200):
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    first_day = date(2026, 1, 1)
+    seed(db, room_types, plans_per_type, first_day)
+    ids = list(range(1, room_types + 1))
+    check_in, check_out = first_day + timedelta(days=60), first_day + timedelta(days=90)
+
+    uncached = RatePlanService(db)
+    cached = RatePlanService(db, cache=RateIndexCache())
+    print(f"{room_types} room types, {plans_per_type} plans each, {(check_out - check_in).days} nights")
+    rebuild = timeit("rebuild per call", lambda: uncached.quote(ids, check_in, check_out), max(iterations // 10, 1))
+    hit = timeit("cached index", lambda: cached.quote(ids, check_in, check_out), iterations)
+    print(f"speedup: x{rebuild / hit:.0f}")
+    db.close()
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,83 @@
+# Room board: counts of rooms by status, floor and room type
+import threading
+from collections import Counter
+from typing import Dict, Optional, Tuple
+from sqlalchemy.orm import Session
+from .repository import InventoryVersionRepository, RoomRepository
+
+# Floor key used for rooms without a floor
+UNASSIGNED_FLOOR = "unassigned"
+
+GroupKey = Tuple[str, Optional[str], Optional[int]]  # (status, floor, type_id)
+
+def summarize(property_id: Optional[int], groups: Dict[GroupKey, int]) -> dict:
+    by_status: Counter = Counter()
+    by_floor: Dict[str, Counter] = {}
+    by_type: Dict[int, Counter] = {}
+    for (status, floor, type_id), count in groups.items():
+        if not count:
+            continue
+        by_status[status] += count
+        by_floor.setdefault(floor if floor is not None else UNASSIGNED_FLOOR, Counter())[status] += count
+        if type_id is not None:
+            by_type.setdefault(type_id, Counter())[status] += count
+    return {
+        "property_id": property_id,
+        "total": sum(by_status.values()),
+        "by_status": dict(by_status),
+        "by_floor": {floor: dict(c) for floor, c in by_floor.items()},
+        "by_type": {type_id: dict(c) for type_id, c in by_type.items()},
+    }
+
+class RoomBoard:
+    """Per-property group counts, kept in step with the room inventory version.
+
+    A cached entry is served while its version matches the property's current
+    inventory version, which costs one primary-key read. Status transitions
+    made in this process move one count from the old status to the new one and
+    advance the entry's version, so a busy front desk never forces a recount.
+    Any change the board did not see, from another process or a bulk write,
+    leaves a version gap. That entry is rebuilt with a single GROUP BY.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[int, Tuple[int, Counter]] = {}
+
+    def summary(self, db: Session, property_id: Optional[int] = None) -> dict:
+        if property_id is None:
+            return summarize(None, RoomRepository(db).group_counts())
+        version = InventoryVersionRepository(db).get(property_id)
+        with self._lock:
+            entry = self._entries.get(property_id)
+            if entry is not None and entry[0] == version:
+                return summarize(property_id, entry[1])
+        # Counted after reading the version, so a concurrent write can only make this entry look stale
+        groups = Counter(RoomRepository(db).group_counts(property_id))
+        with self._lock:
+            self._entries[property_id] = (version, groups)
+        return summarize(property_id, groups)
+
+    def apply_transition(self, property_id: int, floor: Optional[str], type_id: Optional[int],
+                         old_status: str, new_status: str, version: int) -> None:
+        """Record a status change that moved the property to ``version``."""
+        with self._lock:
+            entry = self._entries.get(property_id)
+            if entry is None:
+                return
+            if entry[0] != version - 1:
+                del self._entries[property_id]
+                return
+            groups = entry[1]
+            groups[(old_status, floor, type_id)] -= 1
+            groups[(new_status, floor, type_id)] += 1
+            self._entries[property_id] = (version, groups)
+
+    def invalidate(self, property_id: Optional[int] = None) -> None:
+        with self._lock:
+            if property_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(property_id, None)
+
+room_board = RoomBoard()
@@ -0,0 +1,195 @@
+# Server-sent events for room status transitions, fanned out from RoomStatusLog
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Callable, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from .models import Room, RoomStatusLog
+
+logger = logging.getLogger(__name__)
+
+class Subscription:
+    def __init__(self, property_id: Optional[int], buffer_size: int):
+        self.property_id = property_id
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=buffer_size)
+        # Set when the buffer filled up; the stream ends and the client resumes from the log
+        self.overflowed = False
+
+    def wants(self, event: dict) -> bool:
+        return self.property_id is None or event["property_id"] == self.property_id
+
+class RoomEventHub:
+    """Tails RoomStatusLog and pushes new rows to every SSE subscriber.
+
+    One query per wake-up serves all subscribers, however many there are. Local
+    writes call ``notify`` so events go out immediately; writes made by other
+    processes are picked up within ``poll_interval``. Log ids double as SSE
+    event ids, so ``Last-Event-ID`` resumes by reading the log after that id.
+    Each subscriber has a bounded buffer. A subscriber that falls behind is
+    disconnected instead of slowing the hub down.
+
+    Ids are handed out when a transaction inserts its row, not when it
+    commits, so on PostgreSQL a lower id can become visible after a higher one
+    was already read. The hub remembers the ids it skipped over within the
+    last ``lookback`` ids, re-reads that window while any are outstanding and
+    publishes them when they show up. A row that commits more than
+    ``lookback`` ids late is still missed.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], poll_interval: float = 1.0,
+                 buffer_size: int = 256, batch_size: int = 500, lookback: int = 100):
+        self.session_factory = session_factory
+        self.poll_interval = poll_interval
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.lookback = lookback
+        self.last_id = 0
+        # Ids below last_id, inside the lookback window, that were not in the log when it was read
+        self._gaps: Set[int] = set()
+        self._subscribers: Set[Subscription] = set()
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def read_log(self, after_id: int, property_id: Optional[int] = None, limit: Optional[int] = None) -> List[dict]:
+        db = self.session_factory()
+        try:
+            query = db.query(
+                RoomStatusLog.id, RoomStatusLog.room_id, Room.property_id, RoomStatusLog.old_status,
+                RoomStatusLog.new_status, RoomStatusLog.changed_at, RoomStatusLog.changed_by,
+            ).join(Room, Room.id == RoomStatusLog.room_id).filter(RoomStatusLog.id > after_id)
+            if property_id is not None:
+                query = query.filter(Room.property_id == property_id)
+            rows = query.order_by(RoomStatusLog.id).limit(limit or self.batch_size).all()
+            return [row._asdict() for row in rows]
+        finally:
+            db.close()
+
+    def latest_id(self) -> int:
+        db = self.session_factory()
+        try:
+            return db.query(RoomStatusLog.id).order_by(RoomStatusLog.id.desc()).limit(1).scalar() or 0
+        finally:
+            db.close()
+
+    def skip_to_latest(self) -> None:
+        self.last_id = max(self.last_id, self.latest_id())
+        self._gaps.clear()
+
+    def subscribe(self, property_id: Optional[int] = None) -> Subscription:
+        subscription = Subscription(property_id, self.buffer_size)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def publish(self, events: List[dict]) -> None:
+        for event in events:
+            for subscription in list(self._subscribers):
+                if not subscription.wants(event):
+                    continue
+                try:
+                    subscription.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    subscription.overflowed = True
+                    self._subscribers.discard(subscription)
+            self.last_id = max(self.last_id, event["id"])
+
+    async def _poll(self) -> Tuple[int, bool]:
+        # Returns (events published, whether the read was full and more rows may be waiting)
+        last_id = self.last_id
+        self._gaps = {i for i in self._gaps if i > last_id - self.lookback}
+        after, limit = (last_id - self.lookback, self.batch_size + self.lookback) if self._gaps else (last_id, self.batch_size)
+        rows = await asyncio.to_thread(self.read_log, after, None, limit)
+        events = [event for event in rows if event["id"] > last_id or event["id"] in self._gaps]
+        self.publish(events)
+        seen = {event["id"] for event in events}
+        self._gaps -= seen
+        self._gaps.update(i for i in range(max(last_id, self.last_id - self.lookback) + 1, self.last_id) if i not in seen)
+        return len(events), len(rows) == limit
+
+    async def poll_once(self) -> int:
+        return (await self._poll())[0]
+
+    def notify(self) -> None:
+        """Wake the hub after a local status change; safe to call from any thread."""
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                if not self._subscribers:
+                    # Nobody to send to: move past the log so the next subscriber starts from now
+                    await asyncio.to_thread(self.skip_to_latest)
+                    continue
+                # Keep reading while full batches come back so a burst is not spread over several intervals
+                while (await self._poll())[1]:
+                    pass
+            except Exception:
+                logger.exception("Reading room status log for subscribers failed")
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self.last_id = await asyncio.to_thread(self.latest_id)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._loop = None
+
+def format_sse(event: dict) -> str:
+    data = json.dumps(event, default=str)
+    return f"id: {event['id']}\nevent: room_status\ndata: {data}\n\n"
+
+async def event_stream(hub: RoomEventHub, property_id: Optional[int] = None, last_event_id: Optional[int] = None,
+                       keepalive: float = 15.0) -> AsyncIterator[str]:
+    """SSE body: replay the log after ``last_event_id``, then follow the hub."""
+    subscription = hub.subscribe(property_id)
+    try:
+        # Subscribe before replaying so nothing written in between is missed. The hub only publishes ids it
+        # has not published before, so the overlap is limited to replayed ids and those are skipped once.
+        floor = hub.last_id - hub.lookback
+        replayed: Set[int] = set()
+        after = last_event_id
+        yield f"retry: {int(hub.poll_interval * 1000)}\n\n"
+        while after is not None:
+            backlog = await asyncio.to_thread(hub.read_log, after, property_id)
+            for event in backlog:
+                yield format_sse(event)
+                if event["id"] > floor:
+                    replayed.add(event["id"])
+            if len(backlog) < hub.batch_size:
+                break
+            after = backlog[-1]["id"]
+        while not subscription.overflowed:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if event["id"] in replayed:
+                replayed.discard(event["id"])
+                continue
+            yield format_sse(event)
+    finally:
+        hub.unsubscribe(subscription)
@@ -1,15 +1,28 @@
 # This file will initialize the FastAPI app for the room service
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from .api import router
+from .api import router, status_log_writer, room_event_hub
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    status_log_writer.start()
+    await room_event_hub.start()
+    try:
+        yield
+    finally:
+        await room_event_hub.stop()
+        # Flush buffered status transitions before the process exits
+        status_log_writer.stop()
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 app.include_router(router, prefix="/api/v1/room-service")
 
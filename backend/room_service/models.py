@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Enum, Float, DateTime, UniqueConstraint
+from sqlalchemy import Column, Integer, String, ForeignKey, Enum, Float, DateTime, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from backend.core.base import Base, BaseORMModel
@@ -20,6 +20,11 @@ class Room(BaseORMModel, Base):
     __tablename__ = "rooms"
     __table_args__ = (
         UniqueConstraint('property_id', 'number', name='uix_property_room_number'),
+        # Serves allocation lookups: first AVAILABLE room of a type in a property
+        Index('ix_rooms_property_type_status', 'property_id', 'type_id', 'status'),
+        # List filters; SQLite appends the rowid so keyset pages on id stay index-ordered
+        Index('ix_rooms_property_status', 'property_id', 'status'),
+        Index('ix_rooms_property_floor', 'property_id', 'floor'),
     )
     property_id = Column(Integer, ForeignKey("properties.id"), index=True)
     number = Column(String, nullable=False)
@@ -27,12 +32,21 @@ class Room(BaseORMModel, Base):
     status = Column(Enum("AVAILABLE", "OCCUPIED", "CLEANING", "MAINTENANCE", name="room_status"), default="AVAILABLE")
     floor = Column(String, nullable=True)
     amenities = Column(String, nullable=True)  # Comma-separated for MVP simplicity
+    amenity_mask = Column(Integer, nullable=False, default=0)  # Bits from Amenity.bit, kept in sync with amenities
     property = relationship("Property", back_populates="rooms")
     room_type = relationship("RoomType", back_populates="rooms")
     status_logs = relationship("RoomStatusLog", back_populates="room")
 
+class Amenity(BaseORMModel, Base):
+    __tablename__ = "amenities"
+    name = Column(String, nullable=False, unique=True)  # Normalized (stripped, lower-case)
+    bit = Column(Integer, nullable=False, unique=True)  # Position in Room.amenity_mask, never reassigned
+
 class RatePlan(BaseORMModel, Base):
     __tablename__ = "rate_plans"
+    __table_args__ = (
+        Index('ix_rate_plans_property_room_type', 'property_id', 'room_type_id'),
+    )
     property_id = Column(Integer, ForeignKey("properties.id"), index=True)
     room_type_id = Column(Integer, ForeignKey("room_types.id"))
     name = Column(String, nullable=False)
@@ -40,6 +54,11 @@ class RatePlan(BaseORMModel, Base):
     start_date = Column(DateTime, nullable=True)
     end_date = Column(DateTime, nullable=True)
 
+class RoomInventoryVersion(BaseORMModel, Base):
+    __tablename__ = "room_inventory_versions"
+    property_id = Column(Integer, nullable=False, unique=True)  # No FK: rooms may reference unregistered properties
+    version = Column(Integer, nullable=False, default=0)  # Bumped in the same transaction as every room write
+
 class RoomStatusLog(BaseORMModel, Base):
     __tablename__ = "room_status_logs"
     room_id = Column(Integer, ForeignKey("rooms.id"), index=True)
@@ -0,0 +1,134 @@
+# Rate plan resolution: per-room-type interval index over RatePlan windows
+import threading
+import time
+from bisect import bisect_right
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from .models import RatePlan, RoomType
+
+# Open-ended plan windows are clamped to these sentinels
+MIN_DAY = date.min
+MAX_DAY = date.max
+
+# Longest span of plan boundaries expanded into per-night arrays
+MAX_DENSE_NIGHTS = 5 * 366
+
+class RateIndex:
+    """Best (lowest) nightly rate for one room type, precomputed per elementary date segment.
+
+    Plan windows are cut at every start date and every day after an end date.
+    That gives disjoint segments, and each segment stores the cheapest plan
+    covering it, or the room type's base rate. A stay lookup is one bisect plus
+    a walk over the segments it crosses. Between the first and last boundary the
+    segments are also expanded into per-night arrays, so a stay inside that span
+    is priced with list slices instead of per-night date arithmetic.
+    Windows are inclusive: a plan ending on D still prices the night of D.
+    """
+
+    def __init__(self, base_rate: float, plans: Iterable[RatePlan]):
+        windows = []
+        for plan in plans:
+            start = plan.start_date.date() if plan.start_date else MIN_DAY
+            end = plan.end_date.date() if plan.end_date else MAX_DAY
+            if end < start:
+                continue
+            stop = end + timedelta(days=1) if end < MAX_DAY else MAX_DAY
+            windows.append((start, stop, plan.daily_rate, plan.id))
+        bounds = sorted({MIN_DAY} | {w[0] for w in windows} | {w[1] for w in windows})
+        position = {day: i for i, day in enumerate(bounds)}
+        rates: List[Tuple[float, Optional[int]]] = [(base_rate, None)] * len(bounds)
+        for start, stop, rate, plan_id in windows:
+            for i in range(position[start], position[stop]):
+                if rate < rates[i][0] or rates[i][1] is None:
+                    rates[i] = (rate, plan_id)
+        self.bounds = bounds
+        self.rates = rates
+        self._build_dense()
+
+    def _build_dense(self) -> None:
+        finite = [b for b in self.bounds if MIN_DAY < b < MAX_DAY]
+        self.origin = finite[0] if finite else None
+        self.dates: List[date] = []
+        self.night_rates: List[float] = []
+        self.night_plans: List[Optional[int]] = []
+        if not finite or (finite[-1] - finite[0]).days > MAX_DENSE_NIGHTS:
+            return
+        for first, nights, rate, plan_id in self.segments(finite[0], finite[-1]):
+            self.dates.extend(first + timedelta(days=d) for d in range(nights))
+            self.night_rates.extend([rate] * nights)
+            self.night_plans.extend([plan_id] * nights)
+
+    def segments(self, check_in: date, check_out: date):
+        """Yield (first_night, nights, rate, rate_plan_id) runs covering [check_in, check_out)."""
+        i = bisect_right(self.bounds, check_in) - 1
+        night = check_in
+        while night < check_out:
+            seg_end = self.bounds[i + 1] if i + 1 < len(self.bounds) else MAX_DAY
+            run_end = min(seg_end, check_out)
+            rate, plan_id = self.rates[i]
+            yield night, (run_end - night).days, rate, plan_id
+            night = run_end
+            i += 1
+
+    def quote(self, check_in: date, check_out: date) -> dict:
+        start = (check_in - self.origin).days if self.origin else -1
+        stop = start + (check_out - check_in).days
+        if 0 <= start and stop <= len(self.dates):
+            rates = self.night_rates[start:stop]
+            total = sum(rates)
+            nightly = [
+                {"date": d, "rate": r, "rate_plan_id": p}
+                for d, r, p in zip(self.dates[start:stop], rates, self.night_plans[start:stop])
+            ]
+        else:
+            nightly = []
+            total = 0.0
+            for first, nights, rate, plan_id in self.segments(check_in, check_out):
+                total += rate * nights
+                nightly.extend(
+                    {"date": first + timedelta(days=d), "rate": rate, "rate_plan_id": plan_id} for d in range(nights)
+                )
+        return {"check_in": check_in, "check_out": check_out, "nights": len(nightly), "total": total, "nightly": nightly}
+
+class RateIndexCache:
+    """Process-wide RateIndex cache, invalidated on rate-plan and room-type writes.
+
+    Entries also expire after ``ttl`` seconds so writes made by other processes
+    are picked up eventually.
+    """
+
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[int, Tuple[float, RateIndex]] = {}
+
+    def get_many(self, db: Session, room_type_ids: List[int]) -> Dict[int, RateIndex]:
+        now = time.monotonic()
+        with self._lock:
+            found = {rt: entry[1] for rt, entry in self._entries.items() if rt in room_type_ids and entry[0] > now}
+        missing = [rt for rt in room_type_ids if rt not in found]
+        if missing:
+            # Two queries build every missing index, however many room types were asked for
+            base_rates = dict(db.query(RoomType.id, RoomType.base_rate).filter(RoomType.id.in_(missing)).all())
+            plans: Dict[int, List[RatePlan]] = {}
+            for plan in db.query(RatePlan).filter(RatePlan.room_type_id.in_(missing)).all():
+                plans.setdefault(plan.room_type_id, []).append(plan)
+            with self._lock:
+                for rt, base_rate in base_rates.items():
+                    index = RateIndex(base_rate, plans.get(rt, []))
+                    self._entries[rt] = (now + self.ttl, index)
+                    found[rt] = index
+        return found
+
+    def get(self, db: Session, room_type_id: int) -> Optional[RateIndex]:
+        return self.get_many(db, [room_type_id]).get(room_type_id)
+
+    def invalidate(self, room_type_id: Optional[int] = None) -> None:
+        with self._lock:
+            if room_type_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(room_type_id, None)
+
+rate_index_cache = RateIndexCache()
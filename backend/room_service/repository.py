@@ -1,7 +1,19 @@
 from backend.core.repository import BaseRepository
-from .models import Property, Room, RoomType, RatePlan, RoomStatusLog
+from .models import Property, Room, RoomType, RatePlan, RoomStatusLog, Amenity, RoomInventoryVersion
+from .amenities import MAX_AMENITY_BITS, mask_for, parse_amenities
+from sqlalchemy import String, func, insert, literal, select, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
+
+def keyset_page(query, model, after_id: Optional[int] = None, limit: Optional[int] = None):
+    """Order by primary key and resume after ``after_id``; stable under concurrent inserts."""
+    if after_id is not None:
+        query = query.filter(model.id > after_id)
+    query = query.order_by(model.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
 
 class PropertyRepository(BaseRepository):
     def __init__(self, db: Session):
@@ -40,6 +52,43 @@ class PropertyRepository(BaseRepository):
             self.db.delete(db_obj)
             self.db.commit()
 
+class AmenityRepository:
+    """Append-only dictionary mapping normalized amenity names to bit positions."""
+    def __init__(self, db: Session):
+        self.db = db
+
+    def list(self) -> List[Amenity]:
+        return self.db.query(Amenity).order_by(Amenity.bit).all()
+
+    def bits_for(self, names: Iterable[str], create: bool = False) -> Dict[str, int]:
+        """Resolve names to bits in one query; with ``create`` unknown names get the next free bits.
+
+        New rows are flushed but not committed, so they land with the caller's transaction.
+        """
+        names = list(dict.fromkeys(names))
+        if not names:
+            return {}
+        bits = dict(self.db.query(Amenity.name, Amenity.bit).filter(Amenity.name.in_(names)).all())
+        missing = [name for name in names if name not in bits]
+        if missing and create:
+            next_bit = (self.db.query(func.max(Amenity.bit)).scalar() or -1) + 1
+            if next_bit + len(missing) > MAX_AMENITY_BITS:
+                raise ValueError(f"Amenity dictionary is full ({MAX_AMENITY_BITS} amenities)")
+            for name in missing:
+                self.db.add(Amenity(name=name, bit=next_bit))
+                bits[name] = next_bit
+                next_bit += 1
+            self.db.flush()
+        return bits
+
+    def mask(self, amenities: Optional[str], create: bool = False) -> Optional[int]:
+        """Bitmask for a comma-separated amenity string; None if an unknown name is looked up without ``create``."""
+        names = parse_amenities(amenities)
+        bits = self.bits_for(names, create=create)
+        if len(bits) < len(names):
+            return None
+        return mask_for(names, bits)
+
 class RoomRepository(BaseRepository):
     def __init__(self, db: Session):
         self.db = db
@@ -47,11 +96,74 @@ class RoomRepository(BaseRepository):
     def get(self, id: int) -> Optional[Room]:
         return self.db.query(Room).filter(Room.id == id).first()
 
-    def list(self, property_id: int = None) -> List[Room]:
+    def list(self, property_id: int = None, status: Optional[str] = None, type_id: Optional[int] = None,
+             floor: Optional[str] = None, amenities: Optional[str] = None,
+             after_id: Optional[int] = None, limit: Optional[int] = None) -> List[Room]:
         query = self.db.query(Room)
+        if amenities:
+            mask = AmenityRepository(self.db).mask(amenities)
+            if mask is None:
+                return []  # No room can have an amenity that is not in the dictionary
+            if mask:
+                query = query.filter(Room.amenity_mask.op('&')(mask) == mask)
         if property_id:
             query = query.filter(Room.property_id == property_id)
-        return query.all()
+        if status:
+            query = query.filter(Room.status == status)
+        if type_id:
+            query = query.filter(Room.type_id == type_id)
+        if floor is not None:
+            query = query.filter(Room.floor == floor)
+        return keyset_page(query, Room, after_id, limit).all()
+
+    def group_counts(self, property_id: Optional[int] = None) -> Dict[Tuple[str, Optional[str], Optional[int]], int]:
+        """Room counts keyed by (status, floor, type_id), from one GROUP BY."""
+        query = self.db.query(Room.status, Room.floor, Room.type_id, func.count(Room.id))
+        if property_id:
+            query = query.filter(Room.property_id == property_id)
+        rows = query.group_by(Room.status, Room.floor, Room.type_id).all()
+        return {(status, floor, type_id): count for status, floor, type_id, count in rows}
+
+    def first_available(self, property_id: int, type_id: int, for_update: bool = False) -> Optional[Room]:
+        # Single indexed probe on (property_id, type_id, status) instead of a full property scan
+        query = self.db.query(Room).filter(
+            Room.property_id == property_id,
+            Room.type_id == type_id,
+            Room.status == "AVAILABLE",
+        ).order_by(Room.id)
+        if for_update:
+            # Concurrent claimers skip rows another transaction already holds (no-op on SQLite)
+            query = query.with_for_update(skip_locked=True)
+        return query.limit(1).first()
+
+    def transition_status(self, id: int, new_status: str, allowed_from: Iterable[str], changed_by: Optional[str] = None, log: bool = True) -> int:
+        """Compare-and-set the room status; returns the number of rows changed (0 or 1).
+
+        With ``log`` the RoomStatusLog row and the conditional UPDATE run in one
+        savepoint, so either both land or neither does. A CAS that matches no
+        row rolls back only that savepoint: the caller's pending work stays in
+        the session, uncommitted. No row is read or locked beforehand.
+        """
+        allowed_from = list(allowed_from)
+        if not allowed_from:
+            return 0
+        match = (Room.id == id, Room.status.in_(allowed_from))
+        savepoint = self.db.begin_nested()
+        if log:
+            self.db.execute(
+                insert(RoomStatusLog).from_select(
+                    ["room_id", "old_status", "new_status", "changed_by"],
+                    select(Room.id, Room.status, literal(new_status, String), literal(changed_by, String)).where(*match),
+                )
+            )
+        count = self.db.query(Room).filter(*match).update({Room.status: new_status}, synchronize_session=False)
+        if count != 1:
+            savepoint.rollback()
+            return 0
+        savepoint.commit()
+        InventoryVersionRepository(self.db).bump([self.db.query(Room.property_id).filter(Room.id == id).scalar()])
+        self.db.commit()
+        return count
 
     def create(self, obj_in) -> Room:
         # Accept dict or object with .dict()
@@ -67,13 +179,72 @@ class RoomRepository(BaseRepository):
         existing = self.db.query(Room).filter(Room.property_id == data['property_id'], Room.number == data['number']).first()
         if existing:
             raise ValueError(f"Room number '{data['number']}' already exists for this property.")
+        data['amenity_mask'] = AmenityRepository(self.db).mask(data.get('amenities'), create=True)
         db_obj = Room(**data)
         self.db.add(db_obj)
+        InventoryVersionRepository(self.db).bump([data['property_id']])
         self.db.commit()
         self.db.refresh(db_obj)
         return db_obj
 
-    def update(self, id: int, obj_in) -> Room:
+    def find_existing(self, pairs: List[Tuple[int, str]]) -> Dict[Tuple[int, str], Tuple[int, str]]:
+        """Map (property_id, number) -> (id, status) for the pairs that already exist, in one query."""
+        if not pairs:
+            return {}
+        rows = self.db.query(Room.property_id, Room.number, Room.id, Room.status).filter(
+            tuple_(Room.property_id, Room.number).in_(pairs)
+        ).all()
+        return {(r.property_id, r.number): (r.id, r.status) for r in rows}
+
+    def bulk_upsert(self, rows: List[dict], upsert: bool = False, chunk_size: int = 500, changed_by: Optional[str] = None) -> List[dict]:
+        """Insert (or with ``upsert`` update) validated room rows in chunks inside one transaction.
+
+        Returns one ``{"status", "id", "error"}`` dict per input row, in order.
+        Status changes made by an upsert are written to RoomStatusLog in the
+        same transaction. Nothing is committed if any statement fails.
+        """
+        results: List[dict] = [None] * len(rows)
+        try:
+            # Resolve the amenity dictionary once for the whole import
+            parsed = [parse_amenities(r.get('amenities')) for r in rows]
+            bits = AmenityRepository(self.db).bits_for([name for names in parsed for name in names], create=True)
+            rows = [dict(r, amenity_mask=mask_for(names, bits)) for r, names in zip(rows, parsed)]
+            for start in range(0, len(rows), chunk_size):
+                chunk = rows[start:start + chunk_size]
+                existing = self.find_existing([(r['property_id'], r['number']) for r in chunk])
+                inserts, updates, logs, inserted_at = [], [], [], []
+                for offset, data in enumerate(chunk):
+                    index = start + offset
+                    match = existing.get((data['property_id'], data['number']))
+                    if match is None:
+                        inserts.append(data)
+                        inserted_at.append(index)
+                    elif not upsert:
+                        results[index] = {"status": "error", "id": match[0], "error": f"Room number '{data['number']}' already exists for this property."}
+                    else:
+                        room_id, old_status = match
+                        updates.append(dict(data, id=room_id))
+                        if data['status'] != old_status:
+                            logs.append({"room_id": room_id, "old_status": old_status, "new_status": data['status'], "changed_by": changed_by})
+                        results[index] = {"status": "updated", "id": room_id, "error": None}
+                if inserts:
+                    self.db.bulk_insert_mappings(Room, inserts)
+                    ids = self.find_existing([(r['property_id'], r['number']) for r in inserts])
+                    for index, data in zip(inserted_at, inserts):
+                        results[index] = {"status": "created", "id": ids[(data['property_id'], data['number'])][0], "error": None}
+                if updates:
+                    self.db.bulk_update_mappings(Room, updates)
+                if logs:
+                    self.db.execute(insert(RoomStatusLog), logs)
+            InventoryVersionRepository(self.db).bump({r['property_id'] for r in rows})
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return results
+
+    def update(self, id: int, obj_in, commit: bool = True) -> Room:
+        """Apply the set fields; with ``commit=False`` they are only flushed, for the caller's transaction to finish."""
         db_obj = self.get(id)
         if db_obj is None:
             raise AttributeError(f"Object with id {id} does not exist.")
@@ -87,9 +258,19 @@ class RoomRepository(BaseRepository):
             existing = self.db.query(Room).filter(Room.property_id == new_property_id, Room.number == new_number, Room.id != id).first()
             if existing:
                 raise ValueError(f"Room number '{new_number}' already exists for this property.")
+        if 'amenities' in data:
+            data['amenity_mask'] = AmenityRepository(self.db).mask(data['amenities'], create=True)
+        old_property_id = db_obj.property_id
+        if 'status' in data and data['status'] != db_obj.status:
+            # Direct status edits are logged too, so the log (and the event stream) sees every change
+            self.db.add(RoomStatusLog(room_id=id, old_status=db_obj.status, new_status=data['status']))
         for field, value in data.items():
             if hasattr(db_obj, field):
                 setattr(db_obj, field, value)
+        InventoryVersionRepository(self.db).bump({old_property_id, db_obj.property_id})
+        if not commit:
+            self.db.flush()
+            return db_obj
         self.db.commit()
         self.db.refresh(db_obj)
         return db_obj
@@ -98,8 +279,47 @@ class RoomRepository(BaseRepository):
         db_obj = self.get(id)
         if db_obj is not None:
             self.db.delete(db_obj)
+            InventoryVersionRepository(self.db).bump([db_obj.property_id])
             self.db.commit()
 
+class InventoryVersionRepository:
+    """Per-property counters behind the ETags of room list responses.
+
+    ``bump`` runs inside the caller's transaction and never commits, so the
+    counter moves exactly when the room write it covers is committed.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def bump(self, property_ids: Iterable[Optional[int]]) -> None:
+        property_ids = [p for p in set(property_ids) if p is not None]
+        if not property_ids:
+            return
+        match = RoomInventoryVersion.property_id.in_(property_ids)
+        self.db.query(RoomInventoryVersion).filter(match).update(
+            {RoomInventoryVersion.version: RoomInventoryVersion.version + 1}, synchronize_session=False
+        )
+        known = {p for (p,) in self.db.query(RoomInventoryVersion.property_id).filter(match)}
+        for property_id in property_ids:
+            if property_id in known:
+                continue
+            try:
+                # First write for this property; a concurrent first writer may win the insert
+                with self.db.begin_nested():
+                    self.db.execute(insert(RoomInventoryVersion).values(property_id=property_id, version=1))
+            except IntegrityError:
+                self.db.query(RoomInventoryVersion).filter(RoomInventoryVersion.property_id == property_id).update(
+                    {RoomInventoryVersion.version: RoomInventoryVersion.version + 1}, synchronize_session=False
+                )
+
+    def get(self, property_id: Optional[int] = None) -> int:
+        """Version of one property, or the sum over all properties (it grows with every bump)."""
+        query = self.db.query(func.coalesce(func.sum(RoomInventoryVersion.version), 0))
+        if property_id is not None:
+            query = query.filter(RoomInventoryVersion.property_id == property_id)
+        return query.scalar()
+
 class RoomTypeRepository(BaseRepository):
     def __init__(self, db: Session):
         self.db = db
@@ -107,11 +327,11 @@ class RoomTypeRepository(BaseRepository):
     def get(self, id: int) -> Optional[RoomType]:
         return self.db.query(RoomType).filter(RoomType.id == id).first()
 
-    def list(self, property_id: int = None) -> List[RoomType]:
+    def list(self, property_id: int = None, after_id: Optional[int] = None, limit: Optional[int] = None) -> List[RoomType]:
         query = self.db.query(RoomType)
         if property_id:
             query = query.filter(RoomType.property_id == property_id)
-        return query.all()
+        return keyset_page(query, RoomType, after_id, limit).all()
 
     def create(self, obj_in) -> RoomType:
         db_obj = RoomType(**obj_in.dict())
@@ -144,11 +364,14 @@ class RatePlanRepository(BaseRepository):
     def get(self, id: int) -> Optional[RatePlan]:
         return self.db.query(RatePlan).filter(RatePlan.id == id).first()
 
-    def list(self, property_id: int = None) -> List[RatePlan]:
+    def list(self, property_id: int = None, room_type_id: Optional[int] = None,
+             after_id: Optional[int] = None, limit: Optional[int] = None) -> List[RatePlan]:
         query = self.db.query(RatePlan)
         if property_id:
             query = query.filter(RatePlan.property_id == property_id)
-        return query.all()
+        if room_type_id:
+            query = query.filter(RatePlan.room_type_id == room_type_id)
+        return keyset_page(query, RatePlan, after_id, limit).all()
 
     def create(self, obj_in) -> RatePlan:
         db_obj = RatePlan(**obj_in.dict())
@@ -181,11 +404,14 @@ class RoomStatusLogRepository(BaseRepository):
     def get(self, id: int) -> Optional[RoomStatusLog]:
         return self.db.query(RoomStatusLog).filter(RoomStatusLog.id == id).first()
 
-    def list(self, property_id: int = None) -> List[RoomStatusLog]:
+    def list(self, property_id: int = None, room_id: Optional[int] = None,
+             after_id: Optional[int] = None, limit: Optional[int] = None) -> List[RoomStatusLog]:
         query = self.db.query(RoomStatusLog)
         if property_id:
             query = query.join(Room).filter(Room.property_id == property_id)
-        return query.all()
+        if room_id:
+            query = query.filter(RoomStatusLog.room_id == room_id)
+        return keyset_page(query, RoomStatusLog, after_id, limit).all()
 
     def create(self, obj_in) -> RoomStatusLog:
         db_obj = RoomStatusLog(**obj_in.dict())
@@ -194,6 +420,14 @@ class RoomStatusLogRepository(BaseRepository):
         self.db.refresh(db_obj)
         return db_obj
 
+    def create_many(self, rows: List[dict]) -> int:
+        # One executemany and one commit for the whole batch
+        if not rows:
+            return 0
+        self.db.execute(insert(RoomStatusLog), rows)
+        self.db.commit()
+        return len(rows)
+
     def update(self, id: int, obj_in) -> RoomStatusLog:
         db_obj = self.get(id)
         if db_obj is None:
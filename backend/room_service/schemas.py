@@ -1,6 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional
-from datetime import datetime
+from typing import Dict, List, Optional
+from datetime import date, datetime
 
 class PropertyCreate(BaseModel):
     name: str
@@ -16,6 +16,7 @@ class RoomTypeCreate(BaseModel):
     base_rate: float
 
 class RoomTypeRead(BaseModel):
+    id: int
     property_id: int
     name: str
     base_rate: float
@@ -44,6 +45,23 @@ class RoomUpdate(BaseModel):
     floor: Optional[str] = None
     amenities: Optional[str] = None
 
+class AmenityRead(BaseModel):
+    id: int
+    name: str
+    bit: int
+
+class RoomBulkRowResult(BaseModel):
+    index: int
+    status: str  # created | updated | error
+    id: Optional[int] = None
+    error: Optional[str] = None
+
+class RoomBulkResult(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    results: List[RoomBulkRowResult]
+
 class RatePlanCreate(BaseModel):
     property_id: int
     room_type_id: int
@@ -53,6 +71,7 @@ class RatePlanCreate(BaseModel):
     end_date: Optional[datetime] = None
 
 class RatePlanRead(BaseModel):
+    id: int
     property_id: int
     room_type_id: int
     name: str
@@ -61,8 +80,29 @@ class RatePlanRead(BaseModel):
     end_date: Optional[datetime] = None
 
 class RoomStatusLogRead(BaseModel):
+    id: int
     room_id: int
     old_status: str
     new_status: str
     changed_at: datetime
     changed_by: Optional[str] = None
+
+class NightlyRate(BaseModel):
+    date: date
+    rate: float
+    rate_plan_id: Optional[int] = None  # None means the room type's base rate applied
+
+class RoomTypeQuote(BaseModel):
+    room_type_id: int
+    check_in: date
+    check_out: date
+    nights: int
+    total: float
+    nightly: List[NightlyRate]
+
+class RoomSummary(BaseModel):
+    property_id: Optional[int] = None
+    total: int
+    by_status: Dict[str, int]
+    by_floor: Dict[str, Dict[str, int]]  # floor -> status -> count
+    by_type: Dict[int, Dict[str, int]]  # room type id -> status -> count
@@ -1,13 +1,28 @@
 from backend.core.service import BaseService
 from .repository import (
-    PropertyRepository, RoomRepository, RoomTypeRepository, RatePlanRepository, RoomStatusLogRepository
+    PropertyRepository, RoomRepository, RoomTypeRepository, RatePlanRepository, RoomStatusLogRepository,
+    InventoryVersionRepository
 )
 from .models import Room
+from .schemas import RoomCreate
+from .allocation import FreeRoomPool
+from .transitions import ROOM_STATUSES, allowed_from
+from .status_log import RoomStatusLogWriter
+from .rates import RateIndexCache
+from .board import RoomBoard
 from sqlalchemy.orm import Session
+from pydantic import ValidationError
+from typing import Iterable, List, Optional
+from datetime import date
 
 # Import exceptions from the new exceptions.py module
 from backend.room_service.exceptions import InvalidStatusTransition, NoAvailableRoom
 
+# Same fields RoomRepository.create insists on
+BULK_REQUIRED_FIELDS = ('property_id', 'number', 'type_id', 'status', 'floor')
+
+MAX_QUOTE_NIGHTS = 366
+
 class PropertyService(BaseService):
     def __init__(self, db: Session):
         self.repo = PropertyRepository(db)
@@ -17,33 +32,115 @@ class PropertyService(BaseService):
     # Add business logic methods as needed
 
 class RoomService(BaseService):
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, pool: Optional[FreeRoomPool] = None, log_writer: Optional[RoomStatusLogWriter] = None,
+                 board: Optional[RoomBoard] = None):
         self.repo = RoomRepository(db)
+        self.pool = pool
+        self.log_writer = log_writer
+        self.board = board
 
     def validate(self, *args, **kwargs):
         pass
 
-    def allocate_room(self, property_id: int, room_type_id: int):
-        rooms = self.repo.list(property_id=property_id)
-        for room in rooms:
-            if room.type_id == room_type_id and room.status == "AVAILABLE":
+    def allocate_room(self, property_id: int, room_type_id: int, for_update: bool = False):
+        room = None
+        if self.pool is not None:
+            room = self._allocate_from_pool(property_id, room_type_id)
+        if room is None:
+            # Pool misses fall through to the indexed probe so a cold or lagging pool never hides a free room
+            room = self.repo.first_available(property_id, room_type_id, for_update=for_update)
+            if room is not None and self.pool is not None:
+                self.pool.apply(room)
+        if room is None:
+            raise NoAvailableRoom(f"No available room for property_id={property_id}, room_type_id={room_type_id}")
+        return room
+
+    def _allocate_from_pool(self, property_id: int, room_type_id: int) -> Optional[Room]:
+        while True:
+            room_id = self.pool.peek(self.repo.db, property_id, room_type_id)
+            if room_id is None:
+                return None
+            room = self.repo.get(room_id)
+            if room is None:
+                self.pool.discard(room_id)
+                continue
+            if room.status == "AVAILABLE" and room.property_id == property_id and room.type_id == room_type_id:
                 return room
-        # Raise if no available room
-        raise NoAvailableRoom(f"No available room for property_id={property_id}, room_type_id={room_type_id}")
+            # Stale hint (changed by another process); re-index and try the next one
+            self.pool.apply(room)
 
-    def mark_room_status(self, room_id: int, status: str):
+    def mark_room_status(self, room_id: int, status: str, changed_by: Optional[str] = None, expected_status: Optional[str] = None):
+        allowed = allowed_from(status)
+        if not allowed:
+            raise InvalidStatusTransition(f"Unknown room status {status}")
+        if self.log_writer is not None and expected_status is None:
+            # The buffered log needs the exact old status, so pin the CAS to the one we observe
+            room = self.repo.get(room_id)
+            if not room:
+                raise InvalidStatusTransition(f"Room {room_id} not found")
+            expected_status = room.status
+        if expected_status is not None:
+            allowed = allowed & {expected_status}
+        changed = self.repo.transition_status(room_id, status, allowed, changed_by=changed_by, log=self.log_writer is None)
+        if not changed:
+            # Only the failure path reads the row, to report why the CAS did not apply
+            room = self.repo.get(room_id)
+            if not room:
+                raise InvalidStatusTransition(f"Room {room_id} not found")
+            if room.status == status:
+                raise InvalidStatusTransition(f"Room {room_id} is already in status {status}")
+            if room.status in allowed_from(status):
+                raise InvalidStatusTransition(f"Room {room_id} changed concurrently (now {room.status})")
+            raise InvalidStatusTransition(f"Room {room_id} cannot move from {room.status} to {status}")
+        if self.log_writer is not None:
+            self.log_writer.record(room_id, expected_status, status, changed_by=changed_by)
         room = self.repo.get(room_id)
-        if not room:
-            raise InvalidStatusTransition(f"Room {room_id} not found")
-        if room.status == status:
-            raise InvalidStatusTransition(f"Room {room_id} is already in status {status}")
-        # Optionally, add more robust state transition validation here
-        old_status = room.status
-        room.status = status
-        self.repo.db.commit()
-        self.repo.db.refresh(room)
+        if self.pool is not None:
+            self.pool.apply(room)
+        if self.board is not None:
+            if expected_status is None:
+                # Any allowed status may have been replaced, so the exact counts to move are unknown
+                self.board.invalidate(room.property_id)
+            else:
+                version = InventoryVersionRepository(self.repo.db).get(room.property_id)
+                self.board.apply_transition(room.property_id, room.floor, room.type_id, expected_status, status, version)
         return room
 
+    def bulk_import(self, items: Iterable[dict], upsert: bool = False, chunk_size: int = 500, changed_by: Optional[str] = None) -> dict:
+        """Validate every row in one pass, then write the valid ones in a single transaction."""
+        results, valid, positions, seen = [], [], [], set()
+        for index, item in enumerate(items):
+            try:
+                if not isinstance(item, dict):
+                    raise ValueError(f"Expected a JSON object, got {str(item)[:80]!r}")
+                data = RoomCreate.parse_obj(item).dict()
+                for field in BULK_REQUIRED_FIELDS:
+                    if data[field] in (None, ""):
+                        raise ValueError(f"Missing or empty required field: {field}")
+                if data['status'] not in ROOM_STATUSES:
+                    raise ValueError(f"Unknown room status {data['status']}")
+                key = (data['property_id'], data['number'])
+                if key in seen:
+                    raise ValueError(f"Room number '{data['number']}' appears more than once in this import.")
+                seen.add(key)
+            except (ValidationError, ValueError, TypeError) as e:
+                results.append({"index": index, "status": "error", "id": None, "error": str(e)})
+                continue
+            results.append(None)
+            valid.append(data)
+            positions.append(index)
+        for index, outcome in zip(positions, self.repo.bulk_upsert(valid, upsert=upsert, chunk_size=chunk_size, changed_by=changed_by)):
+            results[index] = dict(outcome, index=index)
+        if self.pool is not None:
+            for property_id in {data['property_id'] for data in valid}:
+                self.pool.invalidate(property_id)
+        return {
+            "created": sum(1 for r in results if r["status"] == "created"),
+            "updated": sum(1 for r in results if r["status"] == "updated"),
+            "failed": sum(1 for r in results if r["status"] == "error"),
+            "results": results,
+        }
+
 class RoomTypeService(BaseService):
     def __init__(self, db: Session):
         self.repo = RoomTypeRepository(db)
@@ -51,11 +148,24 @@ class RoomTypeService(BaseService):
         pass
 
 class RatePlanService(BaseService):
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, cache: Optional[RateIndexCache] = None):
         self.repo = RatePlanRepository(db)
+        self.cache = cache or RateIndexCache(ttl=0)
     def validate(self, *args, **kwargs):
         pass
 
+    def quote(self, room_type_ids: List[int], check_in: date, check_out: date) -> List[dict]:
+        """Best nightly rates for each room type over [check_in, check_out); unknown types are skipped."""
+        if check_in >= check_out:
+            raise ValueError("check_in must be before check_out")
+        if (check_out - check_in).days > MAX_QUOTE_NIGHTS:
+            raise ValueError(f"Quotes are limited to {MAX_QUOTE_NIGHTS} nights")
+        indexes = self.cache.get_many(self.repo.db, room_type_ids)
+        return [
+            dict(indexes[rt].quote(check_in, check_out), room_type_id=rt)
+            for rt in room_type_ids if rt in indexes
+        ]
+
 class RoomStatusLogService(BaseService):
     def __init__(self, db: Session):
         self.repo = RoomStatusLogRepository(db)
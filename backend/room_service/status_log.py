@@ -0,0 +1,133 @@
+# Buffered, batched writer for RoomStatusLog rows
+import logging
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, List, Optional
+from sqlalchemy.orm import Session
+from .repository import RoomStatusLogRepository
+
+logger = logging.getLogger(__name__)
+
+# Queue sentinel that wakes the flush thread on stop()
+_WAKE = object()
+
+class RoomStatusLogWriter:
+    """Collects status transitions and writes them with one executemany per batch.
+
+    A background thread flushes whenever ``max_batch`` rows are waiting or the
+    oldest waiting row is ``flush_interval`` seconds old. The queue is bounded:
+    when it is full, ``record`` waits up to ``put_timeout`` and then flushes a
+    batch on the caller's thread, so producers slow down instead of dropping rows.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], max_batch: int = 500,
+                 flush_interval: float = 1.0, max_queue: int = 10000, put_timeout: float = 0.5,
+                 max_retries: int = 3, on_write: Optional[Callable[[], None]] = None):
+        self.session_factory = session_factory
+        self.on_write = on_write  # Called after each batch lands, e.g. to wake event subscribers
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.max_retries = max_retries
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=max_queue)
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def record(self, room_id: int, old_status: str, new_status: str, changed_by: Optional[str] = None,
+               changed_at: Optional[datetime] = None) -> None:
+        row = {
+            "room_id": room_id,
+            "old_status": old_status,
+            "new_status": new_status,
+            "changed_by": changed_by,
+            # Stamp the transition time now; the row may be written a second later
+            "changed_at": changed_at or datetime.now(timezone.utc).replace(tzinfo=None),
+        }
+        while True:
+            try:
+                self._queue.put(row, timeout=self.put_timeout)
+                return
+            except queue.Full:
+                # Backpressure: the producer drains a batch itself before retrying
+                self.flush()
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _drain(self, block: bool) -> List[dict]:
+        batch: List[dict] = []
+        deadline = 0.0
+        while len(batch) < self.max_batch:
+            # Wait for the first row up to flush_interval, then only until that row's deadline
+            remaining = deadline - time.monotonic() if batch else self.flush_interval
+            try:
+                row = self._queue.get(timeout=remaining) if block and remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if row is _WAKE:
+                if block:
+                    break
+                continue
+            if not batch:
+                deadline = time.monotonic() + self.flush_interval
+            batch.append(row)
+        return batch
+
+    def _write(self, batch: List[dict]) -> None:
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                with self._write_lock:
+                    db = self.session_factory()
+                    try:
+                        RoomStatusLogRepository(db).create_many(batch)
+                    finally:
+                        db.close()
+                if self.on_write is not None:
+                    self.on_write()
+                return
+            except Exception:
+                logger.exception("Writing %d room status log rows failed (attempt %d/%d)", len(batch), attempt, self.max_retries)
+                time.sleep(min(self.flush_interval, 0.1) * attempt)
+        logger.error("Dropping %d room status log rows after %d attempts", len(batch), self.max_retries)
+
+    def flush(self) -> int:
+        """Write everything queued so far on the calling thread; returns rows written."""
+        written = 0
+        while True:
+            batch = self._drain(block=False)
+            if not batch:
+                return written
+            self._write(batch)
+            written += len(batch)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._drain(block=True)
+            if batch:
+                self._write(batch)
+        self.flush()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="room-status-log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        try:
+            self._queue.put_nowait(_WAKE)
+        except queue.Full:
+            pass  # the thread is busy draining and will see the stop flag
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
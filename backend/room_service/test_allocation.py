@@ -0,0 +1,80 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from backend.core.base import Base
+from backend.room_service.models import Room, RoomType
+from backend.room_service.allocation import FreeRoomPool
+from backend.room_service.service import RoomService
+from backend.room_service.exceptions import NoAvailableRoom
+
+@pytest.fixture(scope="function")
+def db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def room_type(db_session):
+    rt = RoomType(property_id=1, name="Standard", base_rate=100.0)
+    db_session.add(rt)
+    db_session.commit()
+    return rt
+
+def add_room(db, number, type_id, status="AVAILABLE", property_id=1):
+    room = Room(property_id=property_id, number=number, type_id=type_id, status=status, floor="1")
+    db.add(room)
+    db.commit()
+    return room
+
+def test_indexed_allocation_picks_lowest_available_id(db_session, room_type):
+    add_room(db_session, "101", room_type.id, status="OCCUPIED")
+    r2 = add_room(db_session, "102", room_type.id)
+    add_room(db_session, "103", room_type.id)
+    allocated = RoomService(db_session).allocate_room(1, room_type.id)
+    assert allocated.id == r2.id
+
+def test_allocation_query_uses_composite_index(db_session, room_type):
+    plan = db_session.execute(text(
+        "EXPLAIN QUERY PLAN SELECT id FROM rooms WHERE property_id = 1 AND type_id = 1 AND status = 'AVAILABLE' ORDER BY id LIMIT 1"
+    )).fetchall()
+    assert any("ix_rooms_property_type_status" in row[-1] for row in plan)
+
+def test_pool_tracks_status_changes(db_session, room_type):
+    r1 = add_room(db_session, "101", room_type.id)
+    r2 = add_room(db_session, "102", room_type.id)
+    service = RoomService(db_session, pool=FreeRoomPool())
+    assert service.allocate_room(1, room_type.id).id == r1.id
+    service.mark_room_status(r1.id, "OCCUPIED")
+    assert service.allocate_room(1, room_type.id).id == r2.id
+    service.mark_room_status(r2.id, "OCCUPIED")
+    with pytest.raises(NoAvailableRoom):
+        service.allocate_room(1, room_type.id)
+    service.mark_room_status(r1.id, "AVAILABLE")
+    assert service.allocate_room(1, room_type.id).id == r1.id
+
+def test_pool_skips_stale_hints(db_session, room_type):
+    r1 = add_room(db_session, "101", room_type.id)
+    r2 = add_room(db_session, "102", room_type.id)
+    pool = FreeRoomPool()
+    service = RoomService(db_session, pool=pool)
+    assert service.allocate_room(1, room_type.id).id == r1.id
+    # Changed behind the pool's back (e.g. by another process)
+    db_session.query(Room).filter(Room.id == r1.id).update({"status": "OCCUPIED"})
+    db_session.commit()
+    assert service.allocate_room(1, room_type.id).id == r2.id
+    assert pool.peek(db_session, 1, room_type.id) == r2.id
+
+def test_pool_miss_falls_back_to_database(db_session, room_type):
+    pool = FreeRoomPool()
+    service = RoomService(db_session, pool=pool)
+    with pytest.raises(NoAvailableRoom):
+        service.allocate_room(1, room_type.id)
+    # Inserted without notifying the pool
+    room = add_room(db_session, "101", room_type.id)
+    assert service.allocate_room(1, room_type.id).id == room.id
+    assert pool.peek(db_session, 1, room_type.id) == room.id
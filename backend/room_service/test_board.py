@@ -0,0 +1,59 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.core.base import Base
+from backend.room_service.board import RoomBoard, UNASSIGNED_FLOOR
+from backend.room_service.repository import RoomRepository
+from backend.room_service.service import RoomService
+
+@pytest.fixture(scope="function")
+def db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def make_room(number, property_id=1, status="AVAILABLE", floor="1", type_id=1):
+    return {"property_id": property_id, "number": number, "type_id": type_id, "status": status, "floor": floor}
+
+@pytest.fixture
+def rooms(db_session):
+    repo = RoomRepository(db_session)
+    return [
+        repo.create(make_room("101")),
+        repo.create(make_room("102", status="OCCUPIED")),
+        repo.create(make_room("201", floor="2", type_id=2)),
+        repo.create(make_room("101", property_id=2)),
+    ]
+
+def test_summary_counts_by_status_floor_and_type(db_session, rooms):
+    summary = RoomBoard().summary(db_session, 1)
+    assert summary["total"] == 3
+    assert summary["by_status"] == {"AVAILABLE": 2, "OCCUPIED": 1}
+    assert summary["by_floor"] == {"1": {"AVAILABLE": 1, "OCCUPIED": 1}, "2": {"AVAILABLE": 1}}
+    assert summary["by_type"] == {1: {"AVAILABLE": 1, "OCCUPIED": 1}, 2: {"AVAILABLE": 1}}
+    assert RoomBoard().summary(db_session)["total"] == 4
+
+def test_status_change_updates_counts_without_recount(db_session, rooms, monkeypatch):
+    board = RoomBoard()
+    board.summary(db_session, 1)
+    RoomService(db_session, board=board).mark_room_status(rooms[0].id, "CLEANING", expected_status="AVAILABLE")
+    def no_recount(self, property_id=None):
+        raise AssertionError("summary should come from the incremental counters")
+    monkeypatch.setattr(RoomRepository, "group_counts", no_recount)
+    summary = board.summary(db_session, 1)
+    assert summary["by_status"] == {"AVAILABLE": 1, "OCCUPIED": 1, "CLEANING": 1}
+    assert summary["by_floor"]["1"] == {"OCCUPIED": 1, "CLEANING": 1}
+
+def test_unseen_write_forces_recount(db_session, rooms):
+    board = RoomBoard()
+    board.summary(db_session, 1)
+    # Written without the board, like another API worker would
+    RoomRepository(db_session).update(rooms[1].id, {"status": "CLEANING", "floor": None})
+    summary = board.summary(db_session, 1)
+    assert summary["by_status"] == {"AVAILABLE": 2, "CLEANING": 1}
+    assert summary["by_floor"][UNASSIGNED_FLOOR] == {"CLEANING": 1}
@@ -0,0 +1,63 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.core.base import Base
+from backend.room_service.models import Room, RoomStatusLog
+from backend.room_service.service import RoomService
+
+@pytest.fixture(scope="function")
+def db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def room_service(db_session):
+    return RoomService(db_session)
+
+def make_room(number, property_id=1, status="AVAILABLE", floor="1"):
+    return {"property_id": property_id, "number": number, "type_id": 1, "status": status, "floor": floor}
+
+def test_bulk_import_creates_rooms_across_chunks(room_service, db_session):
+    rows = [make_room(str(i)) for i in range(25)]
+    summary = room_service.bulk_import(rows, chunk_size=10)
+    assert (summary["created"], summary["updated"], summary["failed"]) == (25, 0, 0)
+    ids = [r["id"] for r in summary["results"]]
+    assert ids == sorted(ids) and len(set(ids)) == 25
+    assert db_session.query(Room).count() == 25
+
+def test_bulk_import_reports_per_row_errors(room_service, db_session):
+    room_service.bulk_import([make_room("101")])
+    rows = [
+        make_room("101"),               # already exists
+        make_room("102"),
+        make_room("102"),               # duplicate inside the import
+        {"property_id": 1, "number": "103"},  # missing type_id
+        make_room("104", status="DIRTY"),
+        make_room("105", floor=None),
+        "not json",
+    ]
+    summary = room_service.bulk_import(rows)
+    assert [r["status"] for r in summary["results"]] == ["error", "created", "error", "error", "error", "error", "error"]
+    assert [r["index"] for r in summary["results"]] == list(range(len(rows)))
+    assert "already exists" in summary["results"][0]["error"]
+    assert "more than once" in summary["results"][2]["error"]
+    assert db_session.query(Room).count() == 2
+
+def test_bulk_upsert_updates_existing_and_logs_status_changes(room_service, db_session):
+    room_service.bulk_import([make_room("101"), make_room("102")])
+    summary = room_service.bulk_import([make_room("101", status="MAINTENANCE", floor="2"), make_room("103")], upsert=True, changed_by="import")
+    assert [r["status"] for r in summary["results"]] == ["updated", "created"]
+    room = db_session.query(Room).filter_by(number="101").one()
+    assert (room.status, room.floor) == ("MAINTENANCE", "2")
+    log = db_session.query(RoomStatusLog).one()
+    assert (log.room_id, log.old_status, log.new_status, log.changed_by) == (room.id, "AVAILABLE", "MAINTENANCE", "import")
+
+def test_bulk_import_same_number_in_other_property(room_service, db_session):
+    summary = room_service.bulk_import([make_room("101", property_id=1), make_room("101", property_id=2)])
+    assert summary["created"] == 2
@@ -0,0 +1,74 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from backend.core.base import Base
+from backend.room_service.api import get_db
+from backend.room_service.main import app
+
+ROOMS = "/api/v1/room-service/rooms"
+
+@pytest.fixture
+def client():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+def make_room(number, property_id=1):
+    return {"property_id": property_id, "number": number, "type_id": 1, "status": "AVAILABLE", "floor": "1"}
+
+def test_unchanged_list_returns_304(client):
+    client.post(ROOMS, json=make_room("101"))
+    first = client.get(ROOMS, params={"property_id": 1})
+    etag = first.headers["ETag"]
+    assert not etag.startswith("W/")
+    second = client.get(ROOMS, params={"property_id": 1}, headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.headers["ETag"] == etag
+    assert second.content == b""
+
+def test_room_write_changes_etag(client):
+    room = client.post(ROOMS, json=make_room("101")).json()
+    etag = client.get(ROOMS, params={"property_id": 1}).headers["ETag"]
+    client.patch(f"{ROOMS}/{room['id']}", json={"status": "OCCUPIED"})
+    resp = client.get(ROOMS, params={"property_id": 1}, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.json()[0]["status"] == "OCCUPIED"
+    assert resp.headers["ETag"] != etag
+
+def test_other_property_write_keeps_etag(client):
+    client.post(ROOMS, json=make_room("101"))
+    etag = client.get(ROOMS, params={"property_id": 1}).headers["ETag"]
+    client.post(ROOMS, json=make_room("101", property_id=2))
+    assert client.get(ROOMS, params={"property_id": 1}, headers={"If-None-Match": etag}).status_code == 304
+    # The unscoped list covers every property, so it does change
+    all_etag = client.get(ROOMS).headers["ETag"]
+    client.post(ROOMS, json=make_room("102", property_id=2))
+    assert client.get(ROOMS, headers={"If-None-Match": all_etag}).status_code == 200
+
+def test_etag_depends_on_query(client):
+    client.post(ROOMS, json=make_room("101"))
+    etag = client.get(ROOMS, params={"property_id": 1}).headers["ETag"]
+    resp = client.get(ROOMS, params={"property_id": 1, "status": "OCCUPIED"}, headers={"If-None-Match": etag})
+    assert resp.status_code == 200
+    assert client.get(ROOMS, params={"property_id": 1}, headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+
+def test_summary_endpoint(client):
+    client.post(ROOMS, json=make_room("101"))
+    room = client.post(ROOMS, json=make_room("102")).json()
+    client.patch(f"{ROOMS}/{room['id']}", json={"status": "OCCUPIED"})
+    body = client.get(f"{ROOMS}/summary", params={"property_id": 1}).json()
+    assert (body["total"], body["by_status"]) == (2, {"AVAILABLE": 1, "OCCUPIED": 1})
+    assert body["by_type"] == {"1": {"AVAILABLE": 1, "OCCUPIED": 1}}
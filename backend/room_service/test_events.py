@@ -0,0 +1,149 @@
+import asyncio
+import json
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.core.base import Base
+from backend.room_service.models import Room, RoomStatusLog, RoomType
+from backend.room_service.repository import RoomRepository
+from backend.room_service.service import RoomService
+from backend.room_service.events import RoomEventHub, event_stream
+
+@pytest.fixture(scope="function")
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rooms.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture
+def db_session(session_factory):
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def rooms(db_session):
+    rt = RoomType(property_id=1, name="Standard", base_rate=100.0)
+    db_session.add(rt)
+    db_session.commit()
+    rooms = [Room(property_id=p, number="101", type_id=rt.id, status="AVAILABLE", floor="1") for p in (1, 2)]
+    db_session.add_all(rooms)
+    db_session.commit()
+    return rooms
+
+def parse(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.strip().splitlines())
+    return int(fields["id"]), json.loads(fields["data"])
+
+@pytest.mark.asyncio
+async def test_hub_fans_out_by_property(session_factory, db_session, rooms):
+    hub = RoomEventHub(session_factory)
+    everything, property_one = hub.subscribe(), hub.subscribe(property_id=1)
+    service = RoomService(db_session)
+    service.mark_room_status(rooms[0].id, "OCCUPIED", changed_by="frontdesk")
+    service.mark_room_status(rooms[1].id, "CLEANING")
+    assert await hub.poll_once() == 2
+    assert everything.queue.qsize() == 2
+    event = property_one.queue.get_nowait()
+    assert (event["room_id"], event["property_id"], event["old_status"], event["new_status"], event["changed_by"]) == (
+        rooms[0].id, 1, "AVAILABLE", "OCCUPIED", "frontdesk")
+    assert property_one.queue.empty()
+    assert await hub.poll_once() == 0
+
+@pytest.mark.asyncio
+async def test_repository_update_status_is_streamed(session_factory, db_session, rooms):
+    hub = RoomEventHub(session_factory)
+    subscription = hub.subscribe()
+    RoomRepository(db_session).update(rooms[0].id, {"status": "MAINTENANCE"})
+    await hub.poll_once()
+    assert subscription.queue.get_nowait()["new_status"] == "MAINTENANCE"
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_is_dropped_not_blocking(session_factory, db_session, rooms):
+    hub = RoomEventHub(session_factory, buffer_size=1)
+    slow = hub.subscribe()
+    service = RoomService(db_session)
+    service.mark_room_status(rooms[0].id, "OCCUPIED")
+    service.mark_room_status(rooms[0].id, "CLEANING")
+    await hub.poll_once()
+    assert slow.overflowed
+    assert hub.last_id == 2
+
+@pytest.mark.asyncio
+async def test_stream_resumes_after_last_event_id(session_factory, db_session, rooms):
+    service = RoomService(db_session)
+    for status in ("OCCUPIED", "CLEANING", "AVAILABLE"):
+        service.mark_room_status(rooms[0].id, status)
+    hub = RoomEventHub(session_factory)
+    hub.last_id = hub.latest_id()
+    stream = event_stream(hub, property_id=1, last_event_id=1)
+    assert (await stream.__anext__()).startswith("retry:")
+    replayed = [parse(await stream.__anext__()) for _ in range(2)]
+    assert [(i, e["new_status"]) for i, e in replayed] == [(2, "CLEANING"), (3, "AVAILABLE")]
+    # Live events follow the replay without duplicates
+    service.mark_room_status(rooms[0].id, "OCCUPIED")
+    await hub.poll_once()
+    event_id, event = parse(await asyncio.wait_for(stream.__anext__(), timeout=1))
+    assert (event_id, event["new_status"]) == (4, "OCCUPIED")
+    await stream.aclose()
+    assert not hub._subscribers
+
+@pytest.mark.asyncio
+async def test_lower_id_committed_late_is_still_published(session_factory, db_session, rooms):
+    hub = RoomEventHub(session_factory, lookback=10)
+    stream = event_stream(hub)
+    assert (await stream.__anext__()).startswith("retry:")
+    service = RoomService(db_session)
+    for status in ("OCCUPIED", "CLEANING", "AVAILABLE"):
+        service.mark_room_status(rooms[0].id, status)
+    # Id 2 is still uncommitted (as on Postgres) when the hub reads 1 and 3
+    late = db_session.get(RoomStatusLog, 2)
+    row = {"id": 2, "room_id": late.room_id, "old_status": late.old_status, "new_status": late.new_status}
+    db_session.delete(late)
+    db_session.commit()
+    assert await hub.poll_once() == 2
+    db_session.add(RoomStatusLog(**row))
+    db_session.commit()
+    assert await hub.poll_once() == 1
+    assert await hub.poll_once() == 0
+    received = [parse(await asyncio.wait_for(stream.__anext__(), timeout=1))[0] for _ in range(3)]
+    assert received == [1, 3, 2]
+    await stream.aclose()
+
+@pytest.mark.asyncio
+async def test_notify_wakes_running_hub(session_factory, db_session, rooms):
+    hub = RoomEventHub(session_factory, poll_interval=30.0)
+    await hub.start()
+    try:
+        subscription = hub.subscribe()
+        RoomService(db_session).mark_room_status(rooms[0].id, "OCCUPIED")
+        hub.notify()
+        event = await asyncio.wait_for(subscription.queue.get(), timeout=2)
+        assert event["new_status"] == "OCCUPIED"
+    finally:
+        await hub.stop()
+
+@pytest.mark.asyncio
+async def test_subscriber_joining_an_idle_hub_gets_only_new_changes(session_factory, db_session, rooms):
+    hub = RoomEventHub(session_factory, poll_interval=0.05, buffer_size=5)
+    await hub.start()
+    try:
+        service = RoomService(db_session)
+        for _ in range(3):  # more changes than a subscriber's buffer holds, made while nobody listens
+            for status in ("OCCUPIED", "CLEANING", "AVAILABLE"):
+                service.mark_room_status(rooms[0].id, status)
+        for _ in range(100):
+            if hub.last_id == 9:
+                break
+            await asyncio.sleep(0.01)
+        assert hub.last_id == 9
+        subscription = hub.subscribe()
+        service.mark_room_status(rooms[0].id, "OCCUPIED")
+        hub.notify()
+        event = await asyncio.wait_for(subscription.queue.get(), timeout=2)
+        assert (event["id"], event["new_status"]) == (10, "OCCUPIED")
+        assert subscription.queue.empty() and not subscription.overflowed
+    finally:
+        await hub.stop()
@@ -0,0 +1,124 @@
+from datetime import date, datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from backend.core.base import Base
+from backend.room_service.models import RoomType, RatePlan
+from backend.room_service.rates import RateIndex, RateIndexCache, rate_index_cache
+from backend.room_service.service import RatePlanService
+
+PREFIX = "/api/v1/room-service"
+
+@pytest.fixture(scope="function")
+def db_session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    db = TestingSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+def plan(id, rate, start=None, end=None, room_type_id=1):
+    return RatePlan(id=id, property_id=1, room_type_id=room_type_id, name=f"plan {id}", daily_rate=rate,
+                    start_date=datetime.combine(start, datetime.min.time()) if start else None,
+                    end_date=datetime.combine(end, datetime.min.time()) if end else None)
+
+def brute_force(base_rate, plans, night):
+    covering = [p for p in plans
+                if (p.start_date is None or p.start_date.date() <= night)
+                and (p.end_date is None or night <= p.end_date.date())]
+    if not covering:
+        return base_rate, None
+    best = min(covering, key=lambda p: (p.daily_rate, p.id))
+    return best.daily_rate, best.id
+
+def test_index_matches_brute_force_per_night():
+    d = date(2026, 6, 1)
+    plans = [
+        plan(1, 90.0, d, d + timedelta(days=9)),
+        plan(2, 80.0, d + timedelta(days=5), d + timedelta(days=14)),
+        plan(3, 120.0, None, d + timedelta(days=2)),   # open start, pricier than base
+        plan(4, 95.0, d + timedelta(days=20), None),   # open end
+    ]
+    index = RateIndex(100.0, plans)
+    # The first stay crosses the open-ended edges (segment walk), the second sits inside the dense arrays
+    for check_in, check_out in [(d - timedelta(days=5), d + timedelta(days=30)), (d + timedelta(days=1), d + timedelta(days=19))]:
+        quote = index.quote(check_in, check_out)
+        assert quote["nights"] == (check_out - check_in).days
+        assert [n["date"] for n in quote["nightly"]][0] == check_in
+        for night in quote["nightly"]:
+            assert (night["rate"], night["rate_plan_id"]) == brute_force(100.0, plans, night["date"])
+        assert quote["total"] == pytest.approx(sum(n["rate"] for n in quote["nightly"]))
+
+def test_end_date_is_inclusive():
+    d = date(2026, 6, 1)
+    index = RateIndex(100.0, [plan(1, 50.0, d, d)])
+    quote = index.quote(d - timedelta(days=1), d + timedelta(days=2))
+    assert [n["rate"] for n in quote["nightly"]] == [100.0, 50.0, 100.0]
+
+def test_service_quotes_many_room_types_and_skips_unknown(db_session):
+    db_session.add_all([RoomType(id=1, property_id=1, name="Standard", base_rate=100.0),
+                        RoomType(id=2, property_id=1, name="Suite", base_rate=250.0)])
+    db_session.add(plan(1, 80.0, date(2026, 6, 1), date(2026, 6, 30), room_type_id=1))
+    db_session.commit()
+    quotes = RatePlanService(db_session).quote([1, 2, 99], date(2026, 6, 29), date(2026, 7, 2))
+    assert [(q["room_type_id"], q["total"]) for q in quotes] == [(1, 80.0 * 2 + 100.0), (2, 750.0)]
+
+def test_service_rejects_bad_ranges(db_session):
+    service = RatePlanService(db_session)
+    with pytest.raises(ValueError):
+        service.quote([1], date(2026, 6, 2), date(2026, 6, 2))
+    with pytest.raises(ValueError):
+        service.quote([1], date(2026, 1, 1), date(2028, 1, 1))
+
+def test_cache_serves_until_invalidated(db_session):
+    db_session.add(RoomType(id=1, property_id=1, name="Standard", base_rate=100.0))
+    db_session.commit()
+    cache = RateIndexCache()
+    first = cache.get(db_session, 1)
+    assert cache.get(db_session, 1) is first
+    cache.invalidate(1)
+    assert cache.get(db_session, 1) is not first
+
+def test_quote_30_nights_for_50_room_types(db_session):
+    d = date(2026, 1, 1)
+    db_session.add_all([RoomType(id=rt, property_id=1, name=f"type {rt}", base_rate=100.0 + rt) for rt in range(1, 51)])
+    db_session.add_all([
+        plan(rt * 100 + i, 60.0 + i, d + timedelta(days=7 * i), d + timedelta(days=7 * i + 10), room_type_id=rt)
+        for rt in range(1, 51) for i in range(40)
+    ])
+    db_session.commit()
+    service = RatePlanService(db_session, cache=RateIndexCache())
+    ids = list(range(1, 51))
+    # Timing lives in benchmark_rates.py
+    quotes = service.quote(ids, d + timedelta(days=60), d + timedelta(days=90))
+    assert len(quotes) == 50 and all(q["nights"] == 30 for q in quotes)
+
+def test_quotes_endpoint_and_invalidation(db_session):
+    from backend.room_service.main import app
+    from backend.room_service.api import get_db
+    app.dependency_overrides[get_db] = lambda: db_session
+    rate_index_cache.invalidate()
+    try:
+        client = TestClient(app)
+        rt = client.post(f"{PREFIX}/room-types", json={"property_id": 1, "name": "Standard", "base_rate": 100.0}).json()
+        params = {"room_type_id": rt["id"], "check_in": "2026-06-01", "check_out": "2026-06-04"}
+        resp = client.get(f"{PREFIX}/quotes", params=params)
+        assert resp.status_code == 200
+        assert resp.json()[0]["total"] == 300.0
+        client.post(f"{PREFIX}/rate-plans", json={"property_id": 1, "room_type_id": rt["id"], "name": "Summer",
+                                         "daily_rate": 90.0, "start_date": "2026-06-01T00:00:00",
+                                         "end_date": "2026-06-30T00:00:00"})
+        body = client.get(f"{PREFIX}/quotes", params=params).json()[0]
+        assert body["total"] == 270.0
+        assert body["nightly"][0]["rate_plan_id"] is not None
+        assert client.get(f"{PREFIX}/quotes", params={"property_id": 1, "check_in": "2026-06-01", "check_out": "2026-06-02"}).json()[0]["nights"] == 1
+        assert client.get(f"{PREFIX}/quotes", params={"check_in": "2026-06-01", "check_out": "2026-06-02"}).status_code == 400
+        assert client.get(f"{PREFIX}/quotes", params={**params, "check_out": "2026-05-01"}).status_code == 400
+    finally:
+        app.dependency_overrides.clear()
+        rate_index_cache.invalidate()
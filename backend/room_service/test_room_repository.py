@@ -2,7 +2,7 @@ import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from backend.room_service.models import Base, Room
-from backend.room_service.repository import RoomRepository
+from backend.room_service.repository import RoomRepository, InventoryVersionRepository
 from types import SimpleNamespace
 
 @pytest.fixture(scope="function")
@@ -156,3 +156,52 @@ def test_create_many_rooms_stress(repo):
     for i in range(100):
         repo.create(make_room_obj(number=str(i)))
     assert len(repo.list()) >= 100
+
+def test_list_rooms_filters(repo):
+    repo.create(make_room_obj(number="101", status="AVAILABLE", floor="1"))
+    repo.create(make_room_obj(number="102", status="OCCUPIED", floor="1"))
+    repo.create(make_room_obj(number="201", status="AVAILABLE", floor="2", type_id=2))
+    repo.create(make_room_obj(property_id=2, number="101", status="AVAILABLE", floor="1"))
+    assert [r.number for r in repo.list(property_id=1, status="AVAILABLE")] == ["101", "201"]
+    assert [r.number for r in repo.list(property_id=1, floor="1")] == ["101", "102"]
+    assert [r.number for r in repo.list(property_id=1, type_id=2)] == ["201"]
+
+def test_list_rooms_keyset_pages(repo):
+    for i in range(7):
+        repo.create(make_room_obj(number=str(i)))
+    seen, after = [], None
+    while True:
+        page = repo.list(property_id=1, after_id=after, limit=3)
+        seen.extend(r.number for r in page)
+        if len(page) < 3:
+            break
+        after = page[-1].id
+    assert seen == [str(i) for i in range(7)]
+
+def test_amenity_mask_maintained_on_create_and_update(repo):
+    r1 = repo.create(make_room_obj(number="101", amenities="WiFi, Jacuzzi"))
+    r2 = repo.create(make_room_obj(number="102", amenities="wifi,TV"))
+    assert r1.amenity_mask and r2.amenity_mask
+    assert r1.amenity_mask & r2.amenity_mask  # shared "wifi" bit
+    repo.update(r2.id, {"amenities": None})
+    assert repo.get(r2.id).amenity_mask == 0
+
+def test_list_rooms_by_amenities(repo):
+    repo.create(make_room_obj(number="101", amenities="WiFi,Jacuzzi"))
+    repo.create(make_room_obj(number="102", amenities="WiFi,TV"))
+    repo.create(make_room_obj(number="103", amenities=None))
+    assert [r.number for r in repo.list(amenities="jacuzzi, WIFI")] == ["101"]
+    assert [r.number for r in repo.list(amenities="WiFi")] == ["101", "102"]
+    assert repo.list(amenities="Sauna") == []
+
+def test_inventory_version_bumps_on_room_writes(repo):
+    versions = InventoryVersionRepository(repo.db)
+    assert versions.get(1) == 0
+    room = repo.create(make_room_obj(number="101"))
+    repo.update(room.id, {"floor": "2"})
+    assert versions.get(1) == 2
+    repo.update(room.id, {"property_id": 2})  # moving a room changes both properties' lists
+    assert (versions.get(1), versions.get(2)) == (3, 1)
+    repo.delete(room.id)
+    assert versions.get(2) == 2
+    assert versions.get() == 5
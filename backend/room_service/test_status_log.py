@@ -0,0 +1,103 @@
+import time
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.core.base import Base
+from backend.room_service.models import Room, RoomType, RoomStatusLog
+from backend.room_service.service import RoomService
+from backend.room_service.status_log import RoomStatusLogWriter
+
+@pytest.fixture(scope="function")
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'rooms.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture
+def db_session(session_factory):
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def room(db_session):
+    rt = RoomType(property_id=1, name="Standard", base_rate=100.0)
+    db_session.add(rt)
+    db_session.commit()
+    room = Room(property_id=1, number="101", type_id=rt.id, status="AVAILABLE", floor="1")
+    db_session.add(room)
+    db_session.commit()
+    return room
+
+def log_count(session_factory):
+    db = session_factory()
+    try:
+        return db.query(RoomStatusLog).count()
+    finally:
+        db.close()
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return predicate()
+
+def test_flush_writes_queued_rows_in_one_batch(session_factory, room):
+    writer = RoomStatusLogWriter(session_factory)
+    for _ in range(3):
+        writer.record(room.id, "AVAILABLE", "OCCUPIED")
+    assert log_count(session_factory) == 0
+    assert writer.flush() == 3
+    assert log_count(session_factory) == 3
+    assert writer.pending() == 0
+
+def test_background_thread_flushes_on_size_threshold(session_factory, room):
+    writer = RoomStatusLogWriter(session_factory, max_batch=5, flush_interval=30.0)
+    writer.start()
+    try:
+        for _ in range(5):
+            writer.record(room.id, "AVAILABLE", "OCCUPIED")
+        assert wait_for(lambda: log_count(session_factory) == 5)
+    finally:
+        writer.stop()
+
+def test_background_thread_flushes_on_time_threshold(session_factory, room):
+    writer = RoomStatusLogWriter(session_factory, max_batch=1000, flush_interval=0.05)
+    writer.start()
+    try:
+        writer.record(room.id, "AVAILABLE", "OCCUPIED")
+        assert wait_for(lambda: log_count(session_factory) == 1)
+    finally:
+        writer.stop()
+
+def test_full_queue_applies_backpressure(session_factory, room):
+    writer = RoomStatusLogWriter(session_factory, max_queue=2, put_timeout=0.01)
+    for _ in range(5):
+        writer.record(room.id, "AVAILABLE", "OCCUPIED")
+    # The producer drained the full queue itself rather than dropping rows
+    assert writer.pending() <= 2
+    writer.flush()
+    assert log_count(session_factory) == 5
+
+def test_stop_flushes_pending_rows(session_factory, room):
+    writer = RoomStatusLogWriter(session_factory, max_batch=1000, flush_interval=30.0)
+    writer.start()
+    writer.record(room.id, "AVAILABLE", "OCCUPIED")
+    writer.stop()
+    assert not writer.running
+    assert log_count(session_factory) == 1
+
+def test_service_uses_writer_instead_of_inline_log(session_factory, db_session, room):
+    writer = RoomStatusLogWriter(session_factory)
+    service = RoomService(db_session, log_writer=writer)
+    service.mark_room_status(room.id, "OCCUPIED", changed_by="frontdesk")
+    service.mark_room_status(room.id, "CLEANING")
+    assert db_session.query(RoomStatusLog).count() == 0
+    writer.flush()
+    logs = db_session.query(RoomStatusLog).order_by(RoomStatusLog.id).all()
+    assert [(l.old_status, l.new_status) for l in logs] == [("AVAILABLE", "OCCUPIED"), ("OCCUPIED", "CLEANING")]
+    assert logs[0].changed_by == "frontdesk"
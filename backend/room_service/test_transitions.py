@@ -0,0 +1,125 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from backend.core.base import Base
+from backend.room_service.models import Room, RoomType, RoomStatusLog
+from backend.room_service.repository import RoomRepository
+from backend.room_service.service import RoomService
+from backend.room_service.transitions import ALLOWED_FROM, ROOM_STATUS_TRANSITIONS, allowed_from
+from backend.room_service.exceptions import InvalidStatusTransition
+
+@pytest.fixture(scope="function")
+def session_factory(tmp_path):
+    # File-backed so two sessions see each other's commits like two API workers would
+    engine = create_engine(f"sqlite:///{tmp_path / 'rooms.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@pytest.fixture
+def db_session(session_factory):
+    db = session_factory()
+    try:
+        yield db
+    finally:
+        db.close()
+
+@pytest.fixture
+def room(db_session):
+    rt = RoomType(property_id=1, name="Standard", base_rate=100.0)
+    db_session.add(rt)
+    db_session.commit()
+    room = Room(property_id=1, number="101", type_id=rt.id, status="AVAILABLE", floor="1")
+    db_session.add(room)
+    db_session.commit()
+    return room
+
+def test_allowed_from_is_reverse_of_transition_table():
+    for src, targets in ROOM_STATUS_TRANSITIONS.items():
+        for target in targets:
+            assert src in ALLOWED_FROM[target]
+    assert ALLOWED_FROM["OCCUPIED"] == frozenset({"AVAILABLE"})
+    assert allowed_from("NOT_A_STATUS") == frozenset()
+
+def test_transition_status_returns_row_count(db_session, room):
+    repo = RoomRepository(db_session)
+    assert repo.transition_status(room.id, "OCCUPIED", allowed_from("OCCUPIED")) == 1
+    assert repo.transition_status(room.id, "OCCUPIED", allowed_from("OCCUPIED")) == 0
+    assert repo.transition_status(9999, "OCCUPIED", allowed_from("OCCUPIED")) == 0
+    assert repo.get(room.id).status == "OCCUPIED"
+
+def test_failed_transition_keeps_the_callers_pending_work(db_session, room):
+    repo = RoomRepository(db_session)
+    room.floor = "7"  # e.g. the other fields of a room update, not committed yet
+    assert repo.transition_status(room.id, "AVAILABLE", allowed_from("AVAILABLE")) == 0
+    assert room.floor == "7"
+    db_session.commit()
+    db_session.expire_all()
+    assert repo.get(room.id).floor == "7"
+    assert db_session.query(RoomStatusLog).count() == 0
+
+def test_mark_room_status_writes_status_log(db_session, room):
+    RoomService(db_session).mark_room_status(room.id, "OCCUPIED", changed_by="frontdesk")
+    logs = db_session.query(RoomStatusLog).all()
+    assert len(logs) == 1
+    assert (logs[0].room_id, logs[0].old_status, logs[0].new_status, logs[0].changed_by) == (room.id, "AVAILABLE", "OCCUPIED", "frontdesk")
+
+def test_failed_transition_writes_no_log(db_session, room):
+    with pytest.raises(InvalidStatusTransition):
+        RoomService(db_session).mark_room_status(room.id, "AVAILABLE")
+    assert db_session.query(RoomStatusLog).count() == 0
+
+def test_disallowed_transition(db_session, room):
+    service = RoomService(db_session)
+    service.mark_room_status(room.id, "CLEANING")
+    with pytest.raises(InvalidStatusTransition, match="cannot move from CLEANING to OCCUPIED"):
+        service.mark_room_status(room.id, "OCCUPIED")
+
+def test_concurrent_occupy_only_one_wins(session_factory, room):
+    first, second = session_factory(), session_factory()
+    try:
+        # Both workers have already seen the room as AVAILABLE
+        assert first.get(Room, room.id).status == "AVAILABLE"
+        assert second.get(Room, room.id).status == "AVAILABLE"
+        RoomService(first).mark_room_status(room.id, "OCCUPIED")
+        with pytest.raises(InvalidStatusTransition):
+            RoomService(second).mark_room_status(room.id, "OCCUPIED")
+        assert first.query(RoomStatusLog).count() == 1
+    finally:
+        first.close()
+        second.close()
+
+@pytest.fixture
+def client(session_factory):
+    from fastapi.testclient import TestClient
+    from backend.room_service.api import get_db
+    from backend.room_service.main import app
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+def test_patch_with_rejected_status_saves_nothing(client, db_session, room):
+    room.status = "CLEANING"
+    db_session.commit()
+    resp = client.patch(f"/api/v1/room-service/rooms/{room.id}", json={"floor": "9", "status": "OCCUPIED"})
+    assert resp.status_code == 409
+    db_session.expire_all()
+    assert (db_session.get(Room, room.id).floor, db_session.get(Room, room.id).status) == ("1", "CLEANING")
+    assert db_session.query(RoomStatusLog).count() == 0
+
+def test_patch_with_unchanged_status_updates_the_other_fields(client, db_session, room):
+    resp = client.patch(f"/api/v1/room-service/rooms/{room.id}", json={"floor": "9", "status": "AVAILABLE"})
+    assert resp.status_code == 200
+    assert (resp.json()["floor"], resp.json()["status"]) == ("9", "AVAILABLE")
+    resp = client.patch(f"/api/v1/room-service/rooms/{room.id}", json={"floor": "3", "status": "OCCUPIED"})
+    assert (resp.status_code, resp.json()["floor"], resp.json()["status"]) == (200, "3", "OCCUPIED")
+    db_session.expire_all()
+    assert db_session.get(Room, room.id).floor == "3"
+    assert db_session.query(RoomStatusLog).count() == 1
@@ -0,0 +1,22 @@
+# Declarative room status state machine
+
+ROOM_STATUSES = ("AVAILABLE", "OCCUPIED", "CLEANING", "MAINTENANCE")
+
+# current status -> statuses it may move to
+ROOM_STATUS_TRANSITIONS = {
+    "AVAILABLE": ("OCCUPIED", "CLEANING", "MAINTENANCE"),
+    "OCCUPIED": ("CLEANING", "AVAILABLE", "MAINTENANCE"),
+    "CLEANING": ("AVAILABLE", "MAINTENANCE"),
+    "MAINTENANCE": ("CLEANING", "AVAILABLE"),
+}
+
+# Precompiled reverse index used by the conditional UPDATE:
+# target status -> statuses the row must currently be in
+ALLOWED_FROM = {
+    target: frozenset(src for src, targets in ROOM_STATUS_TRANSITIONS.items() if target in targets)
+    for target in ROOM_STATUSES
+}
+
+def allowed_from(status: str) -> frozenset:
+    """Return the source statuses for ``status``; unknown statuses have none."""
+    return ALLOWED_FROM.get(status, frozenset())
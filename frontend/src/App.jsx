@@ -1,7 +1,8 @@
-import { useState } from 'react';
+import { useEffect, useRef, useState } from 'react';
 import axios from 'axios';
 import './App.css';
 import Dashboard from './Dashboard';
+import { fetchAllPages } from './fetchAllPages';
 
 // Static options for dropdowns
 const ROOM_STATUS_OPTIONS = ["AVAILABLE", "OCCUPIED", "MAINTENANCE", "CLEANING"];
@@ -24,6 +25,7 @@ function App() {
   const [endDate, setEndDate] = useState('');
   const [rooms, setRooms] = useState(null);
   const [reservations, setReservations] = useState(null);
+  const reservationAttempt = useRef(null);
   const [tasks, setTasks] = useState(null);
   const [report, setReport] = useState(null);
   const [loading, setLoading] = useState('');
@@ -77,6 +79,18 @@ function App() {
   const TASK_URL = 'http://localhost:8003/api/v1/tasks';
   const REPORT_URL = 'http://localhost:8006/api/v1/reports/occupancy';
 
+  // Live room status updates while the room list is shown (EventSource resumes via Last-Event-ID on reconnect)
+  const roomsLoaded = rooms !== null;
+  useEffect(() => {
+    if (!roomsLoaded || !propertyId) return undefined;
+    const source = new EventSource(`${ROOM_URL}/events?property_id=${propertyId}`);
+    source.addEventListener('room_status', (e) => {
+      const change = JSON.parse(e.data);
+      setRooms((prev) => prev && prev.map((r) => (r.id === change.room_id ? { ...r, status: change.new_status } : r)));
+    });
+    return () => source.close();
+  }, [roomsLoaded, propertyId]);
+
   // Handlers
   const fetchRooms = async () => {
     if (!propertyId) {
@@ -85,8 +99,7 @@ function App() {
     }
     setLoading('rooms'); setError(''); setRooms(null);
     try {
-      const res = await axios.get(`${ROOM_URL}?property_id=${propertyId}`);
-      setRooms(res.data);
+      setRooms(await fetchAllPages(ROOM_URL, { property_id: propertyId }));
     } catch (e) {
       setError('Failed to fetch rooms');
     } finally { setLoading(''); }
@@ -98,8 +111,7 @@ function App() {
       const params = { property_id: propertyId };
       if (startDate) params.start_date = startDate;
       if (endDate) params.end_date = endDate;
-      const res = await axios.get(RESERVATION_URL, { params });
-      setReservations(res.data);
+      setReservations(await fetchAllPages(RESERVATION_URL, params));
     } catch (e) {
       setError('Failed to fetch reservations');
     } finally { setLoading(''); }
@@ -246,7 +258,13 @@ function App() {
       const check_in = newReservation.check_in.length === 16 ? newReservation.check_in + ':00' : newReservation.check_in;
       const check_out = newReservation.check_out.length === 16 ? newReservation.check_out + ':00' : newReservation.check_out;
       const payload = { ...newReservation, check_in, check_out };
-      await axios.post(RESERVATION_URL, payload);
+      // Resubmitting the same form after a timeout reuses its key, so the server cannot book it twice
+      const body = JSON.stringify(payload);
+      if (!reservationAttempt.current || reservationAttempt.current.body !== body) {
+        reservationAttempt.current = { body, key: crypto.randomUUID() };
+      }
+      await axios.post(RESERVATION_URL, payload, { headers: { 'Idempotency-Key': reservationAttempt.current.key } });
+      reservationAttempt.current = null;
       setShowAddReservation(false);
       setNewReservation({
         property_id: propertyId || 1,
@@ -1,6 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import axios from 'axios';
 import './App.css';
+import { fetchAllPages } from './fetchAllPages';
 
 const ROOM_URL = 'http://localhost:8001/api/v1/room-service/rooms';
 const RESERVATION_URL = 'http://localhost:8002/api/v1/reservations';
@@ -21,24 +22,25 @@ function Dashboard() {
       setLoading(true);
       setError('');
       try {
-        const [roomsRes, reservationsRes, tasksRes, reportRes] = await Promise.all([
-          axios.get(ROOM_URL),
-          axios.get(RESERVATION_URL),
+        const [summaryRes, roomsRes, reservationsRes, tasksRes, reportRes] = await Promise.all([
+          axios.get(`${ROOM_URL}/summary`),
+          axios.get(`${ROOM_URL}?limit=10`),
+          fetchAllPages(RESERVATION_URL),
           axios.get(TASK_URL),
           axios.get(REPORT_URL).catch(() => ({ data: null })),
         ]);
         setRooms(roomsRes.data);
-        setReservations(reservationsRes.data);
+        setReservations(reservationsRes);
         setTasks(tasksRes.data);
         setReport(reportRes.data);
         setStats({
-          totalRooms: roomsRes.data.length,
-          occupiedRooms: roomsRes.data.filter(r => r.status === 'OCCUPIED').length,
-          availableRooms: roomsRes.data.filter(r => r.status === 'AVAILABLE').length,
-          maintenanceRooms: roomsRes.data.filter(r => r.status === 'MAINTENANCE').length,
-          cleaningRooms: roomsRes.data.filter(r => r.status === 'CLEANING').length,
+          totalRooms: summaryRes.data.total,
+          occupiedRooms: summaryRes.data.by_status.OCCUPIED ?? 0,
+          availableRooms: summaryRes.data.by_status.AVAILABLE ?? 0,
+          maintenanceRooms: summaryRes.data.by_status.MAINTENANCE ?? 0,
+          cleaningRooms: summaryRes.data.by_status.CLEANING ?? 0,
           pendingTasks: tasksRes.data.filter(t => t.status !== 'DONE').length,
-          totalReservations: reservationsRes.data.length,
+          totalReservations: reservationsRes.length,
         });
       } catch (e) {
         setError('Failed to load dashboard data. Some services may be down.');
@@ -119,7 +121,7 @@ function Dashboard() {
                   ))}
                 </tbody>
               </table>
-              {rooms && rooms.length > 10 && <div style={{fontSize:12, color:'#888'}}>Showing first 10 of {rooms.length} rooms</div>}
+              {stats && stats.totalRooms > 10 && <div style={{fontSize:12, color:'#888'}}>Showing first 10 of {stats.totalRooms} rooms</div>}
             </div>
             <div className="col card" style={{marginRight: 16}}>
               <h2>Reservations</h2>
@@ -0,0 +1,13 @@
+import axios from 'axios';
+
+// List endpoints return one page at a time; follow X-Next-Cursor until the last page
+export async function fetchAllPages(url, params = {}) {
+  const rows = [];
+  let after = null;
+  do {
+    const res = await axios.get(url, { params: after ? { ...params, limit: 1000, after } : { ...params, limit: 1000 } });
+    rows.push(...res.data);
+    after = res.headers['x-next-cursor'] || null;
+  } while (after);
+  return rows;
+}
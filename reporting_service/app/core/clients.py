@@ -1,26 +1,66 @@
 import httpx
-from typing import Optional
+from contextlib import nullcontext
+from typing import Dict, Optional, Tuple
 
 ROOM_SERVICE_URL = "http://localhost:8001/api/v1/room-service/rooms"
 RESERVATION_SERVICE_URL = "http://localhost:8002/api/v1/reservations"
 HOUSEKEEPING_SERVICE_URL = "http://localhost:8003/api/v1/tasks"
 
-async def fetch_rooms(property_id: int):
+# Last (ETag, rows, next cursor) seen per room page, revalidated with If-None-Match
+ROOM_PAGE_CACHE_SIZE = 256
+_room_pages: Dict[Tuple, Tuple[str, list, Optional[str]]] = {}
+
+async def fetch_rooms(property_id: int, client: Optional[httpx.AsyncClient] = None):
+    # The room service pages its lists; follow X-Next-Cursor until the last page.
+    # Unchanged pages come back as 304 and are served from _room_pages.
+    async with (httpx.AsyncClient() if client is None else nullcontext(client)) as client:
+        rooms = []
+        params = {"property_id": property_id, "limit": 1000}
+        while True:
+            key = tuple(sorted(params.items()))
+            cached = _room_pages.get(key)
+            headers = {"If-None-Match": cached[0]} if cached else {}
+            resp = await client.get(ROOM_SERVICE_URL, params=params, headers=headers)
+            if resp.status_code == 304 and cached:
+                _, page, cursor = cached
+            else:
+                resp.raise_for_status()
+                page, cursor = resp.json(), resp.headers.get("X-Next-Cursor")
+                etag = resp.headers.get("ETag")
+                if etag:
+                    if len(_room_pages) >= ROOM_PAGE_CACHE_SIZE:
+                        _room_pages.pop(next(iter(_room_pages)))
+                    _room_pages[key] = (etag, page, cursor)
+            rooms.extend(page)
+            if not cursor:
+                return rooms
+            params["after"] = cursor
+
+async def fetch_room_summary(property_id: int):
+    # Status/floor/type counts aggregated by the room service
     async with httpx.AsyncClient() as client:
-        resp = await client.get(f"{ROOM_SERVICE_URL}?property_id={property_id}")
+        resp = await client.get(f"{ROOM_SERVICE_URL}/summary", params={"property_id": property_id})
         resp.raise_for_status()
         return resp.json()
 
-async def fetch_reservations(property_id: int, start_date: Optional[str], end_date: Optional[str]):
-    async with httpx.AsyncClient() as client:
-        params = {"property_id": property_id}
+async def fetch_reservations(property_id: int, start_date: Optional[str], end_date: Optional[str],
+                             client: Optional[httpx.AsyncClient] = None):
+    # The reservation service pages its list too; follow X-Next-Cursor until the last page
+    async with (httpx.AsyncClient() if client is None else nullcontext(client)) as client:
+        reservations = []
+        params = {"property_id": property_id, "limit": 1000}
         if start_date:
             params["start_date"] = start_date
         if end_date:
             params["end_date"] = end_date
-        resp = await client.get(RESERVATION_SERVICE_URL, params=params)
-        resp.raise_for_status()
-        return resp.json()
+        while True:
+            resp = await client.get(RESERVATION_SERVICE_URL, params=params)
+            resp.raise_for_status()
+            reservations.extend(resp.json())
+            cursor = resp.headers.get("X-Next-Cursor")
+            if not cursor:
+                return reservations
+            params["after"] = cursor
 
 async def fetch_tasks(property_id: int, start_date: Optional[str], end_date: Optional[str]):
     async with httpx.AsyncClient() as client:
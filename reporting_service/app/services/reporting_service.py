@@ -3,10 +3,16 @@ from reporting_service.app.schemas.reports import OccupancyReport, TaskHistoryRe
 from reporting_service.app.core import clients
 
 # Dependency injection for easier testing
-async def get_occupancy_report(property_id: int, start_date: Optional[str], end_date: Optional[str], fetch_rooms: Callable = clients.fetch_rooms) -> OccupancyReport:
-    rooms = await fetch_rooms(property_id)
-    total_rooms = len(rooms)
-    occupied_rooms = sum(1 for r in rooms if r.get("status") == "OCCUPIED")
+async def get_occupancy_report(property_id: int, start_date: Optional[str], end_date: Optional[str], fetch_rooms: Optional[Callable] = None, fetch_room_summary: Callable = clients.fetch_room_summary) -> OccupancyReport:
+    if fetch_rooms is not None:
+        rooms = await fetch_rooms(property_id)
+        total_rooms = len(rooms)
+        occupied_rooms = sum(1 for r in rooms if r.get("status") == "OCCUPIED")
+    else:
+        # The room service counts with one GROUP BY instead of shipping every room
+        summary = await fetch_room_summary(property_id)
+        total_rooms = summary["total"]
+        occupied_rooms = summary["by_status"].get("OCCUPIED", 0)
     occupancy_rate = occupied_rooms / total_rooms if total_rooms else 0.0
     return OccupancyReport(
         property_id=property_id,
@@ -138,3 +138,42 @@ async def test_night_audit_report_cases(reservations, expected_total, expected_c
     assert result.check_outs == expected_checkouts
     assert result.cancellations == expected_cancels
     assert result.no_shows == expected_noshows
+
+@pytest.mark.asyncio
+async def test_fetch_rooms_revalidates_pages_with_etag():
+    import httpx
+    from reporting_service.app.core import clients
+    clients._room_pages.clear()
+    seen = []
+    def handler(request):
+        seen.append(request.headers.get("If-None-Match"))
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304, headers={"ETag": '"v1"'})
+        return httpx.Response(200, json=[{"id": 1, "status": "OCCUPIED"}], headers={"ETag": '"v1"'})
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        first = await clients.fetch_rooms(1, client=client)
+        second = await clients.fetch_rooms(1, client=client)
+    assert first == second == [{"id": 1, "status": "OCCUPIED"}]
+    assert seen == [None, '"v1"']
+
+@pytest.mark.asyncio
+async def test_fetch_reservations_follows_every_page():
+    import httpx
+    from reporting_service.app.core import clients
+    pages = {None: ([{"id": 1}, {"id": 2}], "c2"), "c2": ([{"id": 3}], None)}
+    seen = []
+    def handler(request):
+        seen.append(dict(request.url.params))
+        rows, cursor = pages[request.url.params.get("after")]
+        return httpx.Response(200, json=rows, headers={"X-Next-Cursor": cursor} if cursor else {})
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        reservations = await clients.fetch_reservations(1, "2025-05-19", None, client=client)
+    assert [r["id"] for r in reservations] == [1, 2, 3]
+    assert seen[1] == {"property_id": "1", "limit": "1000", "start_date": "2025-05-19", "after": "c2"}
+
+@pytest.mark.asyncio
+async def test_occupancy_report_from_room_summary():
+    async def mock_fetch_room_summary(property_id):
+        return {"property_id": property_id, "total": 4, "by_status": {"OCCUPIED": 3, "CLEANING": 1}, "by_floor": {}, "by_type": {}}
+    result = await reporting_service.get_occupancy_report(1, None, None, fetch_room_summary=mock_fetch_room_summary)
+    assert (result.total_rooms, result.occupied_rooms, result.occupancy_rate) == (4, 3, 0.75)